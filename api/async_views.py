@@ -0,0 +1,79 @@
+import asyncio
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from rest_framework.views import APIView
+
+
+class AsyncAPIView(APIView):
+    """
+    APIView whose handlers are coroutines (`async def get(...)`).
+
+    DRF only dispatches synchronously; this runs the same steps and awaits
+    the handler, so under ASGI a request waiting on the model holds no
+    thread. `initial()` (authentication may load the session from the
+    database) runs through sync_to_async. Under WSGI Django runs the view
+    in its own event loop, so it works there too.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(
+                    self, request.method.lower(), self.http_method_not_allowed
+                )
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            # OPTIONS is answered by APIView's synchronous handler
+            if asyncio.iscoroutine(response):
+                response = await response
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+_END = object()
+
+
+async def aiterate(iterable):
+    """
+    Async iterator over a sync iterable, one item per `sync_to_async` call.
+    Thread-sensitive, so a generator reading the database keeps using the
+    request's connection.
+    """
+    iterator = iter(iterable)
+    try:
+        while True:
+            item = await sync_to_async(next)(iterator, _END)
+            if item is _END:
+                return
+            yield item
+    finally:
+        # Client gone: let the generator clean up (cursors, files)
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            await sync_to_async(close)()
+
+
+def streaming_content(request, chunks):
+    """
+    `chunks` for a StreamingHttpResponse of a sync view. Under ASGI Django
+    reads a sync iterator with `sync_to_async(list)`, i.e. the whole body
+    into memory before the first byte, so there it is served through
+    `aiterate` instead.
+    """
+    if isinstance(getattr(request, "_request", request), ASGIRequest):
+        return aiterate(chunks)
+    return chunks
@@ -0,0 +1,67 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection
+from api.models import Job
+from api.serializer import CommentSerializer
+from api.utils.ingest import bulk_ingest_comments
+
+
+def make_comments(count):
+    return [
+        {
+            "url": f"https://www.upwork.com/jobs/~{i}",
+            "rating": 5.0,
+            "billed_amount": "$120.00",
+            "job_title": f"Previous job {i}",
+            "description": "Historical job description " * 10,
+            "client_feedback": "Great freelancer, would hire again.",
+            "freelancer_feedback": "Clear requirements and quick payment.",
+            "posted_on": "Jan 2024 - Feb 2024",
+        }
+        for i in range(count)
+    ]
+
+
+def per_row_ingest(job, comments):
+    # The previous CommentView.post path: one serializer and INSERT per row
+    for comment_data in comments:
+        serializer = CommentSerializer(data={**comment_data, "job": job.id})
+        if serializer.is_valid():
+            serializer.save()
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare per-row and batched comment ingestion throughput. "
+        "The benchmark job and its comments are deleted after every run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            nargs="+",
+            type=int,
+            default=[10, 100, 1000],
+            help="Comments per job to benchmark",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'batch':>8} {'per-row rows/s':>16} {'batched rows/s':>16}")
+        for size in options["sizes"]:
+            comments = make_comments(size)
+            rates = []
+            for ingest in (per_row_ingest, bulk_ingest_comments):
+                # No surrounding transaction: the per-row baseline commits
+                # every INSERT, as the old view did, and the bulk path opens
+                # its own
+                job = Job.objects.create(
+                    title="Benchmark job", job_id=f"bench-comments-{size}"
+                )
+                try:
+                    started = time.perf_counter()
+                    ingest(job, comments)
+                    rates.append(size / (time.perf_counter() - started))
+                finally:
+                    job.delete()
+            self.stdout.write(f"{size:>8} {rates[0]:>16.0f} {rates[1]:>16.0f}")
+        self.stdout.write(f"database: {connection.vendor}")
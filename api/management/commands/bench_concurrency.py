@@ -0,0 +1,191 @@
+import asyncio
+import math
+import os
+import subprocess
+import sys
+import time
+import uuid
+import httpx
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from api.models import Job, Comment, LLMCacheEntry, LLMCall
+from api.utils.LLM import prepare
+from api.utils.openai_stub import OpenAIStubServer
+
+MODES = {
+    "wsgi": [],  # server.py default: waitress, 4 threads
+    "asgi": ["--asgi"],  # uvicorn, one process
+}
+
+
+def percentile(samples, q):
+    # Nearest-rank percentile
+    samples = sorted(samples)
+    return samples[max(0, math.ceil(q * len(samples)) - 1)] if samples else 0.0
+
+
+def seed(prefix, count):
+    """
+    Unenriched jobs with distinct payloads, so every detail request has
+    to call the model.
+    """
+    jobs = Job.objects.bulk_create(
+        Job(
+            job_id=f"{prefix}-{i}",
+            title=f"Load test job {prefix} {i}",
+            description="Scrape product listings every hour",
+            skills=["Python"],
+        )
+        for i in range(count)
+    )
+    Comment.objects.bulk_create(
+        Comment(job=job, job_title="Previous job", client_feedback="Great")
+        for job in jobs
+    )
+    return [job.job_id for job in jobs]
+
+
+def cleanup(prefix):
+    jobs = list(Job.objects.filter(job_id__startswith=f"{prefix}-"))
+    cache_keys = [prepare(job, job.comments.all())[2] for job in jobs]
+    LLMCacheEntry.objects.filter(key__in=cache_keys).delete()
+    # The ledger keeps calls of deleted jobs, these are not real spend
+    LLMCall.objects.filter(job__in=jobs).delete()
+    Job.objects.filter(pk__in=[job.pk for job in jobs]).delete()
+
+
+def server_env(stub):
+    env = dict(os.environ)
+    env.update(
+        OPENAI_BASE_URL=stub.base_url,
+        OPENAI_API_KEY="stub",
+        # Measure the server, not the account limits
+        LLM_MAX_CONCURRENCY="1000",
+        LLM_MAX_CONNECTIONS="1000",
+        LLM_REQUESTS_PER_MINUTE="1000000",
+        LLM_TOKENS_PER_MINUTE="1000000000",
+        RENDER_EXTERNAL_HOSTNAME="127.0.0.1",  # ALLOWED_HOSTS without DEBUG
+    )
+    return env
+
+
+async def wait_until_up(base_url, timeout):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                await client.get(f"{base_url}/api/v1/metrics/")
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.2)
+    raise CommandError(f"Server at {base_url} did not start")
+
+
+async def burst(base_url, job_ids, timeout):
+    """
+    One detail request per job, all at once, plus a cheap probe request
+    sent while they are in flight. Returns (latencies, enriched, wall, probe).
+    """
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(limits=limits, timeout=timeout) as client:
+
+        async def detail(job_id):
+            started = time.perf_counter()
+            response = await client.get(
+                f"{base_url}/api/v1/jobs/detail/",
+                params={"job_id": job_id, "need_comments": "false"},
+            )
+            enriched = (
+                response.status_code == 200
+                and bool(response.json()["llm_response"].get("id"))
+            )
+            return time.perf_counter() - started, enriched
+
+        async def probe():
+            await asyncio.sleep(0.1)
+            started = time.perf_counter()
+            await client.get(f"{base_url}/api/v1/jobs/detail/cache/")
+            return time.perf_counter() - started
+
+        started = time.perf_counter()
+        results, probe_latency = await asyncio.gather(
+            asyncio.gather(*(detail(job_id) for job_id in job_ids)), probe()
+        )
+        wall = time.perf_counter() - started
+    latencies = [latency for latency, _ in results]
+    enriched = sum(ok for _, ok in results)
+    return latencies, enriched, wall, probe_latency
+
+
+class Command(BaseCommand):
+    help = (
+        "Concurrent first-time enrichments (job detail requests that must call "
+        "the model) against server.py under WSGI (waitress) and ASGI (uvicorn), "
+        "with a local stand-in for the OpenAI API. Writes to the configured "
+        "database and removes its rows afterwards: use a development database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency", type=int, nargs="+", default=[4, 16, 64],
+            help="Simultaneous requests per burst",
+        )
+        parser.add_argument(
+            "--llm-latency", type=float, default=1.0, help="Stub model delay (s)"
+        )
+        parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument("--timeout", type=float, default=120.0)
+
+    def handle(self, *args, **options):
+        prefix = f"loadtest-{uuid.uuid4().hex[:8]}"
+        levels = options["concurrency"]
+        job_ids = seed(prefix, len(options["modes"]) * sum(levels))
+        rows = []
+        try:
+            with OpenAIStubServer(delay=options["llm_latency"]) as stub:
+                for mode in options["modes"]:
+                    rows += self.run_mode(mode, stub, levels, job_ids, options)
+                    del job_ids[: sum(levels)]
+        finally:
+            cleanup(prefix)
+
+        self.stdout.write(
+            f"{'server':<6} {'conc':>5} {'enriched':>9} {'wall s':>8} {'enrich/s':>9} "
+            f"{'p50 s':>7} {'p95 s':>7} {'probe s':>8}"
+        )
+        for mode, level, latencies, enriched, wall, probe in rows:
+            self.stdout.write(
+                f"{mode:<6} {level:>5} {enriched:>9} {wall:>8.2f} {enriched / wall:>9.1f} "
+                f"{percentile(latencies, 0.5):>7.2f} {percentile(latencies, 0.95):>7.2f} "
+                f"{probe:>8.3f}"
+            )
+        self.stdout.write(
+            f"model latency: {options['llm_latency']} s, "
+            f"database: {settings.DATABASES['default']['ENGINE'].rsplit('.', 1)[-1]}"
+        )
+
+    def run_mode(self, mode, stub, levels, job_ids, options):
+        port = options["port"]
+        base_url = f"http://127.0.0.1:{port}"
+        server = subprocess.Popen(
+            [sys.executable, "server.py", "--host", "127.0.0.1", "--port", str(port)]
+            + MODES[mode],
+            cwd=settings.BASE_DIR,
+            env=server_env(stub),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        rows = []
+        try:
+            asyncio.run(wait_until_up(base_url, 30))
+            offset = 0
+            for level in levels:
+                batch = job_ids[offset : offset + level]
+                offset += level
+                result = asyncio.run(burst(base_url, batch, options["timeout"]))
+                rows.append((mode, level, *result))
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+        return rows
@@ -0,0 +1,399 @@
+import asyncio
+import json
+import math
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.conf import settings
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from langchain_core.messages import AIMessageChunk
+from api import urls
+from api.models import Job_List, Job, Comment, LLMResponse, EnrichmentTask, LLMCall
+from api.utils.detail_cache import private_caches
+from api.utils.search import refresh_search_index
+from api.utils.skills import rebuild_skill_counts
+
+DEFAULT_BUDGETS = Path(__file__).resolve().parents[2] / "bench_budgets.json"
+SKILLS = ["Python", "Django", "React", "SQL", "Web Scraping", "AWS"]
+FAKE_LLM_CONTENT = json.dumps(
+    {
+        "client_names": ["Alex"],
+        "keywords": ["scraping"],
+        "company": "Acme",
+        "client_location": "United States",
+    }
+)
+
+
+class Scenario:
+    """
+    One benchmarked request. `params` / `data` may be callables taking the
+    iteration number, so requests can rotate over the seeded jobs; `setup`
+    runs before every request, outside the timed `send`.
+    """
+
+    def __init__(self, name, url_name, method="get", params=None, data=None,
+                 setup=None, url_kwargs=None, status=200):
+        self.name = name
+        self.url_name = url_name
+        self.method = method
+        self.params = params
+        self.data = data
+        self.setup = setup
+        self.url_kwargs = url_kwargs
+        self.status = status
+
+    def request(self, client, i):
+        if self.setup:
+            self.setup()
+        return self.send(client, i)
+
+    def send(self, client, i):
+        url = reverse(self.url_name, kwargs=self.url_kwargs)
+        params = self.params(i) if callable(self.params) else self.params
+        data = self.data(i) if callable(self.data) else self.data
+        if data is not None:
+            response = getattr(client, self.method)(
+                url, json.dumps(data), content_type="application/json"
+            )
+        else:
+            response = getattr(client, self.method)(url, params or {})
+        if response.streaming:
+            b"".join(response.streaming_content)
+        if response.status_code != self.status:
+            raise CommandError(
+                f"{self.name}: HTTP {response.status_code}, expected {self.status}"
+            )
+        return response
+
+
+def seed(jobs, comments):
+    """
+    Jobs with comments and a stored LLM response and ledger row each
+    (every tenth job is left unenriched), plus as many Job_List rows.
+    """
+    Job_List.objects.bulk_create(
+        Job_List(
+            job_id=f"bench-{i}",
+            title=f"Scraper job {i}",
+            posted_time="1 hour ago",
+            location="United States",
+            description="Collect product listings " * 10,
+            skills=[SKILLS[i % len(SKILLS)], SKILLS[(i + 1) % len(SKILLS)]],
+        )
+        for i in range(jobs)
+    )
+    created = Job.objects.bulk_create(
+        Job(
+            job_id=f"bench-{i}",
+            title=f"Scraper job {i}",
+            description="Collect product listings every hour " * 10,
+            skills=[SKILLS[i % len(SKILLS)], SKILLS[(i + 1) % len(SKILLS)]],
+            client_location="United States",
+            pricing_details={"type": "Hourly", "min": 15.0},
+            rating=4.5,
+        )
+        for i in range(jobs)
+    )
+    Comment.objects.bulk_create(
+        Comment(
+            job=job,
+            job_title=f"Previous job {n}",
+            description="Historical job description " * 5,
+            client_feedback="Great freelancer, would hire again.",
+            freelancer_feedback="Clear requirements and quick payment.",
+            rating=5.0,
+        )
+        for job in created
+        for n in range(comments)
+    )
+    LLMResponse.objects.bulk_create(
+        LLMResponse(job=job, company="Acme", client_names=["Alex"])
+        for i, job in enumerate(created)
+        if i % 10
+    )
+    LLMCall.objects.bulk_create(
+        LLMCall(
+            job=job,
+            model="gpt-4o",
+            prompt_version="1",
+            prompt_tokens=2000 + i,
+            completion_tokens=150,
+            latency=2.5,
+            outcome=LLMCall.SUCCESS,
+            cost=0.0065,
+        )
+        for i, job in enumerate(created)
+        if i % 10
+    )
+    refresh_search_index()
+    rebuild_skill_counts()
+    if connection.vendor == "postgresql":
+        # Autovacuum never sees the uncommitted seed; without fresh
+        # statistics the planner assumes near-empty tables
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+    return created
+
+
+def scenarios(jobs):
+    job_ids = [job.job_id for job in jobs]
+    enriched = [job.job_id for i, job in enumerate(jobs) if i % 10]
+    # Few enough that the warmup requests fill the job detail cache
+    hot = enriched[:5]
+    task = EnrichmentTask.objects.create(job=jobs[0])
+
+    def rotate(values):
+        return lambda i: values[i % len(values)]
+
+    def clear_detail_cache():
+        caches["job_detail"].clear()
+
+    return [
+        Scenario("job_list", "job_list"),
+        Scenario("job_list_cursor", "job_list", params={"pagination": "cursor"}),
+        Scenario("job_list_fields", "job_list", params={"fields": "id,title"}),
+        Scenario(
+            "job_comment",
+            "job_comment",
+            method="post",
+            data=lambda i: {
+                "job_id": job_ids[i % len(job_ids)],
+                "comments": [{"job_title": f"Old job {i}", "rating": 5}] * 5,
+            },
+            status=201,
+        ),
+        Scenario("job_enrichment", "job_enrichment", url_kwargs={"pk": task.pk}),
+        Scenario("llm_cache", "llm_cache"),
+        Scenario("llm_calls", "llm_calls"),
+        Scenario("job_search", "job_search", params={"q": "scraper listings"}),
+        Scenario("job_skills", "job_skills"),
+        Scenario("job_skills_filtered", "job_skills", params={"skills": "Python"}),
+        Scenario("job_detail", "job_detail", params=lambda i: {"job_id": rotate(hot)(i)}),
+        Scenario(
+            "job_detail_uncached",
+            "job_detail",
+            params=lambda i: {"job_id": rotate(enriched)(i)},
+            setup=clear_detail_cache,
+        ),
+        Scenario(
+            "job_detail_refresh",
+            "job_detail",
+            params=lambda i: {"job_id": rotate(job_ids)(i), "refresh_llm": "true"},
+        ),
+        # Stored responses: a single `done` event, no model call
+        Scenario(
+            "job_detail_stream",
+            "job_detail_stream",
+            params=lambda i: {"job_id": rotate(enriched)(i)},
+        ),
+        Scenario("job_detail_cache", "job_detail_cache"),
+        Scenario("metrics", "metrics"),
+        Scenario("export", "export", url_kwargs={"table": "jobs"}),
+        # Wrong password: the endpoint must not wipe the seeded data
+        Scenario(
+            "admin_control",
+            "admin_control",
+            method="delete",
+            url_kwargs={"password": "benchmark"},
+            status=401,
+        ),
+        Scenario("job_page", "job_page", params=lambda i: {"job_id": rotate(hot)(i)}),
+        Scenario("job_list_page", "job_list_page"),
+    ]
+
+
+def percentile(samples, q):
+    # Nearest-rank percentile of sorted samples
+    return samples[max(0, math.ceil(q * len(samples)) - 1)]
+
+
+def fake_invoke_llm(latency):
+    def invoke(model, messages):
+        if latency:
+            time.sleep(latency)
+        return SimpleNamespace(content=FAKE_LLM_CONTENT)
+
+    return invoke
+
+
+def fake_ainvoke_llm(latency):
+    async def ainvoke(model, messages):
+        if latency:
+            await asyncio.sleep(latency)
+        return SimpleNamespace(content=FAKE_LLM_CONTENT)
+
+    return ainvoke
+
+
+def fake_stream_llm(latency):
+    def stream(model, messages):
+        if latency:
+            time.sleep(latency)
+        yield AIMessageChunk(content=FAKE_LLM_CONTENT)
+
+    return stream
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark every API endpoint against a seeded database with a fake "
+        "in-process LLM: p50/p95/p99 latency, throughput and query count. "
+        "Fails when an endpoint exceeds its query budget or its median latency "
+        "regresses past --threshold. Everything is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--jobs", type=int, default=200)
+        parser.add_argument("--comments", type=int, default=5, help="Per job")
+        parser.add_argument("--iterations", type=int, default=50)
+        parser.add_argument("--warmup", type=int, default=5)
+        parser.add_argument(
+            "--llm-latency", type=float, default=0.0, help="Fake LLM delay (s)"
+        )
+        parser.add_argument("--budgets", default=str(DEFAULT_BUDGETS))
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.5,
+            help="Allowed p50 regression over the stored baseline (0.5 = +50%%)",
+        )
+        parser.add_argument(
+            "--min-delta-ms",
+            type=float,
+            default=2.0,
+            help="Ignore p50 regressions smaller than this, sub-ms noise is common",
+        )
+        parser.add_argument(
+            "--no-latency-check",
+            action="store_true",
+            help="Only enforce query budgets (latency baselines are per machine)",
+        )
+        parser.add_argument(
+            "--update", action="store_true", help="Store this run as the new budgets"
+        )
+        parser.add_argument("--only", nargs="+", help="Scenario names to run")
+
+    def handle(self, *args, **options):
+        budgets_path = Path(options["budgets"])
+        stored = json.loads(budgets_path.read_text()) if budgets_path.exists() else {}
+        # Budgets and baselines are kept per database backend
+        budgets = stored.setdefault(connection.vendor, {})
+
+        client = Client()
+        results = {}
+        latency = options["llm_latency"]
+        # A private job detail cache: the run clears it and fills it with
+        # rows that are rolled back
+        cache_dir = tempfile.mkdtemp(prefix="job_detail_bench_")
+        try:
+            with transaction.atomic(), mock.patch(
+                "api.utils.LLM.invoke_llm", fake_invoke_llm(latency)
+            ), mock.patch(
+                "api.utils.LLM.ainvoke_llm", fake_ainvoke_llm(latency)
+            ), mock.patch(
+                "api.utils.LLM.stream_llm", fake_stream_llm(latency)
+            ), override_settings(
+                ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"],
+                CACHES=private_caches(cache_dir),
+            ):
+                jobs = seed(options["jobs"], options["comments"])
+                selected = scenarios(jobs)
+                self.check_coverage(selected)
+                if options["only"]:
+                    selected = [s for s in selected if s.name in options["only"]]
+
+                for scenario in selected:
+                    results[scenario.name] = self.run_scenario(client, scenario, options)
+                transaction.set_rollback(True)
+        finally:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+        failures = self.report(results, budgets, options)
+        if options["update"]:
+            budgets.update(
+                {
+                    name: {"queries": result["queries"], "p50_ms": round(result["p50"], 2)}
+                    for name, result in results.items()
+                }
+            )
+            budgets_path.write_text(json.dumps(stored, indent=2, sort_keys=True) + "\n")
+            self.stdout.write(f"budgets written to {budgets_path}")
+        elif failures:
+            raise CommandError("\n".join(failures))
+
+    def check_coverage(self, selected):
+        covered = {scenario.url_name for scenario in selected}
+        missing = [
+            pattern.name for pattern in urls.urlpatterns if pattern.name not in covered
+        ]
+        if missing:
+            raise CommandError(f"No benchmark scenario for: {', '.join(missing)}")
+
+    def run_scenario(self, client, scenario, options):
+        for i in range(options["warmup"]):
+            scenario.request(client, i)
+
+        samples = []
+        for i in range(options["iterations"]):
+            if scenario.setup:
+                scenario.setup()
+            started = time.perf_counter()
+            scenario.send(client, i)
+            samples.append((time.perf_counter() - started) * 1000)
+
+        # Counted separately, capturing SQL slows the timed requests down
+        queries = 0
+        for i in range(3):
+            with CaptureQueriesContext(connection) as captured:
+                scenario.request(client, i)
+            queries = max(queries, len(captured))
+
+        samples.sort()
+        return {
+            "p50": percentile(samples, 0.50),
+            "p95": percentile(samples, 0.95),
+            "p99": percentile(samples, 0.99),
+            "rps": len(samples) / (sum(samples) / 1000),
+            "queries": queries,
+        }
+
+    def report(self, results, budgets, options):
+        failures = []
+        self.stdout.write(
+            f"{'endpoint':<22} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+            f"{'req/s':>8} {'queries':>8} {'budget':>7}"
+        )
+        for name, result in results.items():
+            budget = budgets.get(name, {})
+            max_queries = budget.get("queries")
+            if max_queries is not None and result["queries"] > max_queries:
+                failures.append(
+                    f"{name}: {result['queries']} queries, budget is {max_queries}"
+                )
+            # Checked on the median: p95 of a short run is too noisy to gate on
+            baseline = budget.get("p50_ms")
+            if (
+                baseline
+                and not options["no_latency_check"]
+                and result["p50"] > baseline * (1 + options["threshold"])
+                and result["p50"] - baseline > options["min_delta_ms"]
+            ):
+                failures.append(
+                    f"{name}: p50 {result['p50']:.2f} ms, baseline {baseline:.2f} ms"
+                )
+            self.stdout.write(
+                f"{name:<22} {result['p50']:>8.2f} {result['p95']:>8.2f} "
+                f"{result['p99']:>8.2f} {result['rps']:>8.0f} {result['queries']:>8} "
+                f"{'-' if max_queries is None else max_queries:>7}"
+            )
+        self.stdout.write(f"database: {connection.vendor}")
+        return failures
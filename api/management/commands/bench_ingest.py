@@ -0,0 +1,92 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from api.utils.ingest import bulk_ingest_job_list
+
+
+class _Rollback(Exception):
+    pass
+
+
+def make_jobs(count, prefix):
+    return [
+        {
+            "job_id": f"{prefix}{i}",
+            "title": f"Benchmark job {i}",
+            "posted_time": "2 hours ago",
+            "payment_verified": i % 2 == 0,
+            "total_spent": float(i),
+            "location": "United States",
+            "rating": 4.5,
+            "job_type": {"type": "Hourly"},
+            "description": "Benchmark description " * 20,
+            "skills": ["Python", "Django", "Web Scraping"],
+            "proposals": {"count": "5 to 10"},
+        }
+        for i in range(count)
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark Job_List bulk ingest (rows/sec) for several batch sizes. "
+        "Every run is rolled back, nothing is persisted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            nargs="+",
+            type=int,
+            default=[10, 100, 1000, 10000],
+            help="Batch sizes to benchmark",
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=3, help="Runs per batch size (best is kept)"
+        )
+        parser.add_argument(
+            "--change-rate",
+            type=float,
+            default=0.1,
+            help="Share of rows modified before the upsert pass",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{'batch':>8} {'new rows/s':>12} {'re-ingest rows/s':>18} "
+            f"{'upsert rows/s':>15} {'churn':>7}"
+        )
+        for size in options["sizes"]:
+            best_new = best_again = best_upsert = 0.0
+            churn_rate = 0.0
+            for run in range(options["repeat"]):
+                jobs = make_jobs(size, prefix=f"bench-{size}-{run}-")
+                try:
+                    with transaction.atomic():
+                        started = time.perf_counter()
+                        bulk_ingest_job_list(jobs)
+                        elapsed_new = time.perf_counter() - started
+
+                        # Second pass: every row already exists and is skipped
+                        started = time.perf_counter()
+                        bulk_ingest_job_list(jobs)
+                        elapsed_again = time.perf_counter() - started
+
+                        # Third pass: re-scrape where only some rows changed
+                        changed = int(size * options["change_rate"])
+                        for job in jobs[:changed]:
+                            job["proposals"] = {"count": "10 to 15"}
+                        started = time.perf_counter()
+                        churn_rate = bulk_ingest_job_list(jobs, upsert=True)["churn_rate"]
+                        elapsed_upsert = time.perf_counter() - started
+                        raise _Rollback
+                except _Rollback:
+                    pass
+                best_new = max(best_new, size / elapsed_new)
+                best_again = max(best_again, size / elapsed_again)
+                best_upsert = max(best_upsert, size / elapsed_upsert)
+            self.stdout.write(
+                f"{size:>8} {best_new:>12.0f} {best_again:>18.0f} "
+                f"{best_upsert:>15.0f} {churn_rate:>7.1%}"
+            )
+        self.stdout.write(f"database: {connection.vendor}")
@@ -0,0 +1,101 @@
+import random
+import statistics
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+from api.models import Job
+from api.utils.search import refresh_search_index, search_job_ids
+
+WORDS = [
+    "django", "react", "python", "scraper", "dashboard", "shopify", "mobile",
+    "flutter", "wordpress", "api", "postgres", "design", "logo", "video",
+    "editing", "marketing", "seo", "copywriting", "automation", "excel",
+    "data", "analysis", "machine", "learning", "chatbot", "integration",
+    "stripe", "payments", "landing", "page", "figma", "kubernetes", "aws",
+]
+# Filler vocabulary, so the words above are selective like real keywords
+FILLER = [f"term{i}" for i in range(20000)]
+KEYWORD_RATE = 0.01
+SKILLS = ["Python", "Django", "React", "Node.js", "SQL", "Figma", "SEO", "AWS"]
+QUERIES = ["django", "shopify landing", "machine learning", "stripe payments"]
+INSERT_BATCH_SIZE = 5000
+
+
+def make_text(rng, length):
+    return " ".join(
+        rng.choice(WORDS) if rng.random() < KEYWORD_RATE else rng.choice(FILLER)
+        for _ in range(length)
+    )
+
+
+def make_jobs(rng, start, count):
+    return [
+        Job(
+            title=make_text(rng, 6).capitalize(),
+            description=make_text(rng, 60),
+            skills=rng.sample(SKILLS, 3),
+            job_id=f"bench-search-{start + i}",
+        )
+        for i in range(count)
+    ]
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def scan(text, limit):
+    # What clients do today: substring match over every row
+    condition = Q()
+    for term in text.split():
+        condition &= Q(title__icontains=term) | Q(description__icontains=term)
+    return list(Job.objects.filter(condition).values_list("id", flat=True)[:limit])
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed jobs and compare indexed full-text search with a substring "
+        "scan. Every run is rolled back, nothing is persisted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1_000_000)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--page-size", type=int, default=20)
+
+    def handle(self, *args, **options):
+        rows = options["rows"]
+        repeat = options["repeat"]
+        page_size = options["page_size"]
+        rng = random.Random(0)
+
+        with transaction.atomic():
+            started = time.perf_counter()
+            for start in range(0, rows, INSERT_BATCH_SIZE):
+                count = min(INSERT_BATCH_SIZE, rows - start)
+                Job.objects.bulk_create(make_jobs(rng, start, count))
+            seeded = time.perf_counter() - started
+
+            started = time.perf_counter()
+            refresh_search_index()
+            if connection.vendor == "postgresql":
+                with connection.cursor() as cursor:
+                    cursor.execute("ANALYZE api_job")
+            indexed = time.perf_counter() - started
+
+            self.stdout.write(
+                f"seeded {rows} jobs in {seeded:.1f}s, indexed in {indexed:.1f}s"
+            )
+            self.stdout.write(f"{'query':<24} {'search ms':>10} {'scan ms':>10}")
+            for text in QUERIES:
+                search_ms = timed(lambda: search_job_ids(text, page_size + 1), repeat)
+                scan_ms = timed(lambda: scan(text, page_size + 1), repeat)
+                self.stdout.write(f"{text:<24} {search_ms:>10.1f} {scan_ms:>10.1f}")
+            transaction.set_rollback(True)
+        self.stdout.write(f"database: {connection.vendor}")
@@ -0,0 +1,82 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from rest_framework.renderers import JSONRenderer
+from api.models import Job
+from api.renderers import ORJSONRenderer
+from api.serializer import JobSerializer
+from api.utils.fast_read import value_columns, fast_rows
+
+
+def make_jobs(count):
+    return [
+        Job(
+            title=f"Benchmark job {i}",
+            description="Benchmark description " * 20,
+            skills=["Python", "Django", "Web Scraping"],
+            is_payment_verified=i % 2 == 0,
+            client_location="United States",
+            job_url=f"https://www.upwork.com/jobs/~{i}",
+            job_id=f"bench-serialization-{i}",
+            pricing_details={"type": "Hourly", "min": 15.0, "max": 40.0},
+            rating=4.5,
+        )
+        for i in range(count)
+    ]
+
+
+def serializer_path(queryset):
+    data = JobSerializer(queryset, many=True).data
+    return data, JSONRenderer()
+
+
+def fast_path(queryset):
+    data = fast_rows(queryset.values(*value_columns(JobSerializer)), JobSerializer)
+    return data, ORJSONRenderer()
+
+
+class Command(BaseCommand):
+    help = (
+        "Per-row cost of serializing and rendering jobs: ModelSerializer + "
+        "JSONRenderer vs values() + orjson. The seeded rows are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1000)
+        parser.add_argument(
+            "--repeat", type=int, default=5, help="Runs per path (best is kept)"
+        )
+
+    def handle(self, *args, **options):
+        rows = options["rows"]
+        with transaction.atomic():
+            Job.objects.bulk_create(make_jobs(rows), batch_size=500)
+            queryset = Job.objects.order_by("id")
+
+            self.stdout.write(
+                f"{'path':<12} {'fetch+serialize us/row':>24} {'render us/row':>15} "
+                f"{'total us/row':>14}"
+            )
+            outputs = []
+            for name, path in (("serializer", serializer_path), ("fast", fast_path)):
+                best_serialize = best_render = float("inf")
+                for _ in range(options["repeat"]):
+                    started = time.perf_counter()
+                    data, renderer = path(queryset.all())
+                    serialized = time.perf_counter()
+                    body = renderer.render(data)
+                    rendered = time.perf_counter()
+                    best_serialize = min(best_serialize, serialized - started)
+                    best_render = min(best_render, rendered - serialized)
+                outputs.append(body)
+                serialize_us = best_serialize / rows * 1e6
+                render_us = best_render / rows * 1e6
+                self.stdout.write(
+                    f"{name:<12} {serialize_us:>24.1f} {render_us:>15.1f} "
+                    f"{serialize_us + render_us:>14.1f}"
+                )
+            transaction.set_rollback(True)
+
+        identical = "yes" if outputs[0] == outputs[1] else "NO"
+        self.stdout.write(f"identical output: {identical}")
+        self.stdout.write(f"database: {connection.vendor}")
@@ -0,0 +1,167 @@
+import asyncio
+import time
+from pathlib import Path
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Prefetch
+from api.models import Job, Comment, LLMResponse, LLMCall
+from api.utils.LLM import (
+    MODEL_NAME,
+    PROMPT_VERSION,
+    COMMENT_FIELDS,
+    build_payload,
+    build_messages,
+    parse_content,
+)
+from api.utils.detail_cache import invalidate_job_detail
+from api.utils.enrichment import build_llm_response
+from api.utils.llm_cache import make_cache_key, get_cached_response, store_response
+from api.utils.llm_client import ainvoke_llm, async_pool, close_async_pool
+from api.utils.llm_ledger import build_call
+from api.utils.prompt_budget import count_tokens
+
+
+async def enrich_batch(payloads, concurrency):
+    """
+    Call the model for every `(job, data, prompt_tokens)` with at most
+    `concurrency` requests in flight. Returns `(job, content, call, error)`
+    tuples, `call` being the unsaved LLMCall ledger row.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def enrich(job, data, prompt_tokens):
+        async with semaphore:
+            started = time.perf_counter()
+            response = None
+            try:
+                response = await ainvoke_llm(MODEL_NAME, build_messages(data))
+                content = parse_content(response.content)
+                outcome, error = LLMCall.SUCCESS, None
+            except Exception as e:
+                content = None
+                # A response that arrived but did not parse is INVALID
+                outcome = LLMCall.ERROR if response is None else LLMCall.INVALID
+                error = e
+            call = build_call(
+                job, MODEL_NAME, PROMPT_VERSION, time.perf_counter() - started, outcome,
+                response=response, prompt_tokens=prompt_tokens,
+                error=None if error is None else str(error),
+            )
+            return job, content, call, error
+
+    return await asyncio.gather(*(enrich(*payload) for payload in payloads))
+
+
+class Command(BaseCommand):
+    help = "Enrich every job that has no LLMResponse yet, calling the model concurrently."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency", type=int, default=8, help="Model calls in flight"
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=100, help="Jobs per batch / checkpoint"
+        )
+        parser.add_argument(
+            "--limit", type=int, default=None, help="Stop after this many jobs"
+        )
+        parser.add_argument(
+            "--checkpoint",
+            default=".enrich_jobs.checkpoint",
+            help="File storing the last processed job id",
+        )
+        parser.add_argument(
+            "--restart", action="store_true", help="Ignore an existing checkpoint"
+        )
+
+    def handle(self, *args, **options):
+        checkpoint = Path(options["checkpoint"])
+        last_id = 0
+        if checkpoint.exists() and not options["restart"]:
+            last_id = int(checkpoint.read_text().strip() or 0)
+            self.stdout.write(f"Resuming after job id {last_id}")
+
+        comments = Comment.objects.only("job", *COMMENT_FIELDS)
+        pending = (
+            Job.objects.filter(llm_responses__isnull=True)
+            .prefetch_related(Prefetch("comments", queryset=comments))
+            .order_by("id")
+        )
+
+        done = failed = cached = 0
+        started = time.perf_counter()
+        # One loop for the whole run, so the pooled async client (see
+        # `async_pool`) keeps its connections between batches
+        loop = asyncio.new_event_loop()
+        try:
+            while options["limit"] is None or done + failed < options["limit"]:
+                size = options["batch_size"]
+                if options["limit"] is not None:
+                    size = min(size, options["limit"] - done - failed)
+                jobs = list(pending.filter(id__gt=last_id)[:size])
+                if not jobs:
+                    break
+
+                responses = []
+                payloads = []
+                keys = {}
+                prompt_tokens = {}
+                for job in jobs:
+                    history = [
+                        {field: getattr(comment, field) for field in COMMENT_FIELDS}
+                        for comment in job.comments.all()
+                    ]
+                    data = build_payload(job, history)
+                    prompt_tokens[job.pk] = count_tokens(build_messages(data)[0]["content"])
+                    keys[job.pk] = make_cache_key(PROMPT_VERSION, MODEL_NAME, data)
+                    hit = get_cached_response(keys[job.pk])
+                    if hit is not None:
+                        responses.append(
+                            build_llm_response(
+                                job, {**hit, "prompt_tokens": prompt_tokens[job.pk]}
+                            )
+                        )
+                        cached += 1
+                    else:
+                        payloads.append((job, data, prompt_tokens[job.pk]))
+
+                with async_pool():
+                    results = loop.run_until_complete(
+                        enrich_batch(payloads, options["concurrency"])
+                    )
+                calls = []
+                for job, response, call, error in results:
+                    calls.append(call)
+                    if error is not None:
+                        failed += 1
+                        self.stderr.write(f"Job {job.job_id} failed: {error}")
+                        continue
+                    store_response(keys[job.pk], MODEL_NAME, response, call.latency)
+                    responses.append(
+                        build_llm_response(
+                            job, {**response, "prompt_tokens": prompt_tokens[job.pk]}
+                        )
+                    )
+
+                with transaction.atomic():
+                    LLMResponse.objects.bulk_create(responses)
+                    LLMCall.objects.bulk_create(calls)
+                # bulk_create sends no post_save
+                invalidate_job_detail(*(response.job_id for response in responses))
+                done += len(responses)
+
+                last_id = jobs[-1].pk
+                checkpoint.write_text(str(last_id))
+
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f"{done} enriched ({cached} cached), {failed} failed, "
+                    f"{(done + failed) / elapsed * 60:.1f} jobs/min"
+                )
+        finally:
+            loop.run_until_complete(close_async_pool())
+            loop.close()
+
+        if options["limit"] is None:
+            checkpoint.unlink(missing_ok=True)  # Finished, next run starts over
+        self.stdout.write(self.style.SUCCESS(f"Done: {done} enriched, {failed} failed"))
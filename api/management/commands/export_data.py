@@ -0,0 +1,37 @@
+import sys
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.exceptions import ValidationError
+from api.utils.export import EXPORT_MODELS, EXPORT_FORMATS, export_queryset, iter_export
+
+
+class Command(BaseCommand):
+    help = "Stream a table to a file (or stdout) as NDJSON or CSV with constant memory."
+
+    def add_arguments(self, parser):
+        parser.add_argument("table", choices=list(EXPORT_MODELS))
+        parser.add_argument("--output", choices=list(EXPORT_FORMATS), default="ndjson")
+        parser.add_argument("--gzip", action="store_true", help="Gzip on the fly")
+        parser.add_argument("--updated-since", help="ISO datetime, inclusive")
+        parser.add_argument("--updated-until", help="ISO datetime, exclusive")
+        parser.add_argument("--file", help="Destination path (default: stdout)")
+
+    def handle(self, *args, **options):
+        try:
+            queryset = export_queryset(
+                options["table"], options["updated_since"], options["updated_until"]
+            )
+            chunks = iter_export(queryset, options["output"], options["gzip"])
+        except ValidationError as e:
+            raise CommandError(e.detail[0])
+
+        destination = open(options["file"], "wb") if options["file"] else sys.stdout.buffer
+        written = 0
+        try:
+            for chunk in chunks:
+                destination.write(chunk)
+                written += len(chunk)
+        finally:
+            if options["file"]:
+                destination.close()
+        if options["file"]:
+            self.stderr.write(f"Wrote {written} bytes to {options['file']}")
@@ -0,0 +1,63 @@
+import threading
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from api.utils.enrichment import claim_next_task, run_task
+
+
+class Command(BaseCommand):
+    help = "Process queued LLM enrichment tasks."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=settings.ENRICHMENT_WORKER_CONCURRENCY,
+            help="Number of tasks processed in parallel",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=2.0,
+            help="Seconds to wait when the queue is empty",
+        )
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="Exit once the queue is empty instead of polling forever",
+        )
+
+    def handle(self, *args, **options):
+        stop = threading.Event()
+        threads = [
+            threading.Thread(target=self.work, args=(stop, options), daemon=True)
+            for _ in range(max(1, options["concurrency"]))
+        ]
+        self.stdout.write(f"Starting {len(threads)} enrichment worker(s)")
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(timeout=1)
+        except KeyboardInterrupt:
+            self.stdout.write("Stopping after in-flight tasks finish...")
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+    def work(self, stop, options):
+        try:
+            while not stop.is_set():
+                task = claim_next_task()
+                if task is None:
+                    if options["burst"]:
+                        return
+                    stop.wait(options["poll_interval"])
+                    continue
+                task = run_task(task)
+                self.stdout.write(
+                    f"Task {task.pk} (job {task.job.job_id}): {task.status}"
+                )
+        finally:
+            connection.close()
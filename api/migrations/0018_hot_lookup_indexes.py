@@ -0,0 +1,36 @@
+# Generated by Django 5.1.1 on 2026-10-18 12:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0017_job_created_id_idx'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='llmresponse',
+            options={'ordering': ['-created_at']},
+        ),
+        migrations.AlterField(
+            model_name='comment',
+            name='job',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='comments', to='api.job'),
+        ),
+        migrations.AlterField(
+            model_name='llmresponse',
+            name='job',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='llm_responses', to='api.job'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['job', 'created_at'], name='comment_job_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='llmresponse',
+            index=models.Index(fields=['job', '-created_at'], name='llmresponse_job_created_idx'),
+        ),
+    ]
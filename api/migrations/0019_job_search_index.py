@@ -0,0 +1,81 @@
+from django.db import migrations
+
+# The search index is managed in raw SQL, outside the model fields, see
+# api/utils/search.py. Postgres gets a weighted tsvector column with a GIN
+# index, SQLite an FTS5 table keyed by job id. Other backends are skipped.
+# The backfill SQL is a copy of search.py's as of this migration, so later
+# changes there do not change what this migration does.
+
+POSTGRES_FORWARD = [
+    "ALTER TABLE api_job ADD COLUMN search_vector tsvector",
+    "CREATE INDEX job_search_vector_idx ON api_job USING GIN (search_vector)",
+]
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS job_search_vector_idx",
+    "ALTER TABLE api_job DROP COLUMN IF EXISTS search_vector",
+]
+SQLITE_FORWARD = [
+    "CREATE VIRTUAL TABLE api_job_fts USING fts5("
+    "title, skills, description, feedback, tokenize='porter unicode61')",
+]
+SQLITE_BACKWARD = [
+    "DROP TABLE IF EXISTS api_job_fts",
+]
+
+POSTGRES_BACKFILL = """
+UPDATE api_job SET search_vector =
+    setweight(to_tsvector('english', coalesce(api_job.title, '')), 'A')
+    || setweight(to_tsvector('english', coalesce(api_job.skills::text, '')), 'B')
+    || setweight(to_tsvector('english', coalesce(api_job.description, '')), 'C')
+    || setweight(to_tsvector('english', coalesce((
+        SELECT string_agg(
+            coalesce(c.client_feedback, '') || ' ' || coalesce(c.freelancer_feedback, ''),
+            ' '
+        )
+        FROM api_comment c WHERE c.job_id = api_job.id
+    ), '')), 'D')
+"""
+SQLITE_BACKFILL = """
+INSERT INTO api_job_fts (rowid, title, skills, description, feedback)
+SELECT api_job.id, api_job.title, api_job.skills, api_job.description, (
+    SELECT group_concat(
+        coalesce(c.client_feedback, '') || ' ' || coalesce(c.freelancer_feedback, ''),
+        ' '
+    )
+    FROM api_comment c WHERE c.job_id = api_job.id
+)
+FROM api_job
+"""
+
+
+def _run(schema_editor, statements):
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def create_search_index(apps, schema_editor):
+    # Index the jobs that already exist
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        _run(schema_editor, POSTGRES_FORWARD + [POSTGRES_BACKFILL])
+    elif vendor == "sqlite":
+        _run(schema_editor, SQLITE_FORWARD + [SQLITE_BACKFILL])
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        _run(schema_editor, POSTGRES_BACKWARD)
+    elif vendor == "sqlite":
+        _run(schema_editor, SQLITE_BACKWARD)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0018_hot_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,98 @@
+# Generated by Django 5.1.1 on 2026-10-18 12:52
+
+from collections import Counter
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+# jsonb_path_ops GIN indexes serve `skills @> '["Python"]'` containment
+# filters. Postgres only; other backends filter through JobSkill.
+POSTGRES_FORWARD = [
+    "CREATE INDEX job_skills_gin_idx ON api_job USING GIN (skills jsonb_path_ops)",
+    "CREATE INDEX job_list_skills_gin_idx ON api_job_list USING GIN (skills jsonb_path_ops)",
+]
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS job_skills_gin_idx",
+    "DROP INDEX IF EXISTS job_list_skills_gin_idx",
+]
+
+
+def create_skill_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        for statement in POSTGRES_FORWARD:
+            schema_editor.execute(statement)
+
+
+def drop_skill_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        for statement in POSTGRES_BACKWARD:
+            schema_editor.execute(statement)
+
+
+def backfill_skills(apps, schema_editor):
+    # Same rules as api.utils.skills as of this migration: distinct names,
+    # kept verbatim, at most Skill.name's max_length characters
+    Job = apps.get_model("api", "Job")
+    Skill = apps.get_model("api", "Skill")
+    JobSkill = apps.get_model("api", "JobSkill")
+
+    job_skills = []
+    counts = Counter()
+    for job_pk, skills in Job.objects.values_list("id", "skills").iterator(
+        chunk_size=BATCH_SIZE
+    ):
+        names = []
+        for skill in skills or []:
+            if isinstance(skill, str) and 0 < len(skill) <= 200 and skill not in names:
+                names.append(skill)
+        job_skills.extend((job_pk, name) for name in names)
+        counts.update(names)
+
+    Skill.objects.bulk_create(
+        [Skill(name=name, job_count=count) for name, count in counts.items()],
+        batch_size=BATCH_SIZE,
+    )
+    skill_ids = {skill.name: skill.id for skill in Skill.objects.all()}
+    JobSkill.objects.bulk_create(
+        [
+            JobSkill(job_id=job_pk, skill_id=skill_ids[name])
+            for job_pk, name in job_skills
+        ],
+        batch_size=BATCH_SIZE,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0019_job_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Skill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200, unique=True)),
+                ('job_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-job_count', 'name'], name='skill_job_count_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='JobSkill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='job_skills', to='api.job')),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='job_skills', to='api.skill')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('job', 'skill'), name='jobskill_job_skill_uniq')],
+            },
+        ),
+        migrations.RunPython(create_skill_indexes, drop_skill_indexes),
+        migrations.RunPython(backfill_skills, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.1.1 on 2026-10-18 12:55
+
+import hashlib
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import migrations, models
+
+
+# Job_List.hash_content as of this migration
+UNHASHED_FIELDS = {"id", "content_hash", "created_at", "updated_at"}
+
+
+def hash_content(job):
+    values = {
+        field.attname: getattr(job, field.attname)
+        for field in job._meta.concrete_fields
+        if field.attname not in UNHASHED_FIELDS
+    }
+    encoded = json.dumps(values, sort_keys=True, cls=DjangoJSONEncoder)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def backfill_content_hash(apps, schema_editor):
+    Job_List = apps.get_model("api", "Job_List")
+    batch = []
+    for job in Job_List.objects.iterator(chunk_size=1000):
+        job.content_hash = hash_content(job)
+        batch.append(job)
+        if len(batch) == 1000:
+            Job_List.objects.bulk_update(batch, ["content_hash"])
+            batch = []
+    Job_List.objects.bulk_update(batch, ["content_hash"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0020_skill_facets'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job_list',
+            name='content_hash',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.RunPython(backfill_content_hash, migrations.RunPython.noop),
+    ]
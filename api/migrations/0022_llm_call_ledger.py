@@ -0,0 +1,34 @@
+# Generated by Django 5.1.1 on 2026-10-18 13:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0021_job_list_content_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LLMCall',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=100)),
+                ('prompt_version', models.CharField(max_length=20)),
+                ('prompt_tokens', models.PositiveIntegerField(blank=True, null=True)),
+                ('completion_tokens', models.PositiveIntegerField(blank=True, null=True)),
+                ('latency', models.FloatField()),
+                ('outcome', models.CharField(choices=[('success', 'Success'), ('invalid', 'Invalid response'), ('error', 'Error')], max_length=20)),
+                ('retries', models.PositiveIntegerField(default=0)),
+                ('cost', models.FloatField(blank=True, null=True)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('job', models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='llm_calls', to='api.job')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['created_at'], name='llmcall_created_idx'), models.Index(fields=['job', '-created_at'], name='llmcall_job_created_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.1 on 2026-10-18 13:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0022_llm_call_ledger'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EnrichmentLease',
+            fields=[
+                ('job', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='enrichment_lease', serialize=False, to='api.job')),
+                ('owner', models.CharField(max_length=32)),
+                ('expires_at', models.DateTimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
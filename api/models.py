@@ -1,6 +1,13 @@
+import hashlib
+import json
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.utils import timezone
 from datetime import date
 
+# Bookkeeping columns left out of Job_List.content_hash
+JOB_LIST_UNHASHED_FIELDS = {"id", "content_hash", "created_at", "updated_at"}
+
 
 class Job_List(models.Model):
     job_id = models.CharField(max_length=200, default="184064313115", unique=True)
@@ -14,6 +21,8 @@ class Job_List(models.Model):
     description = models.TextField(null=True)
     skills = models.JSONField(default=list)
     proposals = models.JSONField(default=dict)
+    # sha256 of the scraped fields, lets re-ingest skip unchanged rows
+    content_hash = models.CharField(max_length=64, blank=True, default="")
 
     created_at = models.DateTimeField(auto_now_add=True)  # Created at
     updated_at = models.DateTimeField(auto_now=True)  # Updated at
@@ -21,6 +30,22 @@ class Job_List(models.Model):
     def __str__(self):
         return self.title
 
+    def hash_content(self):
+        values = {
+            field.attname: getattr(self, field.attname)
+            for field in self._meta.concrete_fields
+            if field.attname not in JOB_LIST_UNHASHED_FIELDS
+        }
+        encoded = json.dumps(values, sort_keys=True, cls=DjangoJSONEncoder)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    def save(self, *args, **kwargs):
+        self.content_hash = self.hash_content()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, "content_hash"}
+        super().save(*args, **kwargs)
+
 
 class Job(models.Model):
     title = models.CharField(max_length=200)
@@ -36,12 +61,21 @@ class Job(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)  # Created at
     updated_at = models.DateTimeField(auto_now=True)  # Updated at
 
+    class Meta:
+        indexes = [
+            # Keyset pagination of /jobs/ (see api.pagination.KeysetPagination)
+            models.Index(fields=["-created_at", "-id"], name="job_created_id_idx"),
+        ]
+
     def __str__(self):
         return self.title
 
 
 class Comment(models.Model):
-    job = models.ForeignKey(Job, related_name="comments", on_delete=models.CASCADE)
+    # Indexed by comment_job_created_idx, which leads with job
+    job = models.ForeignKey(
+        Job, related_name="comments", on_delete=models.CASCADE, db_index=False
+    )
     url = models.URLField(null=True, blank=True)
     rating = models.FloatField(blank=True, null=True)
     billed_amount = models.CharField(
@@ -56,21 +90,189 @@ class Comment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["job", "created_at"], name="comment_job_created_idx"),
+        ]
+
     def __str__(self):
         return self.job_title
 
 
 class LLMResponse(models.Model):
-    job = models.ForeignKey(Job, related_name="llm_responses", on_delete=models.CASCADE)
+    # Indexed by llmresponse_job_created_idx, which leads with job
+    job = models.ForeignKey(
+        Job, related_name="llm_responses", on_delete=models.CASCADE, db_index=False
+    )
     # array of client names
     client_names = models.JSONField(default=list, blank=True, null=True)
     keywords = models.JSONField(default=list, blank=True, null=True)
     company = models.CharField(max_length=200, null=True, blank=True)
     client_location = models.CharField(max_length=200, null=True, blank=True)
     other_data = models.JSONField(default=dict, blank=True, null=True)
+    prompt_tokens = models.PositiveIntegerField(null=True, blank=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        # Latest enrichment first: `job.llm_responses.first()` is one index lookup
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["job", "-created_at"], name="llmresponse_job_created_idx"),
+        ]
+
     def __str__(self):
         return self.name
+
+
+class Skill(models.Model):
+    name = models.CharField(max_length=200, unique=True)
+    # Jobs listing this skill, kept current by api.utils.skills.sync_job_skills
+    job_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            # Unfiltered top-N facet is an index scan of N rows
+            models.Index(fields=["-job_count", "name"], name="skill_job_count_idx"),
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+class JobSkill(models.Model):
+    # Indexed by jobskill_job_skill_uniq, which leads with job
+    job = models.ForeignKey(
+        Job, related_name="job_skills", on_delete=models.CASCADE, db_index=False
+    )
+    skill = models.ForeignKey(Skill, related_name="job_skills", on_delete=models.CASCADE)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["job", "skill"], name="jobskill_job_skill_uniq"),
+        ]
+
+    def __str__(self):
+        return f"{self.job_id}: {self.skill_id}"
+
+
+class EnrichmentTask(models.Model):
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    ]
+
+    job = models.ForeignKey(
+        Job, related_name="enrichment_tasks", on_delete=models.CASCADE
+    )
+    status = models.CharField(
+        max_length=20, choices=STATUS_CHOICES, default=PENDING
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    last_error = models.TextField(null=True, blank=True)
+    run_after = models.DateTimeField(default=timezone.now)  # Retry backoff
+    locked_at = models.DateTimeField(null=True, blank=True)  # Worker lease
+    llm_response = models.ForeignKey(
+        LLMResponse, null=True, blank=True, on_delete=models.SET_NULL
+    )
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "run_after"])]
+
+    def __str__(self):
+        return f"{self.job_id}: {self.status}"
+
+
+class EnrichmentLease(models.Model):
+    """
+    Held by the one request that is enriching a job inline (job detail
+    and job page). Other requests for the same job wait for it to be
+    released instead of calling the model again; the primary key makes
+    taking it a single INSERT that only one caller can win.
+    """
+
+    job = models.OneToOneField(
+        Job, related_name="enrichment_lease", on_delete=models.CASCADE, primary_key=True
+    )
+    owner = models.CharField(max_length=32)  # Random token of the holder
+    expires_at = models.DateTimeField()  # Taken over after this (crashed holder)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.job_id}: {self.owner}"
+
+
+class LLMCacheEntry(models.Model):
+    # sha256 of prompt version, model name and the serialized payload
+    key = models.CharField(max_length=64, unique=True)
+    model = models.CharField(max_length=100)
+    response = models.JSONField(default=dict)
+    latency = models.FloatField(default=0.0)  # Seconds the original call took
+    hits = models.PositiveIntegerField(default=0)
+    last_used_at = models.DateTimeField(default=timezone.now)  # For LRU eviction
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["last_used_at"])]
+
+    def __str__(self):
+        return self.key
+
+
+class LLMCall(models.Model):
+    """
+    One model call (cache hits make none): what it cost and how it went.
+    """
+
+    SUCCESS = "success"
+    INVALID = "invalid"  # The model answered, but not with parseable JSON
+    ERROR = "error"  # The call itself failed (timeout, API error, ...)
+    OUTCOME_CHOICES = [
+        (SUCCESS, "Success"),
+        (INVALID, "Invalid response"),
+        (ERROR, "Error"),
+    ]
+
+    # Indexed by llmcall_job_created_idx, which leads with job. Kept when
+    # the job is deleted, the money was spent either way.
+    job = models.ForeignKey(
+        Job,
+        related_name="llm_calls",
+        null=True,
+        on_delete=models.SET_NULL,
+        db_index=False,
+    )
+    model = models.CharField(max_length=100)
+    prompt_version = models.CharField(max_length=20)
+    prompt_tokens = models.PositiveIntegerField(null=True, blank=True)
+    completion_tokens = models.PositiveIntegerField(null=True, blank=True)
+    latency = models.FloatField()  # Seconds
+    outcome = models.CharField(max_length=20, choices=OUTCOME_CHOICES)
+    retries = models.PositiveIntegerField(default=0)  # Earlier failed attempts
+    cost = models.FloatField(null=True, blank=True)  # Estimated, USD
+    error = models.TextField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at"], name="llmcall_created_idx"),
+            models.Index(fields=["job", "-created_at"], name="llmcall_job_created_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.job_id}: {self.model} {self.outcome}"
@@ -0,0 +1,47 @@
+import orjson
+from rest_framework.renderers import JSONRenderer
+
+# Dates go through DRF's encoder (ISO 8601, "Z" for UTC) instead of
+# orjson's own format; dict keys may be ints like with json.dumps.
+ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that encodes with orjson.
+
+    The output is byte-for-byte what JSONRenderer produces with the compact
+    / unicode defaults, except for floats that need an exponent (below 1e-4
+    or from 1e16 up), which orjson writes in an equivalent shorter form
+    (`1e16` rather than `1e+16`). Indented output and payloads orjson cannot
+    encode (e.g. integers over 64 bits) fall back to JSONRenderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        encoder = self.encoder_class()
+        try:
+            ret = orjson.dumps(data, default=encoder.default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Same strict-javascript-subset escaping as JSONRenderer
+        if b"\xe2\x80" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+                b"\xe2\x80\xa9", b"\\u2029"
+            )
+        return ret
+
+
+def sse_event(event, data):
+    """
+    One server-sent event: `event: <event>` and `data` as a single line of
+    JSON (orjson never writes newlines in compact mode).
+    """
+    payload = orjson.dumps(data, default=JSONRenderer.encoder_class().default, option=ORJSON_OPTIONS)
+    return b"event: " + event.encode("ascii") + b"\ndata: " + payload + b"\n\n"
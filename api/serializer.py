@@ -1,15 +1,38 @@
 from rest_framework import serializers
 
-from .models import Job_List, Job, Comment, LLMResponse
+from .models import Job_List, Job, Comment, LLMResponse, EnrichmentTask
 
 
-class JobListSerializer(serializers.ModelSerializer):
+class FieldsetMixin:
+    """
+    Accepts `fields=[...]` to serialize only a subset of the declared fields
+    (see api.utils.fieldsets).
+    """
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class JobListSerializer(FieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Job_List
         fields = "__all__"
+        read_only_fields = ["content_hash"]
 
 
-class JobSerializer(serializers.ModelSerializer):
+class JobListIngestSerializer(serializers.ModelSerializer):
+    # job_id uniqueness is checked for the whole batch with one query
+    class Meta:
+        model = Job_List
+        fields = "__all__"
+        read_only_fields = ["content_hash"]
+        extra_kwargs = {"job_id": {"validators": []}}
+
+
+class JobSerializer(FieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Job
         fields = "__all__"
@@ -20,7 +43,21 @@ class CommentSerializer(serializers.ModelSerializer):
         model = Comment
         fields = "__all__"
 
+
+class CommentIngestSerializer(serializers.ModelSerializer):
+    # The job is resolved once per batch by the view
+    class Meta:
+        model = Comment
+        exclude = ["job"]
+
+
 class LLMResponseSerializer(serializers.ModelSerializer):
     class Meta:
         model = LLMResponse
-        fields = "__all__"
\ No newline at end of file
+        fields = "__all__"
+
+
+class EnrichmentTaskSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = EnrichmentTask
+        fields = ["id", "job", "status", "attempts", "last_error", "llm_response"]
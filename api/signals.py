@@ -0,0 +1,52 @@
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import receiver
+from .models import Job, Comment, LLMResponse
+from .utils.detail_cache import invalidate_job_detail
+from .utils.metrics import install_db_timing
+from .utils.search import refresh_search_index, remove_from_search_index
+from .utils.skills import sync_job_skills, release_job_skills
+
+
+@receiver([post_save, post_delete], sender=Job)
+def invalidate_job(sender, instance, **kwargs):
+    invalidate_job_detail(instance.pk, job_ids=[instance.job_id])
+
+
+@receiver([post_save, post_delete], sender=Comment)
+@receiver([post_save, post_delete], sender=LLMResponse)
+def invalidate_job_children(sender, instance, **kwargs):
+    invalidate_job_detail(instance.job_id)
+
+
+@receiver(post_save, sender=Job)
+def index_job(sender, instance, raw=False, **kwargs):
+    if not raw:
+        refresh_search_index([instance.pk])
+
+
+@receiver(post_delete, sender=Job)
+def unindex_job(sender, instance, **kwargs):
+    remove_from_search_index([instance.pk])
+
+
+@receiver([post_save, post_delete], sender=Comment)
+def reindex_comment_job(sender, instance, raw=False, **kwargs):
+    if not raw:
+        refresh_search_index([instance.job_id])
+
+
+@receiver(post_save, sender=Job)
+def count_job_skills(sender, instance, raw=False, update_fields=None, **kwargs):
+    if not raw and (update_fields is None or "skills" in update_fields):
+        sync_job_skills(instance)
+
+
+@receiver(pre_delete, sender=Job)
+def uncount_job_skills(sender, instance, **kwargs):
+    release_job_skills(instance)
+
+
+@receiver(connection_created)
+def time_queries(sender, connection, **kwargs):
+    install_db_timing(connection)
@@ -0,0 +1,23 @@
+import shutil
+import tempfile
+from django.test import override_settings
+from django.test.runner import DiscoverRunner
+from api.utils.detail_cache import private_caches
+
+
+class TestRunner(DiscoverRunner):
+    """
+    Runs the tests against a job detail cache of their own: the configured
+    one is shared with the servers running on the host.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.cache_dir = tempfile.mkdtemp(prefix="job_detail_test_")
+        self.cache_settings = override_settings(CACHES=private_caches(self.cache_dir))
+        self.cache_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.cache_settings.disable()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        super().teardown_test_environment(**kwargs)
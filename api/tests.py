@@ -1,3 +1,1449 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+import asyncio
+import csv
+import gzip
+import json
+import re
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management import call_command, CommandError
+from django.db import connection
+from django.test import TestCase, SimpleTestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.http import QueryDict
+from django.urls import reverse
+from django.utils.http import http_date
+from django.utils import timezone
+from langchain_core.messages import AIMessageChunk
+
+from .models import (
+    Job_List,
+    Job,
+    Comment,
+    LLMResponse,
+    EnrichmentTask,
+    EnrichmentLease,
+    Skill,
+    LLMCall,
+)
+from .utils.LLM import LLM
+from .utils import detail_cache, llm_client, metrics
+from .utils.conditional import job_detail_validators
+from .utils.enrichment import enqueue_enrichment, claim_next_task, run_task, acquire_lease
+from .utils.ingest import bulk_ingest_job_list, bulk_ingest_comments
+from .utils.llm_client import (
+    ConcurrencyGate,
+    RateLimiter,
+    TokenBucket,
+    invoke_llm,
+    reset_llm_client,
+)
+from .utils.llm_ledger import ledger_summary, parse_windows
+from .utils.openai_stub import OpenAIStubServer
+from .utils.prompt_budget import (
+    count_tokens,
+    get_encoding,
+    pack_comments,
+    TRUNCATION_MARKER,
+)
+from .views import aget_job_detail_data, cache_job_detail
+
+
+def job_list_data(job_id, **extra):
+    return {
+        "job_id": job_id,
+        "title": f"Job {job_id}",
+        "posted_time": "1 hour ago",
+        "location": "India",
+        **extra,
+    }
+
+
+def answer_chunks(content, piece=8):
+    """
+    AIMessageChunks of a streamed model answer, usage in the last one.
+    """
+    chunks = [
+        AIMessageChunk(content=content[i : i + piece]) for i in range(0, len(content), piece)
+    ]
+    usage = {"input_tokens": 100, "output_tokens": 50, "total_tokens": 150}
+    return chunks + [AIMessageChunk(content="", usage_metadata=usage)]
+
+
+def parse_sse(body):
+    """
+    `[(event, data)]` of a server-sent events body.
+    """
+    events = []
+    for block in body.decode().strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def sse_events(response):
+    return parse_sse(b"".join(response.streaming_content))
+
+
+class BulkIngestTests(TestCase):
+    def test_new_duplicate_and_invalid_rows(self):
+        Job_List.objects.create(**job_list_data("1"))
+        jobs = [
+            job_list_data("1"),
+            job_list_data("2"),
+            job_list_data("2"),
+            job_list_data("3", total_spent="not a number"),
+            {"title": "missing job id"},
+        ]
+
+        # validation is in memory: one IN lookup plus the batched insert
+        with self.assertNumQueries(4):  # + SAVEPOINT / RELEASE
+            result = bulk_ingest_job_list(jobs)
+
+        self.assertEqual(
+            (result["created"], result["skipped"], result["invalid"]), (1, 2, 2)
+        )
+        self.assertEqual([error["index"] for error in result["errors"]], [3, 4])
+        self.assertTrue(Job_List.objects.filter(job_id="2").exists())
+
+    def test_rows_stored_concurrently_are_not_counted(self):
+        Job_List.objects.create(**job_list_data("1"))
+
+        # Stored by another ingest between the lookup and the insert
+        with mock.patch("api.utils.ingest.existing_job_ids", return_value=set()):
+            result = bulk_ingest_job_list([job_list_data("1"), job_list_data("2")])
+
+        self.assertEqual((result["created"], result["skipped"]), (1, 1))
+        self.assertEqual(Job_List.objects.count(), 2)
+
+
+class UpsertIngestTests(TestCase):
+    def test_only_changed_rows_are_written(self):
+        Job_List.objects.create(**job_list_data("1", proposals={"count": "5"}))
+        Job_List.objects.create(**job_list_data("2"))
+        before = dict(Job_List.objects.values_list("job_id", "updated_at"))
+        jobs = [
+            job_list_data("1", proposals={"count": "10"}),
+            job_list_data("2"),
+            job_list_data("3"),
+        ]
+
+        # hash lookup, insert, one UPDATE for the changed row (+ savepoint)
+        with self.assertNumQueries(5):
+            result = bulk_ingest_job_list(jobs, upsert=True)
+
+        self.assertEqual(
+            (result["created"], result["updated"], result["unchanged"]), (1, 1, 1)
+        )
+        self.assertEqual(result["churn_rate"], 0.5)
+        changed = Job_List.objects.get(job_id="1")
+        self.assertEqual(changed.proposals, {"count": "10"})
+        self.assertEqual(changed.content_hash, changed.hash_content())
+        self.assertGreater(changed.updated_at, before["1"])
+        self.assertEqual(Job_List.objects.get(job_id="2").updated_at, before["2"])
+
+        # a second identical scrape writes nothing
+        with self.assertNumQueries(1):
+            result = bulk_ingest_job_list(jobs, upsert=True)
+        self.assertEqual((result["unchanged"], result["churn_rate"]), (3, 0.0))
+
+    def test_insert_mode_keeps_skipping(self):
+        Job_List.objects.create(**job_list_data("1"))
+        result = bulk_ingest_job_list([job_list_data("1", title="New")])
+        self.assertEqual((result["skipped"], result["updated"]), (1, 0))
+        self.assertEqual(Job_List.objects.get(job_id="1").title, "Job 1")
+
+
+class CommentIngestTests(TestCase):
+    @mock.patch("api.utils.enrichment.LLM")
+    def test_batch_reports_invalid_items(self, llm):
+        job = Job.objects.create(title="Scraper", job_id="42")
+        comments = [
+            {"job_title": "Old job", "rating": 5},
+            {"job_title": "Bad rating", "rating": "five"},
+            {"job_title": "Another old job", "posted_on": "Jan 2024"},
+        ]
+
+        response = self.client.post(
+            reverse("job_comment"),
+            {"job_id": "42", "comments": comments},
+            content_type="application/json",
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["created"], 2)
+        self.assertEqual(response.json()["errors"][0]["index"], 1)
+        self.assertEqual(Comment.objects.filter(job=job).count(), 2)
+        # enrichment is queued, not run inline
+        llm.assert_not_called()
+        self.assertEqual(response.json()["enrichment"]["status"], "pending")
+
+
+class EnrichmentQueueTests(TestCase):
+    def setUp(self):
+        self.job = Job.objects.create(title="Scraper", job_id="42")
+
+    def test_enqueue_reuses_pending_task(self):
+        self.assertEqual(enqueue_enrichment(self.job), enqueue_enrichment(self.job))
+
+    @mock.patch("api.utils.enrichment.LLM")
+    def test_success_saves_llm_response(self, llm):
+        llm.return_value = {"success": True, "company": "Acme", "work": "Scraping"}
+        enqueue_enrichment(self.job)
+
+        task = run_task(claim_next_task())
+
+        self.assertEqual(task.status, EnrichmentTask.DONE)
+        self.assertEqual(task.llm_response.company, "Acme")
+        self.assertEqual(task.llm_response.other_data, {"work": "Scraping"})
+        self.assertIsNone(claim_next_task())
+
+    @mock.patch("api.utils.enrichment.LLM", return_value={"success": False})
+    def test_failure_is_retried_then_failed(self, _llm):
+        task = enqueue_enrichment(self.job)
+        task.max_attempts = 2
+        task.save()
+
+        task = run_task(claim_next_task())
+        self.assertEqual((task.status, task.attempts), (EnrichmentTask.PENDING, 1))
+        # backoff keeps the task out of the queue until run_after
+        self.assertIsNone(claim_next_task())
+
+        EnrichmentTask.objects.update(run_after=task.created_at)
+        task = run_task(claim_next_task())
+        self.assertEqual((task.status, task.attempts), (EnrichmentTask.FAILED, 2))
+
+    def test_claim_counts_the_attempt(self):
+        enqueue_enrichment(self.job)
+
+        task = claim_next_task()
+        # Counted even if the worker crashes before recording an outcome
+        self.assertEqual(task.attempts, 1)
+        self.assertEqual(EnrichmentTask.objects.get().attempts, 1)
+
+    @mock.patch("api.utils.enrichment.LLM")
+    def test_reclaimed_task_keeps_new_owners_state(self, llm):
+        llm.return_value = {"success": True, "company": "Acme"}
+        enqueue_enrichment(self.job)
+        task = claim_next_task()
+        # Our lease expired and another worker claimed the task meanwhile
+        EnrichmentTask.objects.update(locked_at=timezone.now() + timedelta(seconds=1))
+
+        run_task(task)
+
+        self.assertEqual(EnrichmentTask.objects.get().status, EnrichmentTask.RUNNING)
+        self.assertFalse(LLMResponse.objects.exists())
+
+    @mock.patch("api.utils.enrichment.LLM")
+    def test_waits_for_inline_enrichment(self, llm):
+        enqueue_enrichment(self.job)
+        # A request is enriching the job
+        EnrichmentLease.objects.create(
+            job=self.job, owner="request", expires_at=timezone.now() + timedelta(minutes=5)
+        )
+
+        task = run_task(claim_next_task())
+
+        llm.assert_not_called()
+        self.assertEqual((task.status, task.attempts), (EnrichmentTask.PENDING, 0))
+        self.assertIsNone(claim_next_task())
+        self.assertEqual(EnrichmentLease.objects.get().owner, "request")
+
+    @mock.patch("api.utils.enrichment.LLM")
+    def test_existing_response_skips_model_call(self, llm):
+        enqueue_enrichment(self.job)
+        existing = LLMResponse.objects.create(job=self.job, company="Acme")
+
+        task = run_task(claim_next_task())
+
+        llm.assert_not_called()
+        self.assertEqual(task.status, EnrichmentTask.DONE)
+        self.assertEqual(task.llm_response, existing)
+        self.assertEqual(LLMResponse.objects.count(), 1)
+        self.assertFalse(EnrichmentLease.objects.exists())
+
+
+class LLMCacheTests(TestCase):
+    def setUp(self):
+        self.job = Job.objects.create(title="Scraper", job_id="42")
+
+    @mock.patch("api.utils.LLM.invoke_llm")
+    def test_identical_payload_skips_model_call(self, invoke):
+        invoke.return_value = mock.Mock(content='```json{"company": "Acme"}```')
+
+        first = LLM(job_id="42")
+        second = LLM(job_id="42")
+
+        self.assertEqual(first, second)
+        self.assertEqual(second["company"], "Acme")
+        invoke.assert_called_once()
+
+        # any change to the payload is a new key
+        Comment.objects.create(job=self.job, job_title="Old job")
+        LLM(job_id="42")
+        self.assertEqual(invoke.call_count, 2)
+
+
+class LLMLedgerTests(TestCase):
+    def setUp(self):
+        self.job = Job.objects.create(title="Scraper", job_id="42")
+
+    @mock.patch("api.utils.LLM.invoke_llm")
+    def test_calls_are_recorded(self, invoke):
+        invoke.return_value = mock.Mock(
+            content='{"company": "Acme"}',
+            usage_metadata={"input_tokens": 1000, "output_tokens": 100},
+        )
+        LLM(job_id="42")
+        LLM(job_id="42")  # Cached, no model call
+
+        invoke.return_value = mock.Mock(content="not json", usage_metadata=None)
+        Comment.objects.create(job=self.job, job_title="Old job")
+        LLM(job_id="42")
+
+        invoke.side_effect = TimeoutError("timed out")
+        Comment.objects.create(job=self.job, job_title="Another old job")
+        LLM(job_id="42", retries=2)
+
+        success, invalid, error = LLMCall.objects.order_by("id")
+        self.assertEqual(
+            (success.outcome, success.prompt_tokens, success.completion_tokens),
+            (LLMCall.SUCCESS, 1000, 100),
+        )
+        self.assertAlmostEqual(success.cost, (1000 * 2.50 + 100 * 10.00) / 1e6)
+        self.assertEqual(invalid.outcome, LLMCall.INVALID)
+        self.assertGreater(invalid.prompt_tokens, 0)  # Local estimate
+        self.assertEqual((error.outcome, error.retries), (LLMCall.ERROR, 2))
+        self.assertIn("timed out", error.error)
+
+    def test_summary(self):
+        other = Job.objects.create(title="Other", job_id="43")
+        for job, version, tokens, latency, age in [
+            (self.job, "1", 1000, 1.0, timedelta(minutes=5)),
+            (self.job, "1", 1000, 3.0, timedelta(minutes=10)),
+            (other, "2", 500, 2.0, timedelta(minutes=20)),
+            (other, "1", 4000, 9.0, timedelta(days=2)),
+        ]:
+            call = LLMCall.objects.create(
+                job=job,
+                model="gpt-4o",
+                prompt_version=version,
+                prompt_tokens=tokens,
+                completion_tokens=0,
+                latency=latency,
+                outcome=LLMCall.SUCCESS,
+                cost=tokens / 1000,
+            )
+            LLMCall.objects.filter(pk=call.pk).update(created_at=timezone.now() - age)
+
+        body = self.client.get(reverse("llm_calls"), {"windows": "1h,7d"}).json()
+
+        hour = body["windows"]["1h"]
+        self.assertEqual((hour["calls"], hour["jobs"]), (3, 2))
+        self.assertEqual(hour["latency_p50"], 2.0)
+        self.assertEqual(hour["tokens_per_job_p95"], 2000)
+        self.assertEqual(hour["by_prompt_version"]["2"]["calls"], 1)
+        self.assertEqual(body["windows"]["7d"]["latency_p95"], 9.0)
+        self.assertEqual(
+            [(job["job_id"], job["cost"]) for job in body["top_jobs"]],
+            [("43", 4.5), ("42", 2.0)],
+        )
+
+        # Aggregated in SQL: the same two queries for any number of windows
+        windows = parse_windows(QueryDict("windows=1h,24h,7d,30d"))
+        with self.assertNumQueries(2):
+            summary = ledger_summary(windows)
+        self.assertEqual(summary["windows"]["30d"]["prompt_tokens"], 6500)
+        self.assertEqual(summary["windows"]["24h"]["by_prompt_version"]["1"]["calls"], 2)
+
+        for windows in ("1y", "99999999999999999999d"):
+            response = self.client.get(reverse("llm_calls"), {"windows": windows})
+            self.assertEqual(response.status_code, 400)
+
+
+class LLMClientTests(SimpleTestCase):
+    messages = [{"role": "system", "content": "Describe the client"}]
+
+    def run_against_stub(self, calls, workers, **limits):
+        with OpenAIStubServer(delay=0.05) as server:
+            with override_settings(
+                OPENAI_BASE_URL=server.base_url, **limits
+            ), mock.patch.dict("os.environ", {"OPENAI_API_KEY": "stub"}):
+                reset_llm_client()
+                try:
+                    with ThreadPoolExecutor(max_workers=workers) as pool:
+                        results = list(
+                            pool.map(
+                                lambda _: invoke_llm("gpt-4o", self.messages),
+                                range(calls),
+                            )
+                        )
+                finally:
+                    reset_llm_client()
+        return server, results
+
+    def test_connections_are_reused(self):
+        server, results = self.run_against_stub(calls=5, workers=1)
+
+        self.assertEqual(server.requests, 5)
+        self.assertEqual(len(server.connections), 1)
+        self.assertIn("Alex", results[0].content)
+
+    def test_concurrency_is_capped(self):
+        server, _ = self.run_against_stub(calls=12, workers=12, LLM_MAX_CONCURRENCY=3)
+
+        self.assertEqual(server.requests, 12)
+        self.assertLessEqual(server.max_in_flight, 3)
+        self.assertLessEqual(len(server.connections), 3)
+
+    def test_token_bucket_queues_bursts(self):
+        bucket = TokenBucket(per_minute=60)  # one per second
+        waits = [bucket.reserve() for _ in range(62)]
+
+        self.assertEqual(waits[:60], [0.0] * 60)
+        self.assertAlmostEqual(waits[60], 1.0, places=1)
+        self.assertAlmostEqual(waits[61], 2.0, places=1)
+
+    def test_rate_limit_wait_holds_no_slot(self):
+        limiter = RateLimiter(1, requests_per_minute=60, tokens_per_minute=10**6)
+        limiter.requests.tokens = 0  # The next request has to wait
+
+        with mock.patch("api.utils.llm_client.time.sleep") as sleep:
+            sleep.side_effect = lambda _: self.assertEqual(limiter.gate.available, 1)
+            with limiter.slot(10):
+                self.assertEqual(limiter.gate.available, 0)
+        sleep.assert_called_once()
+        self.assertEqual(limiter.gate.available, 1)
+
+    def test_async_waiter_is_woken_by_release(self):
+        gate = ConcurrencyGate(1)
+        gate.acquire()
+
+        async def main():
+            waiter = asyncio.create_task(gate.aacquire())
+            await asyncio.sleep(0.05)
+            self.assertFalse(waiter.done())
+            # Released from a worker thread, e.g. a sync call finishing
+            await asyncio.get_running_loop().run_in_executor(None, gate.release)
+            await asyncio.wait_for(waiter, timeout=1)
+
+        asyncio.run(main())
+        self.assertEqual(gate.available, 0)
+        gate.release()
+        self.assertEqual(gate.available, 1)
+
+    def test_cancelled_async_waiter_gives_its_slot_back(self):
+        gate = ConcurrencyGate(1)
+        gate.acquire()
+
+        async def main():
+            waiter = asyncio.create_task(gate.aacquire())
+            await asyncio.sleep(0)
+            gate.release()  # Handed to the waiter...
+            waiter.cancel()  # ...which is cancelled before it resumes
+            with self.assertRaises(asyncio.CancelledError):
+                await waiter
+
+        asyncio.run(main())
+        self.assertEqual((gate.available, len(gate.waiters)), (1, 0))
+
+
+class AsyncPoolTests(TestCase):
+    def test_wsgi_requests_share_one_pool(self):
+        for job_id in ("1", "2"):  # Distinct prompts, no LLM cache hit
+            Job.objects.create(title=f"Scraper {job_id}", job_id=job_id)
+
+        with OpenAIStubServer() as server, override_settings(
+            OPENAI_BASE_URL=server.base_url
+        ), mock.patch.dict("os.environ", {"OPENAI_API_KEY": "stub"}):
+            reset_llm_client()
+            try:
+                for job_id in ("1", "2"):
+                    response = self.client.get(
+                        reverse("job_detail"), {"job_id": job_id, "refresh_llm": "true"}
+                    )
+                    self.assertEqual(response.json()["llm_response"]["success"], True)
+                # No per-request async client left behind
+                self.assertEqual(len(llm_client._async_chat_models), 0)
+            finally:
+                reset_llm_client()
+
+        self.assertEqual(server.requests, 2)
+        self.assertEqual(len(server.connections), 1)
+
+
+class EnrichJobsCommandTests(TestCase):
+    def test_enriches_pending_jobs_and_resumes(self):
+        for i in range(5):
+            job = Job.objects.create(title=f"Job {i}", job_id=str(i))
+            Comment.objects.create(job=job, job_title=f"Old job {i}")
+        checkpoint = Path(tempfile.mkdtemp()) / "checkpoint"
+
+        with OpenAIStubServer() as server, override_settings(
+            OPENAI_BASE_URL=server.base_url
+        ), mock.patch.dict("os.environ", {"OPENAI_API_KEY": "stub"}):
+            reset_llm_client()
+            options = {"checkpoint": str(checkpoint), "batch_size": 2, "stdout": StringIO()}
+            call_command("enrich_jobs", limit=3, **options)
+            self.assertEqual(checkpoint.read_text(), str(Job.objects.order_by("id")[2].pk))
+
+            call_command("enrich_jobs", **options)
+            reset_llm_client()
+
+        self.assertEqual(server.requests, 5)
+        self.assertEqual(LLMResponse.objects.count(), 5)
+        self.assertFalse(checkpoint.exists())
+        # Token counts come from the stub's `usage`
+        self.assertEqual(
+            set(LLMCall.objects.values_list("prompt_tokens", "completion_tokens", "outcome")),
+            {(100, 50, LLMCall.SUCCESS)},
+        )
+
+    def test_concurrency_reaches_the_model(self):
+        # More than the default executor's threads (at most 32)
+        concurrency = 40
+        for i in range(concurrency):
+            Job.objects.create(title=f"Job {i}", job_id=str(i))
+
+        with OpenAIStubServer(delay=0.5) as server, override_settings(
+            OPENAI_BASE_URL=server.base_url,
+            LLM_MAX_CONCURRENCY=concurrency,
+            LLM_MAX_CONNECTIONS=concurrency,
+        ), mock.patch.dict("os.environ", {"OPENAI_API_KEY": "stub"}):
+            reset_llm_client()
+            try:
+                call_command(
+                    "enrich_jobs",
+                    concurrency=concurrency,
+                    checkpoint=str(Path(tempfile.mkdtemp()) / "checkpoint"),
+                    stdout=StringIO(),
+                )
+            finally:
+                reset_llm_client()
+
+        self.assertEqual(server.max_in_flight, concurrency)
+        self.assertEqual(LLMResponse.objects.count(), concurrency)
+        self.assertEqual(len(llm_client._async_chat_models), 0)  # Closed
+
+
+class PromptBudgetTests(SimpleTestCase):
+    job = {"title": "Python web scraper", "skills": ["Scrapy"]}
+
+    def comment(self, title, posted_on, words=50):
+        return {
+            "job_title": title,
+            "description": "details " * words,
+            "freelancer_feedback": "Great client",
+            "posted_on": posted_on,
+        }
+
+    def test_recent_and_relevant_comments_are_kept(self):
+        comments = [
+            self.comment("Logo design", "Jan 2019 - Feb 2019"),
+            self.comment("Python scraper", "Mar 2024 - Apr 2024"),
+            self.comment("Logo design", "May 2024 - Jun 2024"),
+            self.comment("Scrapy spider", "Jan 2020"),
+        ]
+        one_comment = count_tokens(json.dumps(comments[0])) + 1
+
+        packed = pack_comments(0, self.job, comments, budget=2 * one_comment)
+
+        self.assertEqual(
+            [c["posted_on"] for c in packed],
+            ["Mar 2024 - Apr 2024", "May 2024 - Jun 2024"],
+        )
+        self.assertEqual(packed, pack_comments(0, self.job, comments, 2 * one_comment))
+
+    def test_first_overflowing_comment_is_truncated(self):
+        comments = [self.comment("Python scraper", "Mar 2024", words=2000)]
+
+        packed = pack_comments(100, self.job, comments, budget=600)
+
+        self.assertEqual(len(packed), 1)
+        self.assertTrue(packed[0]["description"].endswith(TRUNCATION_MARKER))
+        self.assertLessEqual(count_tokens(json.dumps(packed[0])), 500)
+
+    @mock.patch("api.utils.prompt_budget.tiktoken.encoding_for_model")
+    def test_encoding_failure_is_retried(self, encoding_for_model):
+        encoding = mock.Mock()
+        encoding_for_model.side_effect = [OSError("no network"), encoding]
+
+        self.assertIsNone(get_encoding("retry-model"))
+        self.assertIsNone(get_encoding("retry-model"))  # Not before the delay
+        with mock.patch("api.utils.prompt_budget.ENCODING_RETRY_SECONDS", 0):
+            self.assertIs(get_encoding("retry-model"), encoding)
+        self.assertIs(get_encoding("retry-model"), encoding)
+        self.assertEqual(encoding_for_model.call_count, 2)
+
+
+class KeysetPaginationTests(TestCase):
+    def test_walks_every_job_without_offset_queries(self):
+        for i in range(25):
+            Job.objects.create(title=f"Job {i}", job_id=str(i))
+        expected = list(
+            Job.objects.order_by("-created_at", "-id").values_list("id", flat=True)
+        )
+
+        seen = []
+        params = {"pagination": "cursor"}
+        while True:
+            # the page-window validators, then the page itself
+            with CaptureQueriesContext(connection) as queries:
+                body = self.client.get(reverse("job_list"), params).json()
+            self.assertEqual(len(queries), 2)
+            self.assertNotIn("OFFSET", queries[1]["sql"])
+            seen += [job["id"] for job in body["jobs"]]
+            if not body["has_next"]:
+                break
+            params = {"cursor": body["next_cursor"]}
+
+        self.assertEqual(seen, expected)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse("job_list"), {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_page_numbers_use_the_cursor_order(self):
+        for i in range(3):
+            Job.objects.create(title=f"Job {i}", job_id=str(i))
+        expected = list(
+            Job.objects.order_by("-created_at", "-id").values_list("id", flat=True)
+        )
+
+        body = self.client.get(reverse("job_list"), {"fields": "id"}).json()
+
+        self.assertEqual([job["id"] for job in body["jobs"]], expected)
+
+
+class JobListPageTests(TestCase):
+    def test_streams_one_page_of_rows(self):
+        for i in range(3):
+            Job.objects.create(title=f"Job {i}", job_id=str(i), description="x" * 1000)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("job_list_page"), {"page_size": 2})
+            html = b"".join(response.streaming_content).decode()
+
+        self.assertIn("Job 2", html)
+        self.assertIn("Job 1", html)
+        self.assertNotIn("Job 0", html)
+        self.assertNotIn("x" * 1000, html)
+        self.assertIn("Next page", html)
+
+    def test_empty_table(self):
+        response = self.client.get(reverse("job_list_page"))
+        self.assertIn("No jobs available.", b"".join(response.streaming_content).decode())
+
+    async def test_streamed_under_asgi(self):
+        await Job.objects.acreate(title="Job 1", job_id="1")
+
+        response = await self.async_client.get(reverse("job_list_page"))
+        self.assertTrue(response.is_async)
+        chunks = [chunk async for chunk in response.streaming_content]
+        self.assertGreater(len(chunks), 2)  # head, rows, tail
+        self.assertIn("Job 1", b"".join(chunks).decode())
+
+
+class JobDetailQueryTests(TestCase):
+    def setUp(self):
+        caches["job_detail"].clear()
+        self.job = Job.objects.create(title="Scraper", job_id="42")
+        for i in range(3):
+            Comment.objects.create(job=self.job, job_title=f"Old job {i}")
+
+    def get_detail(self, **params):
+        return self.client.get(reverse("job_detail"), {"job_id": "42", **params})
+
+    def test_existing_llm_response(self):
+        LLMResponse.objects.create(job=self.job, company="Old")
+        LLMResponse.objects.create(job=self.job, company="Latest")
+
+        # validators, job, latest LLM response, comments, validators again
+        # (nothing changed while the payload was cached)
+        with self.assertNumQueries(5):
+            body = self.get_detail().json()
+        self.assertEqual(body["llm_response"]["company"], "Latest")
+        self.assertEqual(len(body["comments"]), 3)
+
+    def test_existing_llm_response_without_comments(self):
+        LLMResponse.objects.create(job=self.job, company="Acme")
+
+        with self.assertNumQueries(4):
+            body = self.get_detail(need_comments="false").json()
+        self.assertEqual(body["comments"], [])
+
+    @mock.patch("api.utils.LLM.ainvoke_llm", new_callable=mock.AsyncMock)
+    def test_enrichment_loads_comments_once(self, invoke):
+        invoke.return_value = mock.Mock(content='{"company": "Acme"}')
+
+        # validators, job, latest LLM response, lease (savepoint, insert,
+        # release), latest LLM response again, comments, cache lookup, ledger
+        # insert, cache store (delete, insert, evict expired, count),
+        # LLMResponse insert, lease delete
+        with self.assertNumQueries(16):
+            body = self.get_detail(need_comments="true").json()
+        self.assertEqual(body["llm_response"]["company"], "Acme")
+        self.assertEqual(len(body["comments"]), 3)
+
+    @mock.patch("api.utils.LLM.ainvoke_llm", new_callable=mock.AsyncMock)
+    def test_refresh_llm(self, invoke):
+        invoke.return_value = mock.Mock(content='{"company": "Acme"}')
+        LLMResponse.objects.create(job=self.job, company="Old")
+        self.get_detail(refresh_llm="true")  # fill the LLM cache
+
+        # job, comments, cache lookup + hit update; the stored response is not read
+        with self.assertNumQueries(4):
+            body = self.get_detail(refresh_llm="true").json()
+        self.assertEqual(body["llm_response"]["company"], "Acme")
+        invoke.assert_called_once()
+
+    def test_html_page_shares_the_loader(self):
+        LLMResponse.objects.create(job=self.job, company="Acme")
+
+        with self.assertNumQueries(5):
+            response = self.client.get(reverse("job_page"), {"job_id": "42"})
+        self.assertContains(response, "Scraper")
+
+
+class SingleFlightTests(TransactionTestCase):
+    """
+    Parallel requests for a job without an LLMResponse: one model call,
+    one stored response, every request gets it.
+    """
+
+    content = '{"client_names": ["Alex"], "company": "Acme"}'
+    requests = 8
+
+    def setUp(self):
+        caches["job_detail"].clear()
+        self.job = Job.objects.create(title="Scraper", job_id="42")
+        Comment.objects.create(job=self.job, job_title="Old job")
+
+    def in_parallel(self, request):
+        def run(_):
+            try:
+                return request()
+            finally:
+                connection.close()  # Each thread has its own connection
+
+        with ThreadPoolExecutor(max_workers=self.requests) as pool:
+            return list(pool.map(run, range(self.requests)))
+
+    @mock.patch("api.utils.LLM.ainvoke_llm", new_callable=mock.AsyncMock)
+    def test_parallel_detail_requests(self, invoke):
+        async def slow_invoke(model, messages):
+            await asyncio.sleep(0.3)
+            return mock.Mock(content=self.content)
+
+        invoke.side_effect = slow_invoke
+        responses = self.in_parallel(
+            lambda: self.client.get(reverse("job_detail"), {"job_id": "42"}).json()
+        )
+
+        invoke.assert_called_once()
+        llm_response = LLMResponse.objects.get(job=self.job)
+        self.assertEqual(
+            {body["llm_response"]["id"] for body in responses}, {llm_response.id}
+        )
+        self.assertFalse(EnrichmentLease.objects.exists())
+
+    @mock.patch("api.utils.LLM.stream_llm")
+    def test_parallel_stream_requests(self, stream):
+        def slow_stream(model, messages):
+            time.sleep(0.3)
+            yield from answer_chunks(self.content)
+
+        stream.side_effect = slow_stream
+        streams = self.in_parallel(
+            lambda: sse_events(
+                self.client.get(reverse("job_detail_stream"), {"job_id": "42"})
+            )
+        )
+
+        stream.assert_called_once()
+        llm_response = LLMResponse.objects.get(job=self.job)
+        for events in streams:
+            self.assertEqual(events[-1], ("done", mock.ANY))
+            self.assertEqual(events[-1][1]["id"], llm_response.id)
+
+    def test_expired_lease_is_taken_over(self):
+        token = acquire_lease(self.job)
+        self.assertIsNone(acquire_lease(self.job))
+
+        EnrichmentLease.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertNotIn(acquire_lease(self.job), (None, token))
+
+
+class EnrichmentStreamTests(TestCase):
+    content = (
+        '```json\n{"client_names": ["Alex", "Sam"], "keywords": ["Scraping"], '
+        '"work": "Extracts product data", "crucial_info": "Pays on time"}\n```'
+    )
+
+    def setUp(self):
+        caches["job_detail"].clear()
+        self.job = Job.objects.create(title="Scraper", job_id="42")
+        Comment.objects.create(job=self.job, job_title="Old job")
+
+    def assert_streamed(self, events):
+        fields = [data for event, data in events if event == "field"]
+        # Partial values first, e.g. ["Alex"] before ["Alex", "Sam"]
+        names = [field["value"] for field in fields if field["name"] == "client_names"]
+        self.assertGreater(len(names), 1)
+        self.assertEqual(names[-1], ["Alex", "Sam"])
+        works = [field["value"] for field in fields if field["name"] == "work"]
+        self.assertTrue(all("Extracts product data".startswith(work) for work in works))
+
+        event, data = events[-1]
+        self.assertEqual(event, "done")
+        llm_response = LLMResponse.objects.get(job=self.job)
+        self.assertEqual(data["id"], llm_response.id)
+        self.assertEqual(llm_response.other_data["work"], "Extracts product data")
+        call = LLMCall.objects.get(job=self.job)
+        self.assertEqual((call.prompt_tokens, call.completion_tokens), (100, 50))
+        self.assertFalse(EnrichmentLease.objects.exists())
+
+    @mock.patch("api.utils.LLM.invoke_llm")
+    def test_page_renders_before_enrichment(self, invoke):
+        response = self.client.get(reverse("job_page"), {"job_id": "42"})
+
+        invoke.assert_not_called()
+        self.assertContains(response, "Scraper")
+        self.assertContains(response, f'{reverse("job_detail_stream")}?job_id=42')
+
+    @mock.patch("api.utils.LLM.invoke_llm")
+    @mock.patch("api.utils.LLM.ainvoke_llm", new_callable=mock.AsyncMock)
+    async def test_page_refresh_calls_the_model_asynchronously(self, ainvoke, invoke):
+        ainvoke.return_value = mock.Mock(content='{"client_names": ["Refreshed Client"]}')
+
+        response = await self.async_client.get(
+            reverse("job_page"), {"job_id": "42", "refresh_llm": "true"}
+        )
+        self.assertContains(response, "Refreshed Client")
+        ainvoke.assert_awaited_once()
+        invoke.assert_not_called()
+
+    def test_page_of_enriched_job_does_not_stream(self):
+        LLMResponse.objects.create(job=self.job, client_names=["Alex"])
+
+        response = self.client.get(reverse("job_page"), {"job_id": "42"})
+        self.assertContains(response, "Alex")
+        self.assertNotContains(response, "EventSource")
+
+    @mock.patch("api.utils.LLM.stream_llm")
+    def test_stream(self, stream):
+        stream.return_value = iter(answer_chunks(self.content))
+
+        response = self.client.get(reverse("job_detail_stream"), {"job_id": "42"})
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        self.assert_streamed(sse_events(response))
+
+    @mock.patch("api.utils.LLM.astream_llm")
+    async def test_stream_async(self, stream):
+        async def chunks(model, messages):
+            for chunk in answer_chunks(self.content):
+                yield chunk
+
+        stream.side_effect = chunks
+        response = await self.async_client.get(
+            reverse("job_detail_stream"), {"job_id": "42"}
+        )
+        body = b"".join([chunk async for chunk in response.streaming_content])
+        await sync_to_async(self.assert_streamed)(parse_sse(body))
+
+    @mock.patch("api.utils.LLM.stream_llm")
+    def test_stored_response_is_sent_at_once(self, stream):
+        llm_response = LLMResponse.objects.create(job=self.job, company="Acme")
+
+        response = self.client.get(reverse("job_detail_stream"), {"job_id": "42"})
+        events = sse_events(response)
+        self.assertEqual(events, [("done", mock.ANY)])
+        self.assertEqual(events[0][1]["id"], llm_response.id)
+        stream.assert_not_called()
+
+    @mock.patch("api.utils.LLM.stream_llm", side_effect=TimeoutError("timed out"))
+    def test_failure(self, _stream):
+        response = self.client.get(reverse("job_detail_stream"), {"job_id": "42"})
+
+        self.assertEqual([event for event, _ in sse_events(response)], ["failed"])
+        self.assertFalse(LLMResponse.objects.exists())
+        self.assertEqual(LLMCall.objects.get().outcome, LLMCall.ERROR)
+        self.assertFalse(EnrichmentLease.objects.exists())
+
+    @override_settings(ENRICHMENT_INLINE_TIMEOUT=0)
+    @mock.patch("api.utils.LLM.stream_llm")
+    def test_concurrent_enrichment_times_out(self, stream):
+        # Held by another request
+        EnrichmentLease.objects.create(
+            job=self.job, owner="other", expires_at=timezone.now() + timedelta(minutes=5)
+        )
+
+        response = self.client.get(reverse("job_detail_stream"), {"job_id": "42"})
+        events = sse_events(response)
+        self.assertEqual([event for event, _ in events], ["failed"])
+        self.assertIn("still being enriched", events[0][1]["error"])
+        stream.assert_not_called()
+        self.assertTrue(EnrichmentLease.objects.exists())
+
+    @override_settings(ENRICHMENT_INLINE_TIMEOUT=0)
+    @mock.patch("api.utils.LLM.astream_llm")
+    async def test_concurrent_enrichment_times_out_async(self, stream):
+        await EnrichmentLease.objects.acreate(
+            job=self.job, owner="other", expires_at=timezone.now() + timedelta(minutes=5)
+        )
+
+        response = await self.async_client.get(
+            reverse("job_detail_stream"), {"job_id": "42"}
+        )
+        body = b"".join([chunk async for chunk in response.streaming_content])
+        self.assertEqual([event for event, _ in parse_sse(body)], ["failed"])
+        stream.assert_not_called()
+
+    @mock.patch("api.views.save_llm_response", side_effect=RuntimeError("disk full"))
+    @mock.patch("api.utils.LLM.stream_llm")
+    def test_save_failure(self, stream, _save):
+        stream.return_value = iter(answer_chunks(self.content))
+
+        response = self.client.get(reverse("job_detail_stream"), {"job_id": "42"})
+        event, data = sse_events(response)[-1]
+        self.assertEqual((event, data), ("failed", {"success": False, "error": "disk full"}))
+        self.assertFalse(EnrichmentLease.objects.exists())
+
+
+class IndexUsageTests(TestCase):
+    """
+    EXPLAIN the hot lookups and check each one is served by its index.
+    """
+
+    def setUp(self):
+        self.job = Job.objects.create(title="Scraper", job_id="42")
+        if connection.vendor == "postgresql":
+            # Tiny test tables would otherwise always be scanned sequentially
+            with connection.cursor() as cursor:
+                cursor.execute("SET enable_seqscan = off")
+
+    def assertUsesIndex(self, queryset, index_name):
+        self.assertIn(index_name, queryset.explain())
+
+    def test_latest_llm_response(self):
+        self.assertUsesIndex(
+            self.job.llm_responses.all()[:1], "llmresponse_job_created_idx"
+        )
+
+    def test_job_comments(self):
+        self.assertUsesIndex(
+            self.job.comments.order_by("created_at"), "comment_job_created_idx"
+        )
+
+    def test_newest_jobs(self):
+        self.assertUsesIndex(
+            Job.objects.order_by("-created_at", "-id")[:100], "job_created_id_idx"
+        )
+
+    def test_skill_filter(self):
+        from .utils.skills import filter_by_skills
+
+        jobs = filter_by_skills(Job.objects.all(), ["Python"])
+        if connection.vendor == "postgresql":
+            self.assertUsesIndex(jobs, "job_skills_gin_idx")
+        else:
+            # skill name -> JobSkill.skill -> job pk, all index searches
+            self.assertNotIn("SCAN", jobs.explain())
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        caches["job_detail"].clear()
+        self.job = Job.objects.create(title="Scraper", job_id="42")
+        self.comment = Comment.objects.create(job=self.job, job_title="Old job")
+        LLMResponse.objects.create(job=self.job, company="Acme")
+        self.url = reverse("job_detail")
+
+    def test_detail_not_modified_in_one_query(self):
+        first = self.client.get(self.url, {"job_id": "42"})
+        etag = first.headers["ETag"]
+
+        caches["job_detail"].clear()  # validators come from the database
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                self.url, {"job_id": "42"}, HTTP_IF_NONE_MATCH=etag
+            )
+        self.assertEqual(response.status_code, 304)
+
+    def test_detail_if_modified_since_after_delete(self):
+        first = self.client.get(self.url, {"job_id": "42"})
+        # The newest updated_at survives a delete, so none is sent
+        self.assertNotIn("Last-Modified", first.headers)
+
+        self.comment.delete()
+        response = self.client.get(
+            self.url, {"job_id": "42"}, HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 60)
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["comments"], [])
+
+    def test_detail_changes_invalidate_etag(self):
+        etag = self.client.get(self.url, {"job_id": "42"}).headers["ETag"]
+
+        self.comment.delete()
+        response = self.client.get(self.url, {"job_id": "42"}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+
+        # need_comments=false is a different representation
+        response = self.client.get(
+            self.url, {"job_id": "42", "need_comments": "false"}, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_listing_not_modified(self):
+        url = reverse("job_list")
+        for params in ({}, {"pagination": "cursor"}):
+            etag = self.client.get(url, params).headers["ETag"]
+            response = self.client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304)
+
+            Job.objects.create(title="New job", job_id=f"new-{len(params)}")
+            response = self.client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+
+
+class JobDetailCacheTests(TestCase):
+    def setUp(self):
+        caches["job_detail"].clear()
+        self.job = Job.objects.create(title="Scraper", job_id="42")
+        LLMResponse.objects.create(job=self.job, company="Acme")
+        self.url = reverse("job_detail")
+
+    def test_detail_reads_skip_the_database(self):
+        first = self.client.get(self.url, {"job_id": "42"}).json()
+
+        with self.assertNumQueries(0):
+            by_job_id = self.client.get(self.url, {"job_id": "42"}).json()
+            by_pk = self.client.get(self.url, {"id": self.job.pk}).json()
+        self.assertEqual(first, by_job_id)
+        self.assertEqual(first, by_pk)
+
+    def test_writes_invalidate(self):
+        self.client.get(self.url, {"job_id": "42"})
+
+        Comment.objects.create(job=self.job, job_title="Old job")
+        body = self.client.get(self.url, {"job_id": "42"}).json()
+        self.assertEqual(len(body["comments"]), 1)
+
+        bulk_ingest_comments(self.job, [{"job_title": "Another old job"}])
+        body = self.client.get(self.url, {"job_id": "42"}).json()
+        self.assertEqual(len(body["comments"]), 2)
+
+        LLMResponse.objects.create(job=self.job, company="Newer")
+        body = self.client.get(self.url, {"job_id": "42"}).json()
+        self.assertEqual(body["llm_response"]["company"], "Newer")
+
+    def test_write_while_building_is_not_cached(self):
+        params = QueryDict("job_id=42")
+        validators = job_detail_validators(params, "json:None")
+        payload = async_to_sync(aget_job_detail_data)(params)
+
+        Comment.objects.create(job=self.job, job_title="Old job")
+        cache_job_detail(params, payload, validators)
+        self.assertIsNone(detail_cache.get_job_detail(params))
+
+    def test_invalidation_reaches_other_processes(self):
+        self.client.get(self.url, {"job_id": "42"})
+
+        # What the enrichment worker (its own cache handler) sees
+        other = caches.create_connection("job_detail")
+        self.assertIsNotNone(other.get(f"job-detail:{self.job.pk}:1"))
+        LLMResponse.objects.create(job=self.job, company="Newer")
+        self.assertIsNone(other.get(f"job-detail:{self.job.pk}:1"))
+
+    def test_tests_use_a_private_cache(self):
+        # The configured cache belongs to the servers running on this host
+        location = Path(caches["job_detail"]._dir)
+        self.assertNotEqual(location, settings.BASE_DIR / "cache" / "job_detail")
+        self.assertTrue(location.name.startswith("job_detail_test_"))
+
+    def test_stats(self):
+        self.client.get(self.url, {"job_id": "42"})
+        self.client.get(self.url, {"job_id": "42"})
+
+        stats = self.client.get(reverse("job_detail_cache")).json()["cache"]
+        self.assertEqual((stats["hits"] >= 1, stats["entries"] >= 1), (True, True))
+        self.assertGreater(stats["bytes"], 0)
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        job = Job.objects.create(title="Scraper", job_id="42", skills=["Python"])
+        Comment.objects.create(job=job, job_title="Old, \"quoted\" job")
+
+    def export(self, table, **params):
+        response = self.client.get(reverse("export", args=[table]), params)
+        return response, b"".join(response.streaming_content)
+
+    def test_ndjson(self):
+        response, body = self.export("jobs")
+
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        rows = [json.loads(line) for line in body.decode().splitlines()]
+        self.assertEqual(
+            [(row["job_id"], row["skills"]) for row in rows], [("42", ["Python"])]
+        )
+
+    def test_gzipped_csv(self):
+        response, body = self.export("comments", output="csv", gzip="true")
+
+        rows = list(csv.reader(gzip.decompress(body).decode().splitlines()))
+        self.assertEqual(rows[0][:3], ["id", "job_id", "url"])
+        self.assertEqual(rows[1][rows[0].index("job_title")], 'Old, "quoted" job')
+
+    def test_updated_at_range(self):
+        _, body = self.export("jobs", updated_since="2999-01-01T00:00:00Z")
+        self.assertEqual(body, b"")
+
+        response = self.client.get(reverse("export", args=["users"]))
+        self.assertEqual(response.status_code, 400)
+
+    def test_unknown_output(self):
+        for params in ({"output": "xml"}, {"output": "xml", "gzip": "true"}):
+            response = self.client.get(reverse("export", args=["jobs"]), params)
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.json()["success"], False)
+            self.assertIn("Unknown output 'xml'", response.json()["message"])
+
+    def test_invalid_gzip(self):
+        response = self.client.get(reverse("export", args=["jobs"]), {"gzip": "yes"})
+        self.assertEqual(response.status_code, 400)
+
+    async def test_streamed_under_asgi(self):
+        response = await self.async_client.get(
+            reverse("export", args=["jobs"]), {"output": "csv"}
+        )
+
+        # An async iterator: Django would otherwise build the body in memory
+        self.assertTrue(response.is_async)
+        body = b"".join([chunk async for chunk in response.streaming_content])
+        rows = list(csv.reader(body.decode().splitlines()))
+        self.assertEqual(rows[1][rows[0].index("job_id")], "42")
+
+    def test_command(self):
+        path = Path(tempfile.mkdtemp()) / "jobs.ndjson"
+        call_command("export_data", "jobs", file=str(path), stderr=StringIO())
+        self.assertEqual(json.loads(path.read_text())["title"], "Scraper")
+
+
+class FieldsetTests(TestCase):
+    def setUp(self):
+        caches["job_detail"].clear()
+        self.job = Job.objects.create(
+            title="Scraper",
+            job_id="42",
+            description="long text",
+            pricing_details={"a": 1},
+        )
+        LLMResponse.objects.create(job=self.job, company="Acme")
+
+    def test_listing_reads_only_requested_columns(self):
+        for params in (
+            {"fields": "id,title"},
+            {"fields": "title,id", "pagination": "cursor"},
+        ):
+            with CaptureQueriesContext(connection) as queries:
+                body = self.client.get(reverse("job_list"), params).json()
+            self.assertEqual(body["jobs"], [{"id": self.job.pk, "title": "Scraper"}])
+            page_query = queries[-1]["sql"]
+            self.assertNotIn("description", page_query)
+            self.assertNotIn("pricing_details", page_query)
+
+    def test_exclude(self):
+        body = self.client.get(reverse("job_list"), {"exclude": "description"}).json()
+        self.assertNotIn("description", body["jobs"][0])
+        self.assertIn("pricing_details", body["jobs"][0])
+
+    def test_detail_projection_and_etag_variant(self):
+        url = reverse("job_detail")
+        full = self.client.get(url, {"job_id": "42"})
+        sparse = self.client.get(url, {"job_id": "42", "fields": "job_id,title"})
+
+        self.assertEqual(sparse.json()["job"], {"job_id": "42", "title": "Scraper"})
+        self.assertEqual(sparse.json()["llm_response"]["company"], "Acme")
+        self.assertNotEqual(full.headers["ETag"], sparse.headers["ETag"])
+
+    def test_unknown_field(self):
+        response = self.client.get(reverse("job_list"), {"fields": "title,password"})
+        self.assertEqual(response.status_code, 400)
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.scraper = Job.objects.create(
+            title="Django scraper",
+            job_id="1",
+            description="Collect listings every hour",
+            skills=["Python"],
+        )
+        self.shop = Job.objects.create(
+            title="Shopify theme",
+            job_id="2",
+            description="Build a landing page, scraper experience is a plus",
+            skills=["Liquid"],
+        )
+
+    def search(self, **params):
+        return self.client.get(reverse("job_search"), params)
+
+    def test_ranked_by_field_weight(self):
+        body = self.search(q="scraper").json()
+        self.assertEqual([job["job_id"] for job in body["jobs"]], ["1", "2"])
+        self.assertGreater(body["jobs"][0]["rank"], body["jobs"][1]["rank"])
+        self.assertEqual(self.search(q="python").json()["jobs"][0]["job_id"], "1")
+
+    def test_index_follows_writes(self):
+        self.shop.title = "Shopify migration"
+        self.shop.save()
+        self.assertEqual(self.search(q="migration").json()["jobs"][0]["job_id"], "2")
+
+        bulk_ingest_comments(self.scraper, [{"client_feedback": "Punctual and thorough"}])
+        comment = Comment.objects.create(job=self.shop, freelancer_feedback="Generous")
+        self.assertEqual(self.search(q="punctual").json()["jobs"][0]["job_id"], "1")
+        self.assertEqual(self.search(q="generous").json()["jobs"][0]["job_id"], "2")
+
+        comment.delete()
+        self.shop.delete()
+        self.assertEqual(self.search(q="generous").json()["jobs"], [])
+        self.assertEqual(len(self.search(q="scraper").json()["jobs"]), 1)
+
+    def test_pagination_and_fieldset(self):
+        first = self.search(q="scraper", page_size=1, fields="job_id").json()
+        second = self.search(q="scraper", page_size=1, page=2).json()
+        self.assertTrue(first["has_next"])
+        self.assertFalse(second["has_next"])
+        self.assertEqual(set(first["jobs"][0]), {"job_id", "rank"})
+        self.assertEqual(second["jobs"][0]["job_id"], "2")
+
+    def test_query_syntax_is_not_injected(self):
+        for text in ('scraper"', "scraper OR", "NEAR(", "-"):
+            response = self.search(q=text)
+            self.assertEqual(response.status_code, 200, text)
+        self.assertEqual(self.search(q="").status_code, 400)
+        self.assertEqual(self.search(q="scraper", page=0).status_code, 400)
+
+
+class SkillFacetTests(TestCase):
+    def setUp(self):
+        self.first = Job.objects.create(
+            title="A", job_id="1", skills=["Python", "Django"], client_location="India"
+        )
+        self.second = Job.objects.create(
+            title="B", job_id="2", skills=["Python", "React", "Python", 7]
+        )
+
+    def counts(self):
+        return dict(
+            Skill.objects.filter(job_count__gt=0).values_list("name", "job_count")
+        )
+
+    def test_counts_follow_writes(self):
+        self.assertEqual(self.counts(), {"Python": 2, "Django": 1, "React": 1})
+
+        self.second.skills = ["React", "SQL"]
+        self.second.save()
+        self.assertEqual(self.counts(), {"Python": 1, "Django": 1, "React": 1, "SQL": 1})
+
+        self.first.delete()
+        self.assertEqual(self.counts(), {"React": 1, "SQL": 1})
+
+    def test_late_sync_applies_the_stored_skills(self):
+        from .utils.skills import sync_job_skills
+
+        stale = Job.objects.get(pk=self.second.pk)
+        self.second.skills = ["SQL"]
+        self.second.save()
+
+        # The signal of a concurrent save of the older skills, running last
+        sync_job_skills(stale)
+        self.assertEqual(self.counts(), {"Python": 1, "Django": 1, "SQL": 1})
+
+    def test_rebuild_matches_incremental(self):
+        from .utils.skills import rebuild_skill_counts
+
+        expected = self.counts()
+        Skill.objects.update(job_count=0)
+        rebuild_skill_counts()
+        self.assertEqual(self.counts(), expected)
+
+    def test_top_skills_read_the_counts_only(self):
+        with CaptureQueriesContext(connection) as queries:
+            body = self.client.get(reverse("job_skills"), {"top": 2}).json()
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn("api_job", queries[0]["sql"].replace("api_jobskill", ""))
+        self.assertEqual(
+            body["skills"], [{"name": "Python", "count": 2}, {"name": "Django", "count": 1}]
+        )
+
+    def test_filtered_facets_and_listing(self):
+        body = self.client.get(
+            reverse("job_skills"), {"skills": "Python", "client_location": "India"}
+        ).json()
+        self.assertEqual(
+            body["skills"], [{"name": "Django", "count": 1}, {"name": "Python", "count": 1}]
+        )
+
+        body = self.client.get(reverse("job_list"), {"skills": "Python,React"}).json()
+        self.assertEqual([job["job_id"] for job in body["jobs"]], ["2"])
+        self.assertEqual(
+            self.client.get(reverse("job_skills"), {"top": "x"}).status_code, 400
+        )
+
+
+class FastReadTests(TestCase):
+    """
+    The values()-based read path and the orjson renderer must produce the
+    same bytes as the serializers with DRF's JSONRenderer.
+    """
+
+    def setUp(self):
+        self.job = Job.objects.create(
+            title="Scraper \u2028 für Ärzte",
+            job_id="42",
+            skills=["Python", "Web Scraping"],
+            pricing_details={"budget": 120.5, "type": None},
+            rating=None,
+        )
+        Comment.objects.create(job=self.job, rating=4.5, client_feedback="Great 👍")
+        LLMResponse.objects.create(job=self.job, company="Acme", other_data={"k": [1]})
+        Job_List.objects.create(**job_list_data("7", job_type={"type": "Hourly"}))
+
+    def assertSameBytes(self, queryset, serializer_class, fieldset=None):
+        from rest_framework.renderers import JSONRenderer
+        from .renderers import ORJSONRenderer
+        from .utils.fast_read import value_columns, fast_rows, fast_instances
+
+        expected = JSONRenderer().render(serializer_class(queryset, many=True).data)
+        rows = queryset.values(*value_columns(serializer_class, fieldset))
+        for data in (
+            fast_rows(rows, serializer_class, fieldset),
+            fast_instances(queryset, serializer_class, fieldset),
+        ):
+            self.assertEqual(ORJSONRenderer().render(data), expected)
+
+    def test_models_match_serializers(self):
+        from .serializer import (
+            JobSerializer,
+            JobListSerializer,
+            CommentSerializer,
+            LLMResponseSerializer,
+        )
+
+        self.assertSameBytes(Job.objects.all(), JobSerializer)
+        self.assertSameBytes(Job_List.objects.all(), JobListSerializer)
+        self.assertSameBytes(Comment.objects.all(), CommentSerializer)
+        self.assertSameBytes(LLMResponse.objects.all(), LLMResponseSerializer)
+
+    def test_fieldset_keeps_declaration_order(self):
+        from .serializer import JobSerializer
+        from .utils.fast_read import value_columns
+
+        self.assertEqual(
+            value_columns(JobSerializer, ["title", "id"]), ["id", "title"]
+        )
+        body = self.client.get(reverse("job_list"), {"fields": "title,id"}).content
+        self.assertEqual(
+            body[: body.index(b"]") + 1],
+            '{"jobs":[{"id":%d,"title":"Scraper \\u2028 für Ärzte"}]'
+            .encode() % self.job.pk,
+        )
+
+    def test_parser_is_strict(self):
+        from io import BytesIO
+        from rest_framework.exceptions import ParseError
+        from .parsers import ORJSONParser
+
+        parser = ORJSONParser()
+        self.assertEqual(parser.parse(BytesIO('{"a": "é"}'.encode())), {"a": "é"})
+        with self.assertRaises(ParseError):
+            parser.parse(BytesIO(b'{"a": NaN}'))
+
+
+class RequestMetricsTests(TestCase):
+    def setUp(self):
+        metrics.reset_metrics()
+        self.job = Job.objects.create(title="Scraper", job_id="42")
+
+    def test_server_timing_header(self):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(reverse("job_list"))
+
+        timing = response["Server-Timing"]
+        self.assertIn(f'desc="{len(captured)} queries"', timing)
+        for name in ("db;dur=", "llm;dur=", "serialize;dur=", "total;dur="):
+            self.assertIn(name, timing)
+
+    @mock.patch("api.utils.llm_client.get_chat_model")
+    def test_llm_time_is_attributed_to_the_request(self, get_chat_model):
+        def slow_invoke(messages):
+            time.sleep(0.02)
+            return mock.Mock(content='{"company": "Acme"}')
+
+        get_chat_model.return_value.invoke.side_effect = slow_invoke
+        response = self.client.get(
+            reverse("job_detail"), {"job_id": "42", "refresh_llm": "true"}
+        )
+
+        llm = re.search(r"llm;dur=([\d.]+)", response["Server-Timing"])
+        self.assertGreaterEqual(float(llm.group(1)), 20)
+
+    def test_metrics_endpoint(self):
+        self.client.get(reverse("job_list"))
+        self.client.get(reverse("job_list"))
+
+        response = self.client.get(reverse("metrics"))
+        self.assertEqual(response["Content-Type"], metrics.CONTENT_TYPE)
+        body = response.content.decode()
+        labels = 'method="GET",route="/api/v1/jobs/"'
+        self.assertIn(f'http_requests_total{{{labels},status="200"}} 2', body)
+        self.assertIn(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 2', body)
+        self.assertIn(f"http_request_db_queries_count{{{labels}}} 2", body)
+        self.assertIn('llm_cache_lookups_total{result="hits"}', body)
+
+
+class EndpointBenchmarkTests(TestCase):
+    """
+    Runs the endpoint benchmark on a small seed and enforces the stored
+    query budgets (latency baselines are machine specific and skipped).
+    """
+
+    def run_benchmark(self, **options):
+        out = StringIO()
+        call_command(
+            "bench_endpoints",
+            jobs=20,
+            iterations=2,
+            warmup=5,
+            no_latency_check=True,
+            stdout=out,
+            **options,
+        )
+        return out.getvalue()
+
+    def test_every_endpoint_within_query_budget(self):
+        output = self.run_benchmark()
+        self.assertIn("job_detail_uncached", output)
+        self.assertIn("job_list_page", output)
+
+    def test_over_budget_fails(self):
+        budgets = Path(tempfile.mkdtemp()) / "budgets.json"
+        budgets.write_text(
+            json.dumps({connection.vendor: {"job_list": {"queries": 1}}})
+        )
+        with self.assertRaisesMessage(CommandError, "job_list: 3 queries, budget is 1"):
+            self.run_benchmark(budgets=str(budgets), only=["job_list"])
@@ -1,5 +1,21 @@
 from django.urls import path
-from .views import JobView, CommentView, JobRetrieve, AdminControl, GetJob, GetAllJobs
+from .views import (
+    JobView,
+    CommentView,
+    JobRetrieve,
+    JobEnrichmentStream,
+    AdminControl,
+    GetJob,
+    GetAllJobs,
+    EnrichmentTaskView,
+    LLMCacheView,
+    LLMCallSummaryView,
+    JobDetailCacheView,
+    MetricsView,
+    ExportView,
+    JobSearchView,
+    SkillFacetView,
+)
 
 
 urlpatterns = [
@@ -9,9 +25,36 @@ urlpatterns = [
     # Post a comment to a specific job
     path("jobs/comments/", CommentView.as_view(), name="job_comment"),
 
+    # Status of a queued LLM enrichment (ticket returned by jobs/comments/)
+    path("jobs/enrichment/<int:pk>/", EnrichmentTaskView.as_view(), name="job_enrichment"),
+
+    # Hit/miss statistics of the LLM response cache
+    path("llm/cache/", LLMCacheView.as_view(), name="llm_cache"),
+
+    # Latency / tokens / cost of model calls per time window and prompt version
+    path("llm/calls/", LLMCallSummaryView.as_view(), name="llm_calls"),
+
+    # Ranked full-text search over jobs and their comments' feedback
+    path("jobs/search/", JobSearchView.as_view(), name="job_search"),
+
+    # Top skills with job counts, for all jobs or a filtered set
+    path("jobs/skills/", SkillFacetView.as_view(), name="job_skills"),
+
     # Retrieve details of a specific job
     path("jobs/detail/", JobRetrieve.as_view(), name="job_detail"),
 
+    # The job's LLM response as server-sent events, streamed while the model writes it
+    path("jobs/detail/stream/", JobEnrichmentStream.as_view(), name="job_detail_stream"),
+
+    # Hit rate and size of the job detail response cache
+    path("jobs/detail/cache/", JobDetailCacheView.as_view(), name="job_detail_cache"),
+
+    # Per-route latency / SQL / LLM histograms for Prometheus
+    path("metrics/", MetricsView.as_view(), name="metrics"),
+
+    # Streaming NDJSON / CSV export of job_list, jobs, comments or llm_responses
+    path("export/<str:table>/", ExportView.as_view(), name="export"),
+
     # Admin control panel with password authentication
     path("admin/control/<str:password>/", AdminControl.as_view(), name="admin_control"),
 
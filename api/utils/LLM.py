@@ -1,16 +1,29 @@
-from langchain_openai import ChatOpenAI
 import re
 import json
+import logging
 from dotenv import load_dotenv
 import os
 from rest_framework import status
 from rest_framework.response import Response
-from django.shortcuts import get_object_or_404
-from api.models import Job, Comment
-from api.serializer import JobSerializer, CommentSerializer
+from asgiref.sync import sync_to_async
+from django.shortcuts import get_object_or_404, aget_object_or_404
+from api.models import Job, Comment, LLMCall
+from api.utils.llm_client import invoke_llm, ainvoke_llm, stream_llm, astream_llm
+from api.utils.prompt_budget import count_tokens, pack_comments
+from django.conf import settings
+from langchain_core.utils.json import parse_partial_json
+from api.utils.llm_cache import make_cache_key, get_cached_response, store_response
+from api.utils.llm_ledger import record_call
+import time
+
+logger = logging.getLogger(__name__)
 
 load_dotenv()
 
+MODEL_NAME = "gpt-4o"
+# Bump whenever `prompt` changes so cached answers are not reused
+PROMPT_VERSION = "1"
+
 prompt = """
 Please analyze the provided job data and freelancer feedback to extract information about the client. Specifically, you should:
 
@@ -49,7 +62,256 @@ def sanitize_json_string(json_string: str) -> str:
     return json_string
 
 
-def LLM(job_id: str = None, id: str = None):
+# Comment fields sent to the model as the client's job history
+COMMENT_FIELDS = ["job_title", "description", "freelancer_feedback", "posted_on"]
+
+
+def build_payload(job, comments, budget=None):
+    """
+    The deterministic `{"job": ..., "old_jobs": [...]}` document sent to the
+    model. `comments` are dicts holding at least COMMENT_FIELDS; they are
+    ranked and packed into `budget` prompt tokens (LLM_PROMPT_TOKEN_BUDGET).
+    """
+    if budget is None:
+        budget = settings.LLM_PROMPT_TOKEN_BUDGET
+    job = {
+        "title": job.title,
+        "description": job.description,
+        "skills": job.skills,
+        "is_payment_verified": job.is_payment_verified,
+        "client_location": job.client_location,
+        "pricing_details": job.pricing_details,
+        "rating": job.rating,
+    }
+    old_jobs = [{field: comment[field] for field in COMMENT_FIELDS} for comment in comments]
+    base_tokens = count_tokens(prompt + json.dumps({"job": job, "old_jobs": []}))
+    old_jobs = pack_comments(base_tokens, job, old_jobs, budget, model=MODEL_NAME)
+    return {"job": job, "old_jobs": old_jobs}
+
+
+def build_messages(data):
+    return [{"role": "system", "content": prompt + json.dumps(data)}]
+
+
+def parse_content(content):
+    response = sanitize_json_string(content)
+    response = response.replace("```", "")
+    response = response.replace("json", "")
+    return json.loads(response)
+
+
+FAILED_CALL = {"error": "An error occurred while processing the request.", "success": False}
+
+
+def prepare(job, comments):
+    """
+    `(messages, prompt_tokens, cache_key)` of the enrichment prompt for
+    `job` and its `comments` (Comment instances).
+    """
+    history = [
+        {field: getattr(comment, field) for field in COMMENT_FIELDS}
+        for comment in comments
+    ]
+    data = build_payload(job, history)
+    messages = build_messages(data)
+    prompt_tokens = count_tokens(messages[0]["content"])
+    return messages, prompt_tokens, make_cache_key(PROMPT_VERSION, MODEL_NAME, data)
+
+
+def call_failed(job, error, latency, prompt_tokens, retries):
+    logger.error(f"LLM call for job {job.job_id} failed: {error}")
+    record_call(
+        job, MODEL_NAME, PROMPT_VERSION, latency, LLMCall.ERROR,
+        prompt_tokens=prompt_tokens, retries=retries, error=str(error),
+    )
+    return FAILED_CALL
+
+
+def call_answered(job, response, latency, prompt_tokens, retries, cache_key):
+    """
+    Parse the model's answer, record the call and cache the result.
+    """
+    try:
+        content = parse_content(response.content)
+    except ValueError as e:
+        logger.error(f"Unparseable LLM response for job {job.job_id}: {e}")
+        record_call(
+            job, MODEL_NAME, PROMPT_VERSION, latency, LLMCall.INVALID,
+            response=response, prompt_tokens=prompt_tokens, retries=retries,
+            error=str(e),
+        )
+        return FAILED_CALL
+
+    record_call(
+        job, MODEL_NAME, PROMPT_VERSION, latency, LLMCall.SUCCESS,
+        response=response, prompt_tokens=prompt_tokens, retries=retries,
+    )
+    store_response(cache_key, MODEL_NAME, content, latency)
+    return {
+        "success": True,
+        **content,
+        "prompt_tokens": prompt_tokens,
+    }
+
+
+def enrich(job, comments, retries=0):
+    """
+    Run the enrichment prompt for an already loaded `job` and its `comments`
+    (Comment instances). Returns the parsed fields plus `success`.
+
+    Every model call is recorded in the LLMCall ledger; `retries` is the
+    number of earlier failed attempts for this job (enrichment queue).
+    """
+    try:
+        messages, prompt_tokens, cache_key = prepare(job, comments)
+        cached = get_cached_response(cache_key)
+        if cached is not None:
+            return {"success": True, **cached, "prompt_tokens": prompt_tokens}
+
+        started = time.perf_counter()
+        try:
+            response = invoke_llm(MODEL_NAME, messages)
+        except Exception as e:
+            return call_failed(job, e, time.perf_counter() - started, prompt_tokens, retries)
+        latency = time.perf_counter() - started
+        return call_answered(job, response, latency, prompt_tokens, retries, cache_key)
+
+    except Exception as e:
+        logger.exception(f"Enrichment of job {job.job_id} failed: {e}")
+        return {"success": False}
+
+
+async def aenrich(job, comments, retries=0):
+    """
+    Async counterpart of `enrich`: the model is awaited through
+    `ainvoke_llm`, so no thread waits on it. The cache and ledger writes
+    run through sync_to_async.
+    """
+    try:
+        messages, prompt_tokens, cache_key = prepare(job, comments)
+        cached = await sync_to_async(get_cached_response)(cache_key)
+        if cached is not None:
+            return {"success": True, **cached, "prompt_tokens": prompt_tokens}
+
+        started = time.perf_counter()
+        try:
+            response = await ainvoke_llm(MODEL_NAME, messages)
+        except Exception as e:
+            return await sync_to_async(call_failed)(
+                job, e, time.perf_counter() - started, prompt_tokens, retries
+            )
+        latency = time.perf_counter() - started
+        return await sync_to_async(call_answered)(
+            job, response, latency, prompt_tokens, retries, cache_key
+        )
+
+    except Exception as e:
+        logger.exception(f"Enrichment of job {job.job_id} failed: {e}")
+        return {"success": False}
+
+
+class PartialAnswer:
+    """
+    The model's JSON answer while it streams in. `feed` takes the next
+    piece of text and returns `{"name": ..., "value": ...}` for every
+    top-level field whose (partial) value changed.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.fields = {}
+
+    def feed(self, text):
+        self.text += text
+        start = self.text.find("{")  # Skips a ```json fence
+        if start < 0:
+            return []
+        partial = parse_partial_json(self.text[start:].rstrip("`\n "))
+        if not isinstance(partial, dict):
+            return []
+        changed = []
+        for name, value in partial.items():
+            if self.fields.get(name) != value:
+                self.fields[name] = value
+                changed.append({"name": name, "value": value})
+        return changed
+
+
+def stream_enrich(job, comments, retries=0):
+    """
+    `enrich` with the model's streaming mode. Yields `("field", {"name",
+    "value"})` as answer fields grow, then `("result", ...)` with what
+    `enrich` would have returned. Cached answers only yield the result.
+    """
+    try:
+        messages, prompt_tokens, cache_key = prepare(job, comments)
+        cached = get_cached_response(cache_key)
+        if cached is not None:
+            yield "result", {"success": True, **cached, "prompt_tokens": prompt_tokens}
+            return
+
+        answer = PartialAnswer()
+        response = None
+        started = time.perf_counter()
+        try:
+            for chunk in stream_llm(MODEL_NAME, messages):
+                response = chunk if response is None else response + chunk
+                for field in answer.feed(chunk.content):
+                    yield "field", field
+            if response is None:
+                raise ValueError("Empty response stream")
+        except Exception as e:
+            yield "result", call_failed(
+                job, e, time.perf_counter() - started, prompt_tokens, retries
+            )
+            return
+        latency = time.perf_counter() - started
+        yield "result", call_answered(
+            job, response, latency, prompt_tokens, retries, cache_key
+        )
+
+    except Exception as e:
+        logger.exception(f"Enrichment of job {job.job_id} failed: {e}")
+        yield "result", {"success": False}
+
+
+async def astream_enrich(job, comments, retries=0):
+    """
+    Async counterpart of `stream_enrich`.
+    """
+    try:
+        messages, prompt_tokens, cache_key = prepare(job, comments)
+        cached = await sync_to_async(get_cached_response)(cache_key)
+        if cached is not None:
+            yield "result", {"success": True, **cached, "prompt_tokens": prompt_tokens}
+            return
+
+        answer = PartialAnswer()
+        response = None
+        started = time.perf_counter()
+        try:
+            async for chunk in astream_llm(MODEL_NAME, messages):
+                response = chunk if response is None else response + chunk
+                for field in answer.feed(chunk.content):
+                    yield "field", field
+            if response is None:
+                raise ValueError("Empty response stream")
+        except Exception as e:
+            yield "result", await sync_to_async(call_failed)(
+                job, e, time.perf_counter() - started, prompt_tokens, retries
+            )
+            return
+        latency = time.perf_counter() - started
+        yield "result", await sync_to_async(call_answered)(
+            job, response, latency, prompt_tokens, retries, cache_key
+        )
+
+    except Exception as e:
+        logger.exception(f"Enrichment of job {job.job_id} failed: {e}")
+        yield "result", {"success": False}
+
+
+def LLM(job_id: str = None, id: str = None, retries=0):
     try:
         if job_id:
             job = get_object_or_404(Job.objects.all(), job_id=job_id)
@@ -57,50 +319,27 @@ def LLM(job_id: str = None, id: str = None):
             job = get_object_or_404(Job.objects.all(), id=id)
         else:
             return
-        comments = Comment.objects.filter(job=job)
-        comment_serializer = CommentSerializer(comments, many=True)
-
-        job = {
-            "title": job.title,
-            "description": job.description,
-            "skills": job.skills,
-            "is_payment_verified": job.is_payment_verified,
-            "client_location": job.client_location,
-            "pricing_details": job.pricing_details,
-            "rating": job.rating,
-        }
-
-        comments = []
-
-        for comment in comment_serializer.data:
-            comment = {
-                # "rating": comment["rating"],
-                # "billed_amount": comment["billed_amount"],
-                "job_title": comment["job_title"],
-                "description": comment["description"],
-                "freelancer_feedback": comment["freelancer_feedback"],
-                "posted_on": comment["posted_on"],
-            }
-            comments.append(comment)
-
-        data = {"job": job, "old_jobs": comments}
-
-        llm = ChatOpenAI(model="gpt-4o", api_key=os.getenv("OPENAI_API_KEY"))
-        try:
-            messages = [{"role": "system", "content": prompt + json.dumps(data)}]
-            response = llm.invoke(messages)
-            response = sanitize_json_string(response.content)
-            response = response.replace("```", "")
-            response = response.replace("json", "")
-            response = json.loads(response)
-            return {
-                "success": True,
-                **response,
-            }
-        except Exception as e:
-            print(e)
-            return {"error": "An error occurred while processing the request.", "success": False}
+        return enrich(job, Comment.objects.filter(job=job), retries=retries)
+
+    except Exception as e:
+        logger.error(f"LLM({job_id or id}) failed: {e}")
+        return {"success": False}
+
+
+async def aLLM(job_id: str = None, id: str = None, retries=0):
+    """
+    Async counterpart of `LLM`.
+    """
+    try:
+        if job_id:
+            job = await aget_object_or_404(Job, job_id=job_id)
+        elif id:
+            job = await aget_object_or_404(Job, id=id)
+        else:
+            return
+        comments = [comment async for comment in Comment.objects.filter(job=job)]
+        return await aenrich(job, comments, retries=retries)
 
     except Exception as e:
-        print(e)
+        logger.error(f"aLLM({job_id or id}) failed: {e}")
         return {"success": False}
@@ -0,0 +1,118 @@
+import hashlib
+from django.db.models import Count, Max, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from api.models import Job, Comment, LLMResponse
+
+
+class Validators:
+    """
+    ETag for a response variant.
+
+    No Last-Modified: a max `updated_at` does not move when a row is
+    deleted, so an If-Modified-Since-only client would get a 304 for a
+    response that changed. The ETag covers deletes through row counts.
+    """
+
+    def __init__(self, *parts, variant=""):
+        self.parts = parts
+        self.variant = variant
+        digest = hashlib.sha1(
+            "|".join(str(part) for part in (variant, *parts)).encode("utf-8")
+        ).hexdigest()
+        self.etag = quote_etag(digest)
+
+    def for_variant(self, variant):
+        """
+        Same state, different representation (e.g. JSON vs HTML).
+        """
+        return Validators(*self.parts, variant=variant)
+
+    def not_modified(self, request):
+        """
+        A 304 response when the client's If-None-Match still matches,
+        otherwise None.
+        """
+        response = get_conditional_response(request, etag=self.etag)
+        if response is not None:
+            self.apply(response)
+        return response
+
+    def apply(self, response):
+        response.headers["ETag"] = self.etag
+        # Always revalidate instead of heuristic caching
+        patch_cache_control(response, no_cache=True)
+        return response
+
+
+def _related_stats(model, field):
+    return Subquery(
+        model.objects.filter(job=OuterRef("pk"))
+        .order_by()
+        .values("job")
+        .annotate(value=field)
+        .values("value")[:1]
+    )
+
+
+def job_detail_validators(query_params, variant=""):
+    """
+    Validators for the job detail payload, derived from the max
+    `updated_at` (and row counts, so deletes are noticed) of the job, its
+    comments and its LLM responses in a single query.
+
+    Returns None when the job is unknown or still has to be enriched,
+    since that response is not a stable representation yet.
+    """
+    job_id = query_params.get("job_id")
+    pk = query_params.get("id")
+    lookup = {"job_id": job_id} if job_id else {"id": pk}
+    row = (
+        Job.objects.filter(**lookup)
+        .annotate(
+            comments_updated=_related_stats(Comment, Max("updated_at")),
+            comments_count=_related_stats(Comment, Count("id")),
+            llm_updated=_related_stats(LLMResponse, Max("updated_at")),
+            llm_count=_related_stats(LLMResponse, Count("id")),
+        )
+        .values(
+            "pk",
+            "updated_at",
+            "comments_updated",
+            "comments_count",
+            "llm_updated",
+            "llm_count",
+        )
+        .first()
+    )
+    if row is None or not row["llm_count"]:
+        return None
+
+    last_modified = max(
+        value
+        for value in (row["updated_at"], row["comments_updated"], row["llm_updated"])
+        if value is not None
+    )
+    return Validators(
+        last_modified,
+        row["pk"],
+        row["comments_count"] or 0,
+        row["llm_count"],
+        query_params.get("need_comments") != "false",
+        variant=variant,
+    )
+
+
+def job_list_validators(queryset, variant=""):
+    """
+    Validators for a set of jobs (a page window or the whole table): max
+    `updated_at`, row count and id sum, so edits, inserts and deletes all
+    change the ETag. One aggregate query.
+    """
+    stats = queryset.aggregate(
+        last_modified=Max("updated_at"), count=Count("id"), ids=Coalesce(Sum("id"), 0)
+    )
+    return Validators(
+        stats["last_modified"], stats["count"], stats["ids"], variant=variant
+    )
@@ -0,0 +1,118 @@
+import pickle
+import threading
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+CACHE_ALIAS = "job_detail"
+
+# Process-local counters and an approximate size of what this process stored
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "sets": 0, "invalidations": 0}
+_sizes = {}
+
+
+def _cache():
+    return caches[CACHE_ALIAS]
+
+
+def private_caches(location):
+    """
+    CACHES with the job detail cache in a directory of its own, for test
+    and benchmark runs: they clear it and write rows the servers on the
+    host never stored, so they must not use the configured one.
+    """
+    return {
+        **settings.CACHES,
+        CACHE_ALIAS: {
+            **settings.CACHES[CACHE_ALIAS],
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": str(location),
+        },
+    }
+
+
+def _payload_key(pk, need_comments):
+    return f"job-detail:{pk}:{int(need_comments)}"
+
+
+def _alias_key(job_id):
+    # job_id -> pk, so lookups by job_id need no query either
+    return f"job-detail-id:{job_id}"
+
+
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def _resolve_pk(query_params):
+    job_id = query_params.get("job_id")
+    if job_id:
+        return _cache().get(_alias_key(job_id))
+    pk = query_params.get("id")
+    return int(pk) if pk and pk.isdigit() else None
+
+
+def get_job_detail(query_params):
+    """
+    Cached `(payload, validators)` for a detail request, or None.
+    """
+    pk = _resolve_pk(query_params)
+    entry = None
+    if pk is not None:
+        need_comments = query_params.get("need_comments") != "false"
+        entry = _cache().get(_payload_key(pk, need_comments))
+    _count("hits" if entry is not None else "misses")
+    return entry
+
+
+def set_job_detail(query_params, payload, validators):
+    """
+    Cache a detail payload until one of its rows is written. Only stable
+    payloads (stored LLM response, no refresh) should be passed in.
+    """
+    pk = payload["job"]["id"]
+    need_comments = query_params.get("need_comments") != "false"
+    key = _payload_key(pk, need_comments)
+    entry = (payload, validators)
+    timeout = settings.JOB_DETAIL_CACHE_TIMEOUT
+    _cache().set_many(
+        {key: entry, _alias_key(payload["job"]["job_id"]): pk}, timeout=timeout
+    )
+    with _stats_lock:
+        _stats["sets"] += 1
+        _sizes[key] = len(pickle.dumps(entry, pickle.HIGHEST_PROTOCOL))
+
+
+def invalidate_job_detail(*pks, job_ids=()):
+    """
+    Drop cached payloads for the given job pks (and job_id aliases).
+    """
+    keys = [_payload_key(pk, need) for pk in pks for need in (True, False)]
+    keys += [_alias_key(job_id) for job_id in job_ids]
+    if not keys:
+        return
+    _cache().delete_many(keys)
+    # Inside a transaction a reader may cache the old rows again before
+    # the commit: invalidate once more when it lands
+    transaction.on_commit(lambda: _cache().delete_many(keys))
+    with _stats_lock:
+        _stats["invalidations"] += len(pks)
+        for key in keys:
+            _sizes.pop(key, None)
+
+
+def cache_stats():
+    with _stats_lock:
+        stats = dict(_stats)
+        stored_bytes = sum(_sizes.values())
+        entries = len(_sizes)
+    lookups = stats["hits"] + stats["misses"]
+    return {
+        **stats,
+        "hit_rate": stats["hits"] / lookups if lookups else 0.0,
+        "entries": entries,
+        "bytes": stored_bytes,
+        "backend": settings.CACHES[CACHE_ALIAS]["BACKEND"],
+    }
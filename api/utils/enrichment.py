@@ -0,0 +1,225 @@
+import asyncio
+import logging
+import time
+import uuid
+from datetime import timedelta
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from api.models import EnrichmentLease, EnrichmentTask, LLMResponse
+from api.utils.LLM import LLM
+
+logger = logging.getLogger(__name__)
+
+# Fields stored in their own LLMResponse columns, everything else goes
+# to `other_data`.
+LLM_RESPONSE_FIELDS = ["client_names", "keywords", "company", "client_location"]
+
+
+def build_llm_response(job, llm_data):
+    """
+    Unsaved LLMResponse for a successful LLM() result, for bulk_create.
+    """
+    other_data = {
+        key: value
+        for key, value in llm_data.items()
+        if key not in LLM_RESPONSE_FIELDS + ["success", "prompt_tokens"]
+    }
+    return LLMResponse(
+        job=job,
+        client_names=llm_data.get("client_names"),
+        keywords=llm_data.get("keywords"),
+        company=llm_data.get("company"),
+        client_location=llm_data.get("client_location"),
+        other_data=other_data,
+        prompt_tokens=llm_data.get("prompt_tokens"),
+    )
+
+
+def save_llm_response(job, llm_data):
+    """
+    Persist a successful LLM() result for `job`.
+    """
+    llm_response = build_llm_response(job, llm_data)
+    llm_response.save()
+    return llm_response
+
+
+class EnrichmentInProgress(Exception):
+    """
+    Another request is still enriching the job.
+    """
+
+
+# Seconds between checks while another request holds a job's lease
+LEASE_POLL_INTERVAL = 0.1
+
+
+def acquire_lease(job):
+    """
+    Take the inline enrichment lease of `job`. Returns the owner token, or
+    None when another request holds it. An expired lease (its holder
+    crashed or hung) is taken over.
+    """
+    token = uuid.uuid4().hex
+    now = timezone.now()
+    expires_at = now + timedelta(seconds=settings.ENRICHMENT_INLINE_TIMEOUT)
+    try:
+        # Savepoint: a failed INSERT must not break an outer transaction
+        with transaction.atomic():
+            EnrichmentLease.objects.create(job=job, owner=token, expires_at=expires_at)
+        return token
+    except IntegrityError:
+        taken = EnrichmentLease.objects.filter(job=job, expires_at__lt=now).update(
+            owner=token, expires_at=expires_at
+        )
+        return token if taken else None
+
+
+def release_lease(job, token):
+    # Only our own lease: it may have expired and been taken over
+    EnrichmentLease.objects.filter(job=job, owner=token).delete()
+
+
+def lease_held(job):
+    return EnrichmentLease.objects.filter(job=job, expires_at__gte=timezone.now()).exists()
+
+
+def wait_for_lease(job):
+    """
+    Block until nobody holds the lease of `job`. Raises
+    EnrichmentInProgress after ENRICHMENT_INLINE_TIMEOUT seconds.
+    """
+    deadline = time.monotonic() + settings.ENRICHMENT_INLINE_TIMEOUT
+    while lease_held(job):
+        if time.monotonic() >= deadline:
+            raise EnrichmentInProgress(f"Job {job.job_id} is still being enriched")
+        time.sleep(LEASE_POLL_INTERVAL)
+
+
+async def await_lease(job):
+    """
+    Async counterpart of `wait_for_lease`, sleeps without holding a thread.
+    """
+    deadline = time.monotonic() + settings.ENRICHMENT_INLINE_TIMEOUT
+    while await sync_to_async(lease_held)(job):
+        if time.monotonic() >= deadline:
+            raise EnrichmentInProgress(f"Job {job.job_id} is still being enriched")
+        await asyncio.sleep(LEASE_POLL_INTERVAL)
+
+
+def enqueue_enrichment(job):
+    """
+    Queue an enrichment for `job`, reusing a task that has not started yet.
+    """
+    task = EnrichmentTask.objects.filter(
+        job=job, status=EnrichmentTask.PENDING
+    ).first()
+    if task:
+        return task
+    return EnrichmentTask.objects.create(
+        job=job, max_attempts=settings.ENRICHMENT_MAX_ATTEMPTS
+    )
+
+
+def claim_next_task():
+    """
+    Atomically move the oldest runnable task to RUNNING and return it.
+
+    Claiming is a conditional UPDATE so several workers (threads or
+    processes) can share the queue on Postgres and SQLite alike. RUNNING
+    tasks whose lease expired (crashed worker) are claimed again. The same
+    UPDATE counts the attempt, so a crashed attempt counts too.
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.ENRICHMENT_LEASE_SECONDS)
+    candidates = (
+        EnrichmentTask.objects.filter(
+            Q(status=EnrichmentTask.PENDING, run_after__lte=now)
+            | Q(status=EnrichmentTask.RUNNING, locked_at__lt=stale)
+        )
+        .order_by("run_after", "id")
+        .values_list("id", "status", "locked_at")[:10]
+    )
+    for pk, task_status, locked_at in candidates:
+        claimed = EnrichmentTask.objects.filter(
+            pk=pk, status=task_status, locked_at=locked_at
+        ).update(
+            status=EnrichmentTask.RUNNING,
+            attempts=F("attempts") + 1,
+            locked_at=now,
+            updated_at=now,
+        )
+        if claimed:
+            return EnrichmentTask.objects.select_related("job").get(pk=pk)
+    return None
+
+
+def run_task(task):
+    """
+    Call the model for a claimed task and record the outcome. Failures are
+    retried with exponential backoff until `max_attempts` is reached.
+
+    The outcome is only recorded while the task is still ours: a worker
+    whose lease expired and was claimed again by another one drops it.
+
+    Like inline enrichment, the model is only called while holding the
+    job's enrichment lease and when the job has no LLMResponse yet. A task
+    whose job is being enriched by a request is put back without counting
+    the attempt, and finds that request's response on its next run.
+    """
+    try:
+        token = acquire_lease(task.job)
+        if token is None:
+            task.status = EnrichmentTask.PENDING
+            task.attempts -= 1
+            task.run_after = timezone.now() + timedelta(
+                seconds=settings.ENRICHMENT_INLINE_TIMEOUT
+            )
+            _save_outcome(task, "attempts", "run_after")
+            return task
+
+        try:
+            llm_response = task.job.llm_responses.first()
+            if llm_response is None:
+                llm_data = LLM(job_id=task.job.job_id, retries=task.attempts - 1)
+                if not llm_data or not llm_data.get("success"):
+                    raise RuntimeError((llm_data or {}).get("error", "LLM call failed"))
+
+            with transaction.atomic():
+                if llm_response is None:
+                    llm_response = save_llm_response(task.job, llm_data)
+                task.llm_response = llm_response
+                task.status = EnrichmentTask.DONE
+                task.last_error = None
+                if not _save_outcome(task, "llm_response"):
+                    transaction.set_rollback(True)
+        finally:
+            release_lease(task.job, token)
+    except Exception as e:
+        logger.error(f"Enrichment task {task.pk} failed: {e}")
+        task.last_error = str(e)
+        if task.attempts >= task.max_attempts:
+            task.status = EnrichmentTask.FAILED
+        else:
+            task.status = EnrichmentTask.PENDING
+            backoff = settings.ENRICHMENT_RETRY_BACKOFF * 2 ** (task.attempts - 1)
+            task.run_after = timezone.now() + timedelta(seconds=backoff)
+        _save_outcome(task, "run_after")
+    return task
+
+
+def _save_outcome(task, *fields):
+    # Conditional on the claim: status and locked_at are what claim_next_task set
+    claimed_at = task.locked_at
+    task.locked_at = None
+    task.updated_at = timezone.now()
+    fields = ("status", "last_error", "locked_at", "updated_at", *fields)
+    saved = EnrichmentTask.objects.filter(
+        pk=task.pk, status=EnrichmentTask.RUNNING, locked_at=claimed_at
+    ).update(**{field: getattr(task, field) for field in fields})
+    if not saved:
+        logger.warning(f"Enrichment task {task.pk} was claimed by another worker")
+    return saved
@@ -0,0 +1,131 @@
+import csv
+import io
+import json
+import zlib
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+from api.models import Job_List, Job, Comment, LLMResponse
+
+EXPORT_MODELS = {
+    "job_list": Job_List,
+    "jobs": Job,
+    "comments": Comment,
+    "llm_responses": LLMResponse,
+}
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+# Rows fetched per round trip (a server-side cursor on Postgres)
+CHUNK_SIZE = 2000
+# Flush encoded output in blocks of roughly this many bytes
+BUFFER_SIZE = 64 * 1024
+
+
+def parse_range(updated_since=None, updated_until=None):
+    bounds = {}
+    for name, value in (("gte", updated_since), ("lt", updated_until)):
+        if not value:
+            continue
+        parsed = parse_datetime(value)
+        if parsed is None:
+            raise ValidationError(f"Invalid datetime: {value}")
+        bounds[f"updated_at__{name}"] = parsed
+    return bounds
+
+
+def export_queryset(table, updated_since=None, updated_until=None):
+    if table not in EXPORT_MODELS:
+        raise ValidationError(
+            f"Unknown table '{table}', expected one of: {', '.join(EXPORT_MODELS)}"
+        )
+    model = EXPORT_MODELS[table]
+    return (
+        model.objects.filter(**parse_range(updated_since, updated_until))
+        .order_by("pk")
+        .values()
+    )
+
+
+def _ndjson_lines(rows):
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder) + "\n"
+
+
+def _csv_lines(rows, fields):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def line(values):
+        writer.writerow(values)
+        value = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return value
+
+    yield line(fields)
+    for row in rows:
+        yield line(
+            [
+                json.dumps(row[field], cls=DjangoJSONEncoder)
+                if isinstance(row[field], (dict, list))
+                else row[field]
+                for field in fields
+            ]
+        )
+
+
+def parse_export_options(query_params):
+    """
+    `(output, compress)` from `?output=csv&gzip=true`.
+    """
+    output = query_params.get("output", "ndjson")
+    if output not in EXPORT_FORMATS:
+        raise ValidationError(f"Unknown output '{output}', expected ndjson or csv")
+    gzip = query_params.get("gzip", "false")
+    if gzip not in ("true", "false"):
+        raise ValidationError("'gzip' must be true or false")
+    return output, gzip == "true"
+
+
+def iter_export(queryset, output="ndjson", compress=False):
+    """
+    Encode `queryset` (a `.values()` queryset) as NDJSON or CSV, yielding
+    bytes blocks. Rows are streamed with a chunked iterator, so memory use
+    does not depend on the table size. `compress` gzips on the fly.
+
+    `output` is checked here, not in the generator: a generator body only
+    runs once the response is already being streamed.
+    """
+    if output not in EXPORT_FORMATS:
+        raise ValidationError(f"Unknown output '{output}', expected ndjson or csv")
+    return _iter_export(queryset, output, compress)
+
+
+def _iter_export(queryset, output, compress):
+    rows = queryset.iterator(chunk_size=CHUNK_SIZE)
+    if output == "csv":
+        fields = [field.attname for field in queryset.model._meta.concrete_fields]
+        lines = _csv_lines(rows, fields)
+    else:
+        lines = _ndjson_lines(rows)
+
+    compressor = zlib.compressobj(wbits=31) if compress else None  # 31: gzip
+    block = []
+    size = 0
+    for line in lines:
+        block.append(line)
+        size += len(line)
+        if size >= BUFFER_SIZE:
+            data = "".join(block).encode("utf-8")
+            block, size = [], 0
+            data = compressor.compress(data) if compressor else data
+            if data:
+                yield data
+
+    data = "".join(block).encode("utf-8")
+    if compressor:
+        data = compressor.compress(data) + compressor.flush()
+    if data:
+        yield data
@@ -0,0 +1,124 @@
+from functools import lru_cache
+from django.utils import timezone
+from rest_framework import ISO_8601
+from rest_framework import fields as drf_fields
+from rest_framework.relations import PrimaryKeyRelatedField
+from rest_framework.settings import api_settings
+
+# Serializer fields whose to_representation() returns database values
+# unchanged, so they can be copied straight from `.values()` rows
+PASSTHROUGH_FIELDS = (
+    drf_fields.BooleanField,
+    drf_fields.CharField,  # Also URLField, EmailField, ...
+    drf_fields.ChoiceField,
+    drf_fields.FloatField,
+    drf_fields.IntegerField,
+    drf_fields.JSONField,
+    drf_fields.ReadOnlyField,
+    PrimaryKeyRelatedField,  # `.values()` already yields the pk
+)
+
+
+# Keyed by (serializer class, fieldset); fieldsets come from ?fields=
+@lru_cache(maxsize=256)
+def _columns(serializer_class, fieldset):
+    """
+    `[(name, attname, field)]` in the serializer's field order. `field` is
+    None for pass-through fields, otherwise the serializer field whose
+    to_representation converts the value (dates, decimals, ...).
+    """
+    serializer = serializer_class()
+    model = serializer.Meta.model
+    columns = []
+    for name, field in serializer.fields.items():
+        if fieldset is not None and name not in fieldset:
+            continue
+        passthrough = isinstance(field, PASSTHROUGH_FIELDS) and not (
+            isinstance(field, drf_fields.JSONField) and field.binary
+        )
+        attname = model._meta.get_field(field.source).attname
+        columns.append((name, attname, None if passthrough else field))
+    return columns
+
+
+def _datetime_converter(field):
+    """
+    DateTimeField.to_representation with the field's timezone resolved
+    once per call instead of once per value.
+    """
+    output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+    if output_format is None or output_format.lower() != ISO_8601:
+        return field.to_representation
+    field_timezone = getattr(field, "timezone", None) or field.default_timezone()
+    if field_timezone is None:
+        return field.to_representation
+
+    def convert(value):
+        if isinstance(value, str) or not timezone.is_aware(value):
+            return field.to_representation(value)
+        value = value.astimezone(field_timezone).isoformat()
+        if value.endswith("+00:00"):
+            value = value[:-6] + "Z"
+        return value
+
+    return convert
+
+
+def _converters(serializer_class, fieldset):
+    converters = []
+    for name, attname, field in _columns(serializer_class, fieldset):
+        if field is None:
+            converter = None
+        elif isinstance(field, drf_fields.DateTimeField):
+            converter = _datetime_converter(field)
+        else:
+            converter = field.to_representation
+        converters.append((name, attname, converter))
+    return converters
+
+
+def value_columns(serializer_class, fieldset=None):
+    """
+    Field names to pass to `.values()` for `serializer_class`.
+    """
+    fieldset = tuple(fieldset) if fieldset is not None else None
+    return [name for name, _, _ in _columns(serializer_class, fieldset)]
+
+
+def _represent(columns, values):
+    # Like Serializer.to_representation, None is never converted
+    return {
+        name: value if converter is None or value is None else converter(value)
+        for (name, converter), value in zip(columns, values)
+    }
+
+
+def fast_rows(rows, serializer_class, fieldset=None):
+    """
+    Serializer-compatible dicts for `.values()` rows (fetched with
+    `value_columns`) without instantiating a serializer per row.
+    """
+    fieldset = tuple(fieldset) if fieldset is not None else None
+    converters = _converters(serializer_class, fieldset)
+    columns = [(name, converter) for name, _, converter in converters]
+    names = [name for name, _, _ in converters]
+    return [_represent(columns, [row[name] for name in names]) for row in rows]
+
+
+def fast_instances(instances, serializer_class, fieldset=None):
+    """
+    Same as `fast_rows` for model instances that are already loaded.
+    Foreign keys are read from their `<name>_id` attribute, never fetched.
+    """
+    fieldset = tuple(fieldset) if fieldset is not None else None
+    converters = _converters(serializer_class, fieldset)
+    columns = [(name, converter) for name, _, converter in converters]
+    attnames = [attname for _, attname, _ in converters]
+    return [
+        _represent(columns, [getattr(instance, attname) for attname in attnames])
+        for instance in instances
+    ]
+
+
+def fast_instance(instance, serializer_class, fieldset=None):
+    return fast_instances([instance], serializer_class, fieldset)[0]
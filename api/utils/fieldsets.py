@@ -0,0 +1,50 @@
+from rest_framework.exceptions import ValidationError
+
+
+def parse_fieldset(query_params, serializer_class):
+    """
+    Field names selected by `?fields=a,b` or `?exclude=c,d`, in declaration
+    order, or None when neither parameter is given.
+    """
+    fields = query_params.get("fields")
+    exclude = query_params.get("exclude")
+    if not fields and not exclude:
+        return None
+    if fields and exclude:
+        raise ValidationError("Use either 'fields' or 'exclude', not both")
+
+    available = list(serializer_class().fields)
+    requested = [name.strip() for name in (fields or exclude).split(",") if name.strip()]
+    unknown = [name for name in requested if name not in available]
+    if unknown:
+        raise ValidationError(f"Unknown field(s): {', '.join(unknown)}")
+
+    if fields:
+        selected = [name for name in available if name in requested]
+    else:
+        selected = [name for name in available if name not in requested]
+    if not selected:
+        raise ValidationError("No fields selected")
+    return selected
+
+
+def only_columns(queryset, fieldset, extra=()):
+    """
+    Restrict the SELECT to the columns backing `fieldset` (plus `extra`,
+    e.g. the ordering columns), so large text / JSON columns that are not
+    serialized are never read.
+    """
+    if fieldset is None:
+        return queryset
+    model_fields = {field.name for field in queryset.model._meta.concrete_fields}
+    columns = [name for name in [*fieldset, *extra] if name in model_fields]
+    return queryset.only(*columns)
+
+
+def project(data, fieldset):
+    """
+    Apply a fieldset to an already serialized dict.
+    """
+    if fieldset is None:
+        return data
+    return {name: data[name] for name in fieldset if name in data}
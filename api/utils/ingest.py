@@ -0,0 +1,263 @@
+import threading
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from api.models import Job_List, Comment
+from api.serializer import JobListIngestSerializer, CommentIngestSerializer
+from api.utils.detail_cache import invalidate_job_detail
+from api.utils.search import refresh_search_index
+
+# Keep the `IN (...)` lookup and the INSERT batches well under the
+# bind-parameter limits of both Postgres and SQLite.
+LOOKUP_CHUNK_SIZE = 1000
+INSERT_BATCH_SIZE = 500
+
+# Columns rewritten when an upserted row has changed
+UPSERT_FIELDS = [
+    field.attname
+    for field in Job_List._meta.concrete_fields
+    if field.attname not in ("id", "job_id", "created_at")
+]
+
+# Process-local Job_List ingest counters, see ingest_stats()
+_stats_lock = threading.Lock()
+_stats = {
+    "batches": 0,
+    "received": 0,
+    "created": 0,
+    "updated": 0,
+    "unchanged": 0,
+    "skipped": 0,
+    "invalid": 0,
+}
+
+
+def _lookup(model, job_ids, *fields):
+    job_ids = list(job_ids)
+    for start in range(0, len(job_ids), LOOKUP_CHUNK_SIZE):
+        chunk = job_ids[start : start + LOOKUP_CHUNK_SIZE]
+        yield from model.objects.filter(job_id__in=chunk).values_list(*fields)
+
+
+def existing_job_ids(model, job_ids):
+    """
+    Return the subset of `job_ids` already stored for `model`.
+    """
+    return {job_id for job_id, in _lookup(model, job_ids, "job_id")}
+
+
+def existing_job_hashes(job_ids):
+    """
+    `{job_id: (id, content_hash)}` for the stored Job_List rows among `job_ids`.
+    """
+    return {
+        job_id: (pk, content_hash)
+        for job_id, pk, content_hash in _lookup(
+            Job_List, job_ids, "job_id", "id", "content_hash"
+        )
+    }
+
+
+def bulk_update_rows(model, objs, fields, batch_size=INSERT_BATCH_SIZE):
+    """
+    Write `fields` of `objs` by primary key with one `UPDATE ... FROM
+    (VALUES ...)` statement per batch. Unlike QuerySet.bulk_update, which
+    builds a CASE expression per field and row, the SQL stays small and
+    cheap to compile. Falls back to bulk_update on other backends.
+    """
+    vendor = connection.vendor
+    if vendor not in ("postgresql", "sqlite"):
+        model.objects.bulk_update(objs, fields, batch_size=batch_size)
+        return
+
+    table = connection.ops.quote_name(model._meta.db_table)
+    pk = model._meta.pk
+    columns = [pk] + [model._meta.get_field(name) for name in fields]
+    if vendor == "postgresql":
+        # VALUES rows are untyped, so cast each placeholder to its column type
+        placeholder = "(" + ", ".join(
+            f"%s::{field.cast_db_type(connection)}" for field in columns
+        ) + ")"
+        names = ", ".join(connection.ops.quote_name(field.column) for field in columns)
+        source = f"AS v ({names})"
+        refs = [f"v.{connection.ops.quote_name(field.column)}" for field in columns]
+    else:
+        # SQLite names VALUES columns column1, column2, ...
+        placeholder = "(" + ", ".join(["%s"] * len(columns)) + ")"
+        source = "AS v"
+        refs = [f"v.column{position}" for position in range(1, len(columns) + 1)]
+    assignments = ", ".join(
+        f"{connection.ops.quote_name(field.column)} = {ref}"
+        for field, ref in zip(columns[1:], refs[1:])
+    )
+    pk_column = f"{table}.{connection.ops.quote_name(pk.column)}"
+
+    with connection.cursor() as cursor:
+        for start in range(0, len(objs), batch_size):
+            batch = objs[start : start + batch_size]
+            params = [
+                field.get_db_prep_save(getattr(obj, field.attname), connection)
+                for obj in batch
+                for field in columns
+            ]
+            cursor.execute(
+                f"UPDATE {table} SET {assignments} "
+                f"FROM (VALUES {', '.join([placeholder] * len(batch))}) {source} "
+                f"WHERE {pk_column} = {refs[0]}",
+                params,
+            )
+
+
+def bulk_insert_count(model, objs, **kwargs):
+    """
+    `bulk_create` returning how many rows the database actually inserted:
+    with `ignore_conflicts` it drops rows that conflict with ones stored
+    concurrently, which `bulk_create` does not report. Summed from the
+    INSERT statements' row counts.
+    """
+    inserted = 0
+
+    def count_rows(execute, sql, params, many, context):
+        nonlocal inserted
+        result = execute(sql, params, many, context)
+        if sql.lstrip().upper().startswith("INSERT"):
+            inserted += max(context["cursor"].rowcount, 0)
+        return result
+
+    with connection.execute_wrapper(count_rows):
+        model.objects.bulk_create(objs, **kwargs)
+    return inserted
+
+
+def _count(**counts):
+    with _stats_lock:
+        for name, value in counts.items():
+            _stats[name] += value
+
+
+def ingest_stats():
+    """
+    Process-wide Job_List ingest counters. `churn_rate` is the share of
+    re-scraped rows whose content had actually changed.
+    """
+    with _stats_lock:
+        stats = dict(_stats)
+    seen_again = stats["updated"] + stats["unchanged"]
+    return {**stats, "churn_rate": stats["updated"] / seen_again if seen_again else 0.0}
+
+
+def bulk_ingest_job_list(jobs, upsert=False):
+    """
+    Validate a scraped batch in memory and write it in one transaction.
+
+    Rows with a new job_id are inserted. Known rows are skipped, or with
+    `upsert` compared by content hash: unchanged rows are not written at
+    all and changed rows are replaced by the scraped version with one
+    UPDATE statement per batch. Returns the per-outcome counts.
+    """
+    candidates = {}
+    errors = []
+    skipped = 0
+    # One serializer instance validates every row, so DRF builds its
+    # fields once per batch instead of once per row.
+    validator = JobListIngestSerializer()
+
+    for index, job_data in enumerate(jobs):
+        if not isinstance(job_data, dict) or not job_data.get("job_id"):
+            errors.append({"index": index, "errors": {"job_id": ["Job ID is required"]}})
+            continue
+
+        try:
+            validated_data = validator.run_validation(job_data)
+        except ValidationError as e:
+            errors.append({"index": index, "errors": e.detail})
+            continue
+
+        job_id = validated_data["job_id"]
+        if job_id in candidates:
+            skipped += 1  # Duplicate within the same batch
+            continue
+        candidates[job_id] = validated_data
+
+    if upsert:
+        existing = existing_job_hashes(candidates.keys())
+    else:
+        existing = existing_job_ids(Job_List, candidates.keys())
+
+    new_jobs = []
+    changed_jobs = []
+    unchanged = 0
+    now = timezone.now()
+    for job_id, validated_data in candidates.items():
+        if job_id in existing and not upsert:
+            skipped += 1
+            continue
+        job = Job_List(**validated_data)
+        job.content_hash = job.hash_content()  # bulk writes bypass save()
+        if job_id not in existing:
+            new_jobs.append(job)
+            continue
+        job.pk, content_hash = existing[job_id]
+        if job.content_hash == content_hash:
+            unchanged += 1
+            continue
+        job.updated_at = now  # auto_now is not applied by bulk_update
+        changed_jobs.append(job)
+
+    created = 0
+    if new_jobs or changed_jobs:
+        with transaction.atomic():
+            created = bulk_insert_count(
+                Job_List, new_jobs, batch_size=INSERT_BATCH_SIZE, ignore_conflicts=True
+            )
+            if changed_jobs:
+                bulk_update_rows(Job_List, changed_jobs, UPSERT_FIELDS)
+    # Stored by a concurrent ingest since the lookup above
+    skipped += len(new_jobs) - created
+
+    result = {
+        "created": created,
+        "updated": len(changed_jobs),
+        "unchanged": unchanged,
+        "skipped": skipped,
+        "invalid": len(errors),
+        "errors": errors,
+    }
+    seen_again = len(changed_jobs) + unchanged
+    result["churn_rate"] = len(changed_jobs) / seen_again if seen_again else 0.0
+    _count(
+        batches=1,
+        received=len(jobs),
+        **{name: result[name] for name in _stats if name in result},
+    )
+    return result
+
+
+def bulk_ingest_comments(job, comments):
+    """
+    Validate a batch of comments for `job` and insert the valid ones in one
+    transaction. Invalid items are reported back with their index.
+    """
+    errors = []
+    new_comments = []
+    validator = CommentIngestSerializer()
+
+    for index, comment_data in enumerate(comments):
+        try:
+            validated_data = validator.run_validation(comment_data)
+        except ValidationError as e:
+            errors.append({"index": index, "errors": e.detail})
+            continue
+        new_comments.append(Comment(job=job, **validated_data))
+
+    with transaction.atomic():
+        Comment.objects.bulk_create(new_comments, batch_size=INSERT_BATCH_SIZE)
+        if new_comments:
+            refresh_search_index([job.pk])
+    invalidate_job_detail(job.pk)  # bulk_create sends no post_save
+
+    return {
+        "created": len(new_comments),
+        "invalid": len(errors),
+        "errors": errors,
+    }
@@ -0,0 +1,56 @@
+from functools import cached_property
+from django.shortcuts import get_object_or_404, aget_object_or_404
+from api.models import Job
+
+
+class JobDetail:
+    """
+    Request-scoped loader for the job detail path.
+
+    The job, its latest LLMResponse and (on first access) its comments are
+    each fetched once with an indexed lookup. The same objects are handed
+    to the enrichment code and to the serializers, so nothing is queried
+    twice within a request.
+    """
+
+    def __init__(self, job_id=None, pk=None):
+        if job_id:
+            self.job = get_object_or_404(Job, job_id=job_id)
+        else:
+            self.job = get_object_or_404(Job, id=pk)
+
+    @cached_property
+    def comments(self):
+        return list(self.job.comments.order_by("created_at"))
+
+    @cached_property
+    def llm_response(self):
+        # LLMResponse's default ordering is newest first
+        return self.job.llm_responses.first()
+
+    def set_llm_response(self, llm_response):
+        self.__dict__["llm_response"] = llm_response
+
+    # Async views cannot touch the lazy properties (they would query from
+    # the event loop); they load them up front with async queries instead.
+
+    @classmethod
+    async def aload(cls, job_id=None, pk=None):
+        detail = cls.__new__(cls)
+        if job_id:
+            detail.job = await aget_object_or_404(Job, job_id=job_id)
+        else:
+            detail.job = await aget_object_or_404(Job, id=pk)
+        return detail
+
+    async def aload_comments(self):
+        if "comments" not in self.__dict__:
+            self.__dict__["comments"] = [
+                comment async for comment in self.job.comments.order_by("created_at")
+            ]
+        return self.comments
+
+    async def aload_llm_response(self):
+        if "llm_response" not in self.__dict__:
+            self.__dict__["llm_response"] = await self.job.llm_responses.afirst()
+        return self.llm_response
@@ -0,0 +1,109 @@
+import hashlib
+import json
+import threading
+from datetime import timedelta
+from django.conf import settings
+from django.db import IntegrityError
+from django.db.models import F, Sum
+from django.utils import timezone
+from api.models import LLMCacheEntry
+
+# Process-local counters, the persistent per-entry hit count lives in the DB
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+
+
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def make_cache_key(prompt_version, model, payload):
+    """
+    Stable hash of everything that determines the model's answer.
+    """
+    serialized = json.dumps(
+        [prompt_version, model, payload],
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+
+def get_cached_response(key):
+    """
+    Return the stored response for `key`, or None on a miss / expired entry.
+    """
+    now = timezone.now()
+    entry = (
+        LLMCacheEntry.objects.filter(
+            key=key,
+            created_at__gte=now - timedelta(seconds=settings.LLM_CACHE_TTL),
+        )
+        .only("id", "response")
+        .first()
+    )
+    if entry is None:
+        _count("misses")
+        return None
+    LLMCacheEntry.objects.filter(pk=entry.pk).update(
+        hits=F("hits") + 1, last_used_at=now
+    )
+    _count("hits")
+    return entry.response
+
+
+def store_response(key, model, response, latency):
+    """
+    Save a successful response and evict expired / least recently used rows.
+    """
+    LLMCacheEntry.objects.filter(key=key).delete()  # Expired copy, if any
+    try:
+        LLMCacheEntry.objects.create(
+            key=key, model=model, response=response, latency=latency
+        )
+    except IntegrityError:
+        pass  # Another worker stored the same answer concurrently
+    evict()
+
+
+def evict():
+    now = timezone.now()
+    LLMCacheEntry.objects.filter(
+        created_at__lt=now - timedelta(seconds=settings.LLM_CACHE_TTL)
+    ).delete()
+
+    excess = LLMCacheEntry.objects.count() - settings.LLM_CACHE_MAX_ENTRIES
+    if excess > 0:
+        stale_ids = LLMCacheEntry.objects.order_by("last_used_at").values_list(
+            "id", flat=True
+        )[:excess]
+        LLMCacheEntry.objects.filter(id__in=list(stale_ids)).delete()
+
+
+def process_stats():
+    """
+    Hit/miss counters of this process, without touching the database.
+    """
+    with _stats_lock:
+        return dict(_stats)
+
+
+def cache_stats():
+    """
+    Hit/miss counters of this process plus totals across all stored entries.
+    """
+    stats = process_stats()
+    hits, misses = stats["hits"], stats["misses"]
+    totals = LLMCacheEntry.objects.aggregate(
+        total_hits=Sum("hits"), latency_saved=Sum(F("hits") * F("latency"))
+    )
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+        "entries": LLMCacheEntry.objects.count(),
+        "total_hits": totals["total_hits"] or 0,
+        "latency_saved_seconds": round(totals["latency_saved"] or 0.0, 3),
+    }
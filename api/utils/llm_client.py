@@ -0,0 +1,340 @@
+import asyncio
+import collections
+import contextlib
+import contextvars
+import os
+import threading
+import time
+import weakref
+import httpx
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from langchain_openai import ChatOpenAI
+from api.utils.metrics import timed
+from api.utils.prompt_budget import count_tokens
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at `per_minute` / 60 per
+    second. Callers reserve tokens up front and sleep for the returned
+    delay, so bursts queue up instead of being rejected.
+    """
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount=1):
+        """
+        Take `amount` tokens (possibly going negative) and return how many
+        seconds the caller has to wait before using them.
+        """
+        amount = min(float(amount), self.capacity)
+        with self.lock:
+            self._refill()
+            self.tokens -= amount
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+
+class ConcurrencyGate:
+    """
+    Counting semaphore shared by threads and event loops. A released slot
+    is handed to the oldest waiter; async waiters wait on a future that
+    the releasing thread resolves, so they hold no thread and do not poll.
+    """
+
+    def __init__(self, limit):
+        self.available = limit
+        self.waiters = collections.deque()  # Wake-up callables, oldest first
+        self.lock = threading.Lock()
+
+    def _try_acquire(self):
+        # Caller holds self.lock
+        if self.available and not self.waiters:
+            self.available -= 1
+            return True
+        return False
+
+    def acquire(self):
+        with self.lock:
+            if self._try_acquire():
+                return
+            event = threading.Event()
+            self.waiters.append(event.set)
+        event.wait()
+
+    async def aacquire(self):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def wake():
+            loop.call_soon_threadsafe(
+                lambda: future.done() or future.set_result(None)
+            )
+
+        with self.lock:
+            if self._try_acquire():
+                return
+            self.waiters.append(wake)
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self.lock:
+                handed = wake not in self.waiters
+                if not handed:
+                    self.waiters.remove(wake)
+            if handed:
+                self.release()
+            raise
+
+    def release(self):
+        with self.lock:
+            while self.waiters:
+                wake = self.waiters.popleft()
+                try:
+                    wake()
+                    return
+                except RuntimeError:
+                    continue  # Its event loop is closed, nobody is waiting
+            self.available += 1
+
+
+class RateLimiter:
+    """
+    Caps in-flight model calls and keeps requests / tokens per minute under
+    the account limits.
+
+    The rate limit wait happens before taking a concurrency slot, so a
+    caller that is only waiting for its turn does not keep a slot from one
+    that may already send.
+    """
+
+    def __init__(self, max_concurrency, requests_per_minute, tokens_per_minute):
+        self.gate = ConcurrencyGate(max_concurrency)
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+
+    def wait(self, tokens):
+        return max(self.requests.reserve(1), self.tokens.reserve(tokens))
+
+    @contextlib.contextmanager
+    def slot(self, tokens):
+        wait = self.wait(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        self.gate.acquire()
+        try:
+            yield
+        finally:
+            self.gate.release()
+
+    @contextlib.asynccontextmanager
+    async def aslot(self, tokens):
+        wait = self.wait(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        await self.gate.aacquire()
+        try:
+            yield
+        finally:
+            self.gate.release()
+
+
+def estimate_tokens(messages):
+    return sum(count_tokens(message["content"]) for message in messages)
+
+
+_lock = threading.Lock()
+_chat_models = {}
+_async_chat_models = weakref.WeakKeyDictionary()
+_limiter = None
+_async_pool = False
+_async_pool_scope = contextvars.ContextVar("llm_async_pool", default=False)
+
+
+def _build_chat_model(model, **clients):
+    return ChatOpenAI(
+        model=model,
+        api_key=os.getenv("OPENAI_API_KEY"),
+        base_url=settings.OPENAI_BASE_URL,
+        timeout=settings.LLM_TIMEOUT,
+        **clients,
+    )
+
+
+def _pool_limits():
+    return httpx.Limits(
+        max_connections=settings.LLM_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.LLM_MAX_CONNECTIONS,
+    )
+
+
+def get_chat_model(model):
+    """
+    Process-wide ChatOpenAI instance per model name, sharing one pooled
+    keep-alive HTTP client instead of a new connection per call.
+    """
+    with _lock:
+        if model not in _chat_models:
+            _chat_models[model] = _build_chat_model(
+                model,
+                http_client=httpx.Client(
+                    limits=_pool_limits(), timeout=settings.LLM_TIMEOUT
+                ),
+            )
+        return _chat_models[model]
+
+
+def get_async_chat_model(model):
+    """
+    Like `get_chat_model`, for `ainvoke`. Async connections belong to the
+    event loop that opened them, so the pool is kept per running loop;
+    only used with long-lived loops (see `use_async_pool`).
+    """
+    loop = asyncio.get_running_loop()
+    with _lock:
+        models = _async_chat_models.setdefault(loop, {})
+        if model not in models:
+            models[model] = _build_chat_model(
+                model,
+                http_async_client=httpx.AsyncClient(
+                    limits=_pool_limits(), timeout=settings.LLM_TIMEOUT
+                ),
+            )
+        return models[model]
+
+
+def use_async_pool():
+    """
+    Called by the ASGI entry point (server/asgi.py). There the server's
+    event loop lives as long as the process, so `ainvoke_llm` keeps a
+    pooled async client on it. Under WSGI Django runs every async view in
+    a new, short-lived loop: a per-loop pool would be rebuilt (and its
+    connections leaked) on every request, so async calls go through the
+    shared sync pool in a worker thread instead.
+    """
+    global _async_pool
+    _async_pool = True
+
+
+@contextlib.contextmanager
+def async_pool():
+    """
+    `use_async_pool` for the current context only, for callers that run a
+    long-lived event loop of their own (e.g. the enrich_jobs command).
+    Close the loop's clients with `close_async_pool` before the loop.
+    """
+    token = _async_pool_scope.set(True)
+    try:
+        yield
+    finally:
+        _async_pool_scope.reset(token)
+
+
+async def close_async_pool():
+    """
+    Close the pooled async clients of the running loop.
+    """
+    with _lock:
+        models = _async_chat_models.pop(asyncio.get_running_loop(), {})
+    for chat_model in models.values():
+        await chat_model.http_async_client.aclose()
+
+
+def _use_async_pool():
+    return _async_pool or _async_pool_scope.get()
+
+
+@contextlib.asynccontextmanager
+async def _async_chat_model(model):
+    if _use_async_pool():
+        yield get_async_chat_model(model)
+        return
+    # Short-lived loop: a client of its own, closed with the call
+    async with httpx.AsyncClient(
+        limits=_pool_limits(), timeout=settings.LLM_TIMEOUT
+    ) as client:
+        yield _build_chat_model(
+            model,
+            http_client=get_chat_model(model).http_client,
+            http_async_client=client,
+        )
+
+
+def get_rate_limiter():
+    global _limiter
+    with _lock:
+        if _limiter is None:
+            _limiter = RateLimiter(
+                settings.LLM_MAX_CONCURRENCY,
+                settings.LLM_REQUESTS_PER_MINUTE,
+                settings.LLM_TOKENS_PER_MINUTE,
+            )
+        return _limiter
+
+
+def reset_llm_client():
+    """
+    Drop the shared client and limiter (settings changed, tests).
+    """
+    global _limiter
+    with _lock:
+        for chat_model in _chat_models.values():
+            chat_model.http_client.close()
+        _chat_models.clear()
+        _async_chat_models.clear()
+        _limiter = None
+
+
+def invoke_llm(model, messages):
+    """
+    Rate-limited `invoke` on the shared chat model.
+    """
+    limiter = get_rate_limiter()
+    with timed("llm"), limiter.slot(estimate_tokens(messages)):
+        return get_chat_model(model).invoke(messages)
+
+
+async def ainvoke_llm(model, messages):
+    """
+    Async counterpart of `invoke_llm`, sharing the same limits.
+    """
+    if not _use_async_pool():
+        return await sync_to_async(invoke_llm, thread_sensitive=False)(model, messages)
+    limiter = get_rate_limiter()
+    with timed("llm"):
+        async with limiter.aslot(estimate_tokens(messages)):
+            return await get_async_chat_model(model).ainvoke(messages)
+
+
+def stream_llm(model, messages):
+    """
+    Rate-limited `stream` on the shared chat model: yields AIMessageChunks
+    as the answer is written, the last one carries the token usage.
+    """
+    limiter = get_rate_limiter()
+    with timed("llm"), limiter.slot(estimate_tokens(messages)):
+        yield from get_chat_model(model).stream(messages, stream_usage=True)
+
+
+async def astream_llm(model, messages):
+    """
+    Async counterpart of `stream_llm`, sharing the same limits.
+    """
+    limiter = get_rate_limiter()
+    with timed("llm"):
+        async with limiter.aslot(estimate_tokens(messages)):
+            async with _async_chat_model(model) as chat_model:
+                async for chunk in chat_model.astream(messages, stream_usage=True):
+                    yield chunk
@@ -0,0 +1,215 @@
+import math
+import re
+from collections import defaultdict
+from datetime import timedelta
+from django.db.models import Case, Count, IntegerField, Q, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from api.models import LLMCall
+
+# USD per million (prompt, completion) tokens. Calls to models missing
+# here are recorded without a cost.
+MODEL_PRICES = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+}
+
+DEFAULT_WINDOWS = ["1h", "24h", "7d", "30d"]
+MAX_WINDOW = timedelta(days=90)
+WINDOW_UNITS = {"m": "minutes", "h": "hours", "d": "days"}
+DEFAULT_TOP = 10
+MAX_TOP = 100
+
+
+def estimate_cost(model, prompt_tokens, completion_tokens):
+    prices = MODEL_PRICES.get(model)
+    if prices is None or prompt_tokens is None:
+        return None
+    prompt_price, completion_price = prices
+    return (prompt_tokens * prompt_price + (completion_tokens or 0) * completion_price) / 1e6
+
+
+def build_call(job, model, prompt_version, latency, outcome, response=None,
+               prompt_tokens=None, retries=0, error=None):
+    """
+    Unsaved LLMCall. Token counts are the ones the API reported on
+    `response`; without them `prompt_tokens` (the local estimate) is kept.
+    """
+    usage = getattr(response, "usage_metadata", None)
+    if not isinstance(usage, dict):
+        usage = {}
+    prompt_tokens = usage.get("input_tokens", prompt_tokens)
+    completion_tokens = usage.get("output_tokens")
+    return LLMCall(
+        job=job,
+        model=model,
+        prompt_version=prompt_version,
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+        latency=latency,
+        outcome=outcome,
+        retries=retries,
+        cost=estimate_cost(model, prompt_tokens, completion_tokens),
+        error=error,
+    )
+
+
+def record_call(*args, **kwargs):
+    """
+    Save one ledger row, see `build_call`.
+    """
+    call = build_call(*args, **kwargs)
+    call.save()
+    return call
+
+
+def parse_windows(query_params):
+    """
+    `{"24h": timedelta(hours=24), ...}` from `?windows=1h,24h,7d`.
+    """
+    value = query_params.get("windows")
+    names = [name.strip() for name in value.split(",") if name.strip()] if value else []
+    windows = {}
+    for name in names or DEFAULT_WINDOWS:
+        match = re.fullmatch(r"(\d+)([mhd])", name)
+        if not match:
+            raise ValidationError(f"Invalid window '{name}', use e.g. 30m, 24h or 7d")
+        try:
+            span = timedelta(**{WINDOW_UNITS[match[2]]: int(match[1])})
+        except OverflowError:
+            span = None  # Far beyond MAX_WINDOW
+        if not span or span > MAX_WINDOW:
+            raise ValidationError(f"Windows must be between 1m and {MAX_WINDOW.days}d")
+        windows[name] = span
+    return windows
+
+
+def parse_top_jobs(query_params):
+    value = query_params.get("top")
+    if not value:
+        return DEFAULT_TOP
+    if not value.isdigit() or int(value) < 1:
+        raise ValidationError("'top' must be a positive integer")
+    return min(int(value), MAX_TOP)
+
+
+def _percentile(values, q):
+    # Nearest-rank percentile, None for no values
+    if not values:
+        return None
+    values = sorted(values)
+    return values[max(0, math.ceil(q * len(values)) - 1)]
+
+
+def _tokens(group):
+    return group["prompt_tokens"] + group["completion_tokens"]
+
+
+def summarize(groups, latencies):
+    """
+    Latency, outcome, token and cost figures from ledger aggregates:
+    `groups` are per-job sums (see `ledger_summary`), `latencies` the
+    latency of every call. Token and cost percentiles are per job: the sum
+    of all of a job's calls (calls of since deleted jobs only count
+    towards the totals).
+    """
+    jobs = defaultdict(lambda: [0, 0.0])
+    for group in groups:
+        if group["job_id"] is None:
+            continue
+        totals = jobs[group["job_id"]]
+        totals[0] += _tokens(group)
+        totals[1] += group["cost"]
+    job_tokens = [tokens for tokens, _ in jobs.values()]
+    job_costs = [cost for _, cost in jobs.values()]
+    calls = sum(group["calls"] for group in groups)
+    errors = sum(group["errors"] for group in groups)
+    return {
+        "calls": calls,
+        "errors": errors,
+        "error_rate": errors / calls if calls else 0.0,
+        "retried": sum(group["retried"] for group in groups),
+        "latency_p50": _percentile(latencies, 0.50),
+        "latency_p95": _percentile(latencies, 0.95),
+        "prompt_tokens": sum(group["prompt_tokens"] for group in groups),
+        "completion_tokens": sum(group["completion_tokens"] for group in groups),
+        "cost": round(sum(group["cost"] for group in groups), 6),
+        "jobs": len(jobs),
+        "tokens_per_job_p50": _percentile(job_tokens, 0.50),
+        "tokens_per_job_p95": _percentile(job_tokens, 0.95),
+        "cost_per_job_p50": _percentile(job_costs, 0.50),
+        "cost_per_job_p95": _percentile(job_costs, 0.95),
+    }
+
+
+def ledger_summary(windows, top=DEFAULT_TOP):
+    """
+    `summarize` for each window, split by prompt version, plus the `top`
+    most expensive jobs of the longest window.
+
+    Two queries whatever the number of windows: sums grouped by (window
+    bucket, prompt version, job), a bucket being the calls of the
+    shortest window that contains them, and the latencies the percentiles
+    need. Rows are not loaded as model instances.
+    """
+    now = timezone.now()
+    spans = sorted(set(windows.values()))
+    bucket = Case(
+        *[When(created_at__gte=now - span, then=Value(i)) for i, span in enumerate(spans)],
+        output_field=IntegerField(),
+    )
+    calls = (
+        LLMCall.objects.filter(created_at__gte=now - spans[-1])
+        .annotate(bucket=bucket)
+        .order_by()
+    )
+    groups = list(
+        calls.values("bucket", "prompt_version", "job_id", "job__job_id").annotate(
+            calls=Count("id"),
+            errors=Count("id", filter=~Q(outcome=LLMCall.SUCCESS)),
+            retried=Count("id", filter=Q(retries__gt=0)),
+            prompt_tokens=Coalesce(Sum("prompt_tokens"), 0),
+            completion_tokens=Coalesce(Sum("completion_tokens"), 0),
+            cost=Coalesce(Sum("cost"), 0.0),
+            latency=Sum("latency"),
+        )
+    )
+    latencies = list(calls.values_list("bucket", "prompt_version", "latency"))
+
+    summaries = {}
+    for name, span in windows.items():
+        # A window holds its own bucket and the ones of shorter windows
+        last = spans.index(span)
+        window_groups = [group for group in groups if group["bucket"] <= last]
+        window_latencies = [call for call in latencies if call[0] <= last]
+        versions = defaultdict(lambda: ([], []))
+        for group in window_groups:
+            versions[group["prompt_version"]][0].append(group)
+        for _, version, latency in window_latencies:
+            versions[version][1].append(latency)
+        summaries[name] = {
+            **summarize(window_groups, [latency for *_, latency in window_latencies]),
+            "by_prompt_version": {
+                version: summarize(*version_data)
+                for version, version_data in sorted(versions.items())
+            },
+        }
+
+    jobs = {}
+    for group in groups:
+        if group["job_id"] is None:
+            continue  # Job deleted since
+        job = jobs.setdefault(
+            group["job_id"],
+            {"job_id": group["job__job_id"], "calls": 0, "tokens": 0, "cost": 0.0, "latency": 0.0},
+        )
+        job["calls"] += group["calls"]
+        job["tokens"] += _tokens(group)
+        job["cost"] += group["cost"]
+        job["latency"] += group["latency"]
+    expensive = sorted(jobs.values(), key=lambda job: (-job["cost"], -job["tokens"]))[:top]
+    for job in expensive:
+        job["cost"] = round(job["cost"], 6)
+
+    return {"windows": summaries, "top_jobs": expensive}
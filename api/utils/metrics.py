@@ -0,0 +1,303 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from api.utils import detail_cache, llm_cache
+from api.utils.ingest import ingest_stats
+
+# Seconds. Enrichment requests wait on the model for several of them.
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class RequestTimings:
+    """
+    What one request spent on SQL, model calls and rendering the response.
+    """
+
+    __slots__ = ("started", "db", "queries", "llm", "serialize")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db = 0.0
+        self.queries = 0
+        self.llm = 0.0
+        self.serialize = 0.0
+
+
+# Set by RequestMetricsMiddleware. Copied into sync_to_async threads, so
+# async views' ORM calls are attributed to their request as well.
+_current = ContextVar("request_timings", default=None)
+
+
+def start_request():
+    """
+    Start timing the current request; returns the timings and the token
+    to pass to `end_request`.
+    """
+    timings = RequestTimings()
+    return timings, _current.set(timings)
+
+
+def end_request(token):
+    _current.reset(token)
+
+
+def current_timings():
+    return _current.get()
+
+
+@contextmanager
+def timed(name):
+    """
+    Add the time spent in the block to the current request's `name`
+    ("llm", "serialize"). A no-op outside requests (worker, commands).
+    """
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        setattr(timings, name, getattr(timings, name) + time.perf_counter() - started)
+
+
+def db_timing_wrapper(execute, sql, params, many, context):
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.db += time.perf_counter() - started
+        timings.queries += 1
+
+
+def install_db_timing(connection):
+    # First in the list: execute_wrapper() users (CaptureQueriesContext)
+    # pop the last wrapper when they exit.
+    if db_timing_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, db_timing_wrapper)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class Histogram:
+    """
+    Thread-safe Prometheus histogram keyed by label values. Observations
+    only bump one bucket; cumulative counts are computed when exported.
+    """
+
+    def __init__(self, name, documentation, buckets, labelnames):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self.labelnames = tuple(labelnames)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, labels):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def expose(self):
+        with self._lock:
+            series = {
+                labels: (list(counts), total)
+                for labels, (counts, total) in self._series.items()
+            }
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        bounds = [_number(float(bound)) for bound in self.buckets] + ["+Inf"]
+        for labels in sorted(series):
+            counts, total = series[labels]
+            base = _labels(self.labelnames, labels)
+            prefix = f"{self.name}_bucket{base[:-1]},le=" if base else f"{self.name}_bucket{{le="
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                lines.append(f'{prefix}"{bound}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{base} {_number(total)}")
+            lines.append(f"{self.name}_count{base} {cumulative}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name, documentation, labelnames):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def expose(self):
+        with self._lock:
+            values = dict(self._values)
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} counter",
+        ]
+        for labels in sorted(values):
+            lines.append(f"{self.name}{_labels(self.labelnames, labels)} {values[labels]}")
+        return lines
+
+
+ROUTE_LABELS = ("method", "route")
+
+REQUESTS = Counter(
+    "http_requests_total", "Requests by route and status code.", ("method", "route", "status")
+)
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Wall time until the view returned its response.",
+    LATENCY_BUCKETS,
+    ROUTE_LABELS,
+)
+DB_SECONDS = Histogram(
+    "http_request_db_seconds", "Time spent executing SQL.", LATENCY_BUCKETS, ROUTE_LABELS
+)
+DB_QUERIES = Histogram(
+    "http_request_db_queries", "SQL queries per request.", QUERY_BUCKETS, ROUTE_LABELS
+)
+LLM_SECONDS = Histogram(
+    "http_request_llm_seconds",
+    "Time spent in model calls, including rate limit waits.",
+    LATENCY_BUCKETS,
+    ROUTE_LABELS,
+)
+SERIALIZE_SECONDS = Histogram(
+    "http_request_serialize_seconds",
+    "Time spent rendering the response body (JSON / templates).",
+    LATENCY_BUCKETS,
+    ROUTE_LABELS,
+)
+REQUEST_METRICS = (
+    REQUESTS, REQUEST_SECONDS, DB_SECONDS, DB_QUERIES, LLM_SECONDS, SERIALIZE_SECONDS
+)
+
+
+def observe_request(method, route, status_code, timings, total):
+    labels = (method, route)
+    REQUESTS.inc((method, route, str(status_code)))
+    REQUEST_SECONDS.observe(total, labels)
+    DB_SECONDS.observe(timings.db, labels)
+    DB_QUERIES.observe(timings.queries, labels)
+    LLM_SECONDS.observe(timings.llm, labels)
+    SERIALIZE_SECONDS.observe(timings.serialize, labels)
+
+
+def server_timing(timings, total):
+    """
+    `Server-Timing` header value, durations in milliseconds.
+    """
+    return (
+        f'db;dur={timings.db * 1000:.2f};desc="{timings.queries} queries", '
+        f"llm;dur={timings.llm * 1000:.2f}, "
+        f"serialize;dur={timings.serialize * 1000:.2f}, "
+        f"total;dur={total * 1000:.2f}"
+    )
+
+
+def reset_metrics():
+    for metric in REQUEST_METRICS:
+        metric.clear()
+
+
+def _stat_lines(name, documentation, kind, samples):
+    lines = [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        lines.append(f"{name}{labels} {_number(value)}")
+    return lines
+
+
+def expose():
+    """
+    Prometheus text exposition of this process's request histograms plus
+    the process-local cache and ingest counters.
+    """
+    lines = []
+    for metric in REQUEST_METRICS:
+        lines += metric.expose()
+
+    detail = detail_cache.cache_stats()
+    lines += _stat_lines(
+        "job_detail_cache_events_total",
+        "Job detail cache lookups and writes.",
+        "counter",
+        [
+            (f'{{event="{event}"}}', detail[event])
+            for event in ("hits", "misses", "sets", "invalidations")
+        ],
+    )
+    lines += _stat_lines(
+        "job_detail_cache_entries", "Entries stored by this process.", "gauge",
+        [("", detail["entries"])],
+    )
+    lines += _stat_lines(
+        "job_detail_cache_bytes", "Approximate size of those entries.", "gauge",
+        [("", detail["bytes"])],
+    )
+
+    llm = llm_cache.process_stats()
+    lines += _stat_lines(
+        "llm_cache_lookups_total",
+        "LLM response cache lookups.",
+        "counter",
+        [(f'{{result="{result}"}}', llm[result]) for result in ("hits", "misses")],
+    )
+
+    ingest = ingest_stats()
+    lines += _stat_lines(
+        "job_list_ingest_rows_total",
+        "Scraped Job_List rows by outcome.",
+        "counter",
+        [
+            (f'{{outcome="{outcome}"}}', ingest[outcome])
+            for outcome in ("created", "updated", "unchanged", "skipped", "invalid")
+        ],
+    )
+    lines += _stat_lines(
+        "job_list_ingest_batches_total", "Scraped batches ingested.", "counter",
+        [("", ingest["batches"])],
+    )
+    return "\n".join(lines) + "\n"
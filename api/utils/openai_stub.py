@@ -0,0 +1,151 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_CONTENT = {
+    "client_names": ["Alex"],
+    "client_location": "United States",
+    "company": "",
+    "keywords": ["Web Scraping", "Python"],
+    "work": "Data extraction",
+    "crucial_info": "",
+}
+
+# Characters of the answer per streamed chunk
+STREAM_PIECE = 8
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, so pooling is observable
+
+    def do_POST(self):
+        server = self.server
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with server.lock:
+            server.requests += 1
+            server.connections.add(self.client_address)
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            request = json.loads(body or b"{}")
+            if request.get("stream"):
+                self.stream(request)
+                return
+            if server.delay:
+                time.sleep(server.delay)
+            payload = json.dumps(
+                {
+                    "id": f"chatcmpl-stub-{server.requests}",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": request.get("model", "gpt-4o"),
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {
+                                "role": "assistant",
+                                "content": json.dumps(server.content),
+                            },
+                            "finish_reason": "stop",
+                        }
+                    ],
+                    "usage": {
+                        "prompt_tokens": 100,
+                        "completion_tokens": 50,
+                        "total_tokens": 150,
+                    },
+                }
+            ).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def stream(self, request):
+        """
+        Server-sent chat.completion.chunk events: the answer in small
+        pieces spread over `delay`, then the usage when it was requested.
+        """
+        server = self.server
+        content = json.dumps(server.content)
+        pieces = [content[i : i + STREAM_PIECE] for i in range(0, len(content), STREAM_PIECE)]
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def chunk(delta=None, usage=None):
+            return {
+                "id": f"chatcmpl-stub-{server.requests}",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": request.get("model", "gpt-4o"),
+                "choices": [] if delta is None else [
+                    {"index": 0, "delta": delta, "finish_reason": None}
+                ],
+                "usage": usage,
+            }
+
+        events = [chunk({"role": "assistant", "content": ""})]
+        events += [chunk({"content": piece}) for piece in pieces]
+        if request.get("stream_options", {}).get("include_usage"):
+            events.append(
+                chunk(usage={"prompt_tokens": 100, "completion_tokens": 50, "total_tokens": 150})
+            )
+        for event in events:
+            if server.delay:
+                time.sleep(server.delay / len(events))
+            self.write_chunk(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+        self.write_chunk(b"data: [DONE]\n\n")
+        self.write_chunk(b"")
+
+    def write_chunk(self, data):
+        # HTTP/1.1 chunked transfer encoding, an empty chunk ends the body
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class OpenAIStubServer(ThreadingHTTPServer):
+    """
+    Local stand-in for the OpenAI chat completions API. Counts requests,
+    distinct client connections and peak concurrency so pooling and rate
+    limiting can be checked offline.
+
+        with OpenAIStubServer(delay=0.1) as server:
+            settings.OPENAI_BASE_URL = server.base_url
+    """
+
+    daemon_threads = True
+    request_queue_size = 256  # Load tests open many connections at once
+
+    def __init__(self, content=None, delay=0.0):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.content = content or DEFAULT_CONTENT
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.connections = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self.server_address
+        return f"http://{host}:{port}/v1"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,141 @@
+import json
+import logging
+import re
+import threading
+import time
+import tiktoken
+
+logger = logging.getLogger(__name__)
+
+TRUNCATION_MARKER = " [truncated]"
+# A comment is only truncated to fit if at least this many tokens are left
+MIN_TRUNCATED_TOKENS = 64
+
+MONTHS = {
+    month: index
+    for index, month in enumerate(
+        ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"],
+        start=1,
+    )
+}
+
+
+# Seconds before loading an encoding is tried again after a failure
+ENCODING_RETRY_SECONDS = 60
+
+_encodings = {}
+_encoding_failures = {}  # model -> monotonic time of the last failure
+_encodings_lock = threading.Lock()
+
+
+def get_encoding(model):
+    """
+    tiktoken encoding for `model`, or None when the BPE file cannot be
+    loaded (e.g. no network access to download it). Only loaded encodings
+    are kept: a failure is retried after ENCODING_RETRY_SECONDS, so a
+    transient download error does not mean estimates for the process's
+    lifetime.
+    """
+    encoding = _encodings.get(model)
+    if encoding is not None:
+        return encoding
+    with _encodings_lock:
+        if model in _encodings:
+            return _encodings[model]
+        failed_at = _encoding_failures.get(model)
+        if failed_at is not None and time.monotonic() - failed_at < ENCODING_RETRY_SECONDS:
+            return None
+        try:
+            encoding = tiktoken.encoding_for_model(model)
+        except Exception as e:
+            logger.warning(f"tiktoken unavailable for {model}, estimating tokens: {e}")
+            _encoding_failures[model] = time.monotonic()
+            return None
+        _encoding_failures.pop(model, None)
+        _encodings[model] = encoding
+        return encoding
+
+
+def count_tokens(text, model="gpt-4o"):
+    encoding = get_encoding(model)
+    if encoding is None:
+        return len(text) // 4 + 1  # ~4 characters per token
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text, max_tokens, model="gpt-4o"):
+    encoding = get_encoding(model)
+    if encoding is None:
+        return text[: max_tokens * 4]
+    return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens])
+
+
+def _words(*values):
+    text = " ".join(str(value) for value in values if value)
+    return set(re.findall(r"[a-z0-9+#.]{3,}", text.lower()))
+
+
+def _recency(posted_on):
+    """
+    Sortable (year, month) of the last date in strings like
+    "Jan 2024 - Mar 2024". Unknown dates sort as oldest.
+    """
+    dates = re.findall(r"([A-Za-z]{3})[a-z]*\.?\s+(\d{4})", posted_on or "")
+    if not dates:
+        years = re.findall(r"\d{4}", posted_on or "")
+        return (int(years[-1]), 0) if years else (0, 0)
+    month, year = dates[-1]
+    return (int(year), MONTHS.get(month.lower(), 0))
+
+
+def rank_comments(job, comments):
+    """
+    Order comments by recency plus word overlap with the job's title and
+    skills. Ties keep their original order, so the ranking is deterministic.
+    """
+    job_words = _words(job.get("title"), *(job.get("skills") or []))
+    recency = [_recency(comment.get("posted_on")) for comment in comments]
+    by_date = sorted(set(recency))
+
+    def score(index):
+        comment = comments[index]
+        comment_words = _words(comment.get("job_title"), comment.get("description"))
+        relevance = (
+            len(job_words & comment_words) / len(job_words | comment_words)
+            if job_words and comment_words
+            else 0.0
+        )
+        newness = (by_date.index(recency[index]) + 1) / len(by_date)
+        return (-(relevance + newness), index)
+
+    return [comments[index] for index in sorted(range(len(comments)), key=score)]
+
+
+def pack_comments(base_tokens, job, comments, budget, model="gpt-4o"):
+    """
+    Keep the best ranked comments whose JSON fits in `budget` tokens on top
+    of `base_tokens`. The first comment that does not fit has its
+    description cut down to the remaining space, the rest are dropped.
+    """
+    remaining = budget - base_tokens
+    packed = []
+    for comment in rank_comments(job, comments):
+        cost = count_tokens(json.dumps(comment), model) + 1  # ", " separator
+        if cost <= remaining:
+            packed.append(comment)
+            remaining -= cost
+            continue
+
+        description = comment.get("description") or ""
+        overhead = cost - count_tokens(json.dumps(description), model)
+        room = remaining - overhead - count_tokens(TRUNCATION_MARKER, model)
+        if description and room >= MIN_TRUNCATED_TOKENS:
+            packed.append(
+                {
+                    **comment,
+                    "description": truncate_to_tokens(description, room, model)
+                    + TRUNCATION_MARKER,
+                }
+            )
+        break
+    return packed
@@ -0,0 +1,169 @@
+import re
+from django.db import connection
+from api.models import Job
+from rest_framework.exceptions import ValidationError
+
+# Full-text index over Job title / skills / description and the client and
+# freelancer feedback of the job's comments. The index lives outside the
+# ORM models (a `search_vector` tsvector column + GIN index on Postgres, an
+# FTS5 table on SQLite, see migration 0019) and is refreshed on every write
+# through `refresh_search_index`.
+
+FTS_TABLE = "api_job_fts"
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+POSTGRES_REFRESH_SQL = """
+UPDATE api_job SET search_vector =
+    setweight(to_tsvector('english', coalesce(api_job.title, '')), 'A')
+    || setweight(to_tsvector('english', coalesce(api_job.skills::text, '')), 'B')
+    || setweight(to_tsvector('english', coalesce(api_job.description, '')), 'C')
+    || setweight(to_tsvector('english', coalesce((
+        SELECT string_agg(
+            coalesce(c.client_feedback, '') || ' ' || coalesce(c.freelancer_feedback, ''),
+            ' '
+        )
+        FROM api_comment c WHERE c.job_id = api_job.id
+    ), '')), 'D')
+"""
+
+POSTGRES_SEARCH_SQL = """
+SELECT api_job.id, ts_rank_cd(api_job.search_vector, query) AS rank
+FROM api_job, websearch_to_tsquery('english', %s) query
+WHERE api_job.search_vector @@ query
+ORDER BY rank DESC, api_job.id DESC
+LIMIT %s OFFSET %s
+"""
+
+SQLITE_REFRESH_SQL = f"""
+INSERT INTO {FTS_TABLE} (rowid, title, skills, description, feedback)
+SELECT api_job.id, api_job.title, api_job.skills, api_job.description, (
+    SELECT group_concat(
+        coalesce(c.client_feedback, '') || ' ' || coalesce(c.freelancer_feedback, ''),
+        ' '
+    )
+    FROM api_comment c WHERE c.job_id = api_job.id
+)
+FROM api_job
+"""
+
+# Column weights in FTS5 declaration order: title, skills, description, feedback
+SQLITE_SEARCH_SQL = f"""
+SELECT rowid, -bm25({FTS_TABLE}, 10.0, 5.0, 2.0, 1.0) AS rank
+FROM {FTS_TABLE}
+WHERE {FTS_TABLE} MATCH %s
+ORDER BY rank DESC, rowid DESC
+LIMIT %s OFFSET %s
+"""
+
+
+def _check_supported():
+    if connection.vendor not in ("postgresql", "sqlite"):
+        raise ValidationError(f"Search is not supported on {connection.vendor}")
+
+
+def _in_clause(pks):
+    return ", ".join(["%s"] * len(pks))
+
+
+def refresh_search_index(pks=None):
+    """
+    Recompute the search document of the given job ids (all jobs if None).
+    """
+    if connection.vendor not in ("postgresql", "sqlite"):
+        return
+    if pks is not None:
+        pks = list(pks)
+        if not pks:
+            return
+
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            if pks is None:
+                cursor.execute(POSTGRES_REFRESH_SQL)
+            else:
+                cursor.execute(
+                    POSTGRES_REFRESH_SQL + f" WHERE api_job.id IN ({_in_clause(pks)})",
+                    pks,
+                )
+        elif pks is None:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+            cursor.execute(SQLITE_REFRESH_SQL)
+        else:
+            remove_from_search_index(pks, cursor=cursor)
+            cursor.execute(
+                SQLITE_REFRESH_SQL + f" WHERE api_job.id IN ({_in_clause(pks)})", pks
+            )
+
+
+def remove_from_search_index(pks, cursor=None):
+    # On Postgres the vector is a column of the deleted row itself
+    if connection.vendor != "sqlite" or not pks:
+        return
+    pks = list(pks)
+    sql = f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({_in_clause(pks)})"
+    if cursor is not None:
+        cursor.execute(sql, pks)
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(sql, pks)
+
+
+def _fts5_query(text):
+    # Quote every term so user input cannot inject FTS5 query syntax
+    terms = re.findall(r"\w+", text)
+    return " ".join(f'"{term}"' for term in terms)
+
+
+def search_job_ids(text, limit, offset=0):
+    """
+    `[(job_id, rank), ...]` best match first.
+    """
+    _check_supported()
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute(POSTGRES_SEARCH_SQL, [text, limit, offset])
+        else:
+            query = _fts5_query(text)
+            if not query:
+                return []
+            cursor.execute(SQLITE_SEARCH_SQL, [query, limit, offset])
+        return cursor.fetchall()
+
+
+def _positive_int(value, default, name):
+    if value in (None, ""):
+        return default
+    if not str(value).isdigit() or int(value) < 1:
+        raise ValidationError(f"'{name}' must be a positive integer")
+    return int(value)
+
+
+def search_jobs(query_params, queryset=None):
+    """
+    Ranked page of jobs for `?q=...&page=N&page_size=M`. Returns
+    `(jobs, has_next)`; each job carries its score as `search_rank`.
+    """
+    text = (query_params.get("q") or "").strip()
+    if not text:
+        raise ValidationError("Query parameter 'q' is required")
+    page = _positive_int(query_params.get("page"), 1, "page")
+    page_size = min(
+        _positive_int(query_params.get("page_size"), DEFAULT_PAGE_SIZE, "page_size"),
+        MAX_PAGE_SIZE,
+    )
+
+    # One extra row tells whether there is a next page without a COUNT
+    hits = search_job_ids(text, page_size + 1, (page - 1) * page_size)
+    has_next = len(hits) > page_size
+    hits = hits[:page_size]
+
+    queryset = Job.objects.all() if queryset is None else queryset
+    jobs_by_pk = queryset.in_bulk([pk for pk, _ in hits])
+    jobs = []
+    for pk, rank in hits:
+        job = jobs_by_pk.get(pk)
+        if job is not None:
+            job.search_rank = rank
+            jobs.append(job)
+    return jobs, has_next
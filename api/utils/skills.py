@@ -0,0 +1,182 @@
+from collections import Counter
+from django.db import connection, transaction
+from django.db.models import Count, F
+from rest_framework.exceptions import ValidationError
+from api.models import Job, Skill, JobSkill
+
+DEFAULT_TOP = 20
+MAX_TOP = 200
+REBUILD_BATCH_SIZE = 1000
+
+
+def normalize_skills(skills):
+    """
+    Distinct skill names of a `skills` JSON list, in order. Names are kept
+    verbatim so counts agree with jsonb containment filters on Postgres.
+    """
+    max_length = Skill._meta.get_field("name").max_length
+    names = []
+    for skill in skills or []:
+        if isinstance(skill, str) and 0 < len(skill) <= max_length and skill not in names:
+            names.append(skill)
+    return names
+
+
+def sync_job_skills(job):
+    """
+    Bring the job's JobSkill rows and the affected Skill.job_count values in
+    line with the job's stored `skills`. Only skills that were added or
+    removed are touched.
+
+    The job row is locked (Postgres) for the read and the writes, so two
+    saves of the same job cannot both apply the same difference; the
+    skills are read back from the locked row, the latest save wins.
+    """
+    with transaction.atomic():
+        skills = (
+            Job.objects.select_for_update()
+            .filter(pk=job.pk)
+            .values_list("skills", flat=True)
+            .first()
+        )
+        names = normalize_skills(skills)
+        current = dict(
+            JobSkill.objects.filter(job=job).values_list("skill__name", "skill_id")
+        )
+        added = [name for name in names if name not in current]
+        removed = [skill_id for name, skill_id in current.items() if name not in names]
+
+        if added:
+            Skill.objects.bulk_create(
+                [Skill(name=name) for name in added], ignore_conflicts=True
+            )
+            skill_ids = list(
+                Skill.objects.filter(name__in=added).values_list("id", flat=True)
+            )
+            JobSkill.objects.bulk_create(
+                [JobSkill(job=job, skill_id=skill_id) for skill_id in skill_ids]
+            )
+            Skill.objects.filter(id__in=skill_ids).update(job_count=F("job_count") + 1)
+        if removed:
+            JobSkill.objects.filter(job=job, skill_id__in=removed).delete()
+            Skill.objects.filter(id__in=removed).update(job_count=F("job_count") - 1)
+
+
+def release_job_skills(job):
+    # Called before the job (and, by cascade, its JobSkill rows) is deleted
+    Skill.objects.filter(job_skills__job=job).update(job_count=F("job_count") - 1)
+
+
+def rebuild_skill_counts():
+    """
+    Recompute JobSkill and Skill.job_count from every job's `skills` in bulk.
+    """
+    job_skills = []
+    counts = Counter()
+    for job_pk, skills in Job.objects.values_list("id", "skills").iterator(
+        chunk_size=REBUILD_BATCH_SIZE
+    ):
+        names = normalize_skills(skills)
+        job_skills.extend((job_pk, name) for name in names)
+        counts.update(names)
+
+    with transaction.atomic():
+        JobSkill.objects.all().delete()
+        Skill.objects.bulk_create(
+            [Skill(name=name) for name in counts],
+            batch_size=REBUILD_BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+        skills = list(Skill.objects.all())
+        for skill in skills:
+            skill.job_count = counts.get(skill.name, 0)
+        Skill.objects.bulk_update(
+            skills, ["job_count"], batch_size=REBUILD_BATCH_SIZE
+        )
+        skill_ids = {skill.name: skill.id for skill in skills}
+        JobSkill.objects.bulk_create(
+            [
+                JobSkill(job_id=job_pk, skill_id=skill_ids[name])
+                for job_pk, name in job_skills
+            ],
+            batch_size=REBUILD_BATCH_SIZE,
+        )
+
+
+def parse_skills(query_params):
+    value = query_params.get("skills") or ""
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+
+def filter_by_skills(queryset, skills):
+    """
+    Jobs whose `skills` contain every one of `skills`. On Postgres this is a
+    jsonb containment (`@>`) served by the GIN index on `skills`; elsewhere
+    the normalized JobSkill table is joined instead.
+    """
+    if not skills:
+        return queryset
+    if connection.vendor == "postgresql":
+        return queryset.filter(skills__contains=skills)
+    if queryset.model is not Job:
+        raise ValidationError("Skill filtering of this table requires PostgreSQL")
+    for skill in skills:
+        queryset = queryset.filter(job_skills__skill__name=skill)
+    return queryset
+
+
+def filter_jobs(queryset, query_params):
+    """
+    Apply the `skills`, `client_location` and `is_payment_verified` filters.
+    """
+    queryset = filter_by_skills(queryset, parse_skills(query_params))
+    client_location = query_params.get("client_location")
+    if client_location:
+        queryset = queryset.filter(client_location=client_location)
+    verified = query_params.get("is_payment_verified")
+    if verified in ("true", "false"):
+        queryset = queryset.filter(is_payment_verified=verified == "true")
+    elif verified:
+        raise ValidationError("'is_payment_verified' must be true or false")
+    return queryset
+
+
+def has_job_filters(query_params):
+    return any(
+        query_params.get(name)
+        for name in ("skills", "client_location", "is_payment_verified")
+    )
+
+
+def skill_facets(queryset=None, top=DEFAULT_TOP):
+    """
+    Top `top` skills with their job counts, `[{"name": ..., "count": ...}]`.
+
+    Without a queryset the maintained Skill.job_count values are read
+    directly, which costs the same however many jobs there are. For a
+    filtered job set the JobSkill rows of the matching jobs are counted.
+    """
+    if queryset is None:
+        rows = (
+            Skill.objects.filter(job_count__gt=0)
+            .order_by("-job_count", "name")
+            .values_list("name", "job_count")[:top]
+        )
+    else:
+        rows = (
+            JobSkill.objects.filter(job__in=queryset.order_by().values("pk"))
+            .values("skill__name")
+            .annotate(count=Count("id"))
+            .order_by("-count", "skill__name")
+            .values_list("skill__name", "count")[:top]
+        )
+    return [{"name": name, "count": count} for name, count in rows]
+
+
+def parse_top(query_params):
+    value = query_params.get("top")
+    if not value:
+        return DEFAULT_TOP
+    if not value.isdigit() or int(value) < 1:
+        raise ValidationError("'top' must be a positive integer")
+    return min(int(value), MAX_TOP)
@@ -2,20 +2,54 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.exceptions import ValidationError
 from rest_framework.pagination import PageNumberPagination
-from rest_framework.renderers import TemplateHTMLRenderer
 from rest_framework import status
-from django.shortcuts import get_object_or_404
-from django.db import transaction
+from django.shortcuts import get_object_or_404, aget_object_or_404
+from asgiref.sync import sync_to_async
 import logging
-from .models import Job_List, Job, Comment, LLMResponse
+from .models import Job_List, Job, Comment, EnrichmentTask
 from .serializer import (
     JobListSerializer,
     JobSerializer,
     CommentSerializer,
     LLMResponseSerializer,
+    EnrichmentTaskSerializer,
 )
-from .utils.LLM import LLM
+from .async_views import AsyncAPIView, streaming_content
+from .renderers import sse_event
+from .pagination import KeysetPagination
+from .utils.LLM import aLLM, aenrich, stream_enrich, astream_enrich
+from .utils.job_detail import JobDetail
+from .utils.fieldsets import parse_fieldset, only_columns, project
+from .utils.conditional import job_detail_validators, job_list_validators
+from .utils import detail_cache
+from .utils.llm_cache import cache_stats
+from .utils import metrics
+from .utils.llm_ledger import ledger_summary, parse_windows, parse_top_jobs
+from .utils.export import EXPORT_FORMATS, export_queryset, iter_export, parse_export_options
+from .utils.search import search_jobs
+from .utils.fast_read import value_columns, fast_rows, fast_instance, fast_instances
+from .utils.skills import (
+    filter_by_skills,
+    filter_jobs,
+    has_job_filters,
+    parse_skills,
+    parse_top,
+    skill_facets,
+)
+from .utils.enrichment import (
+    enqueue_enrichment,
+    save_llm_response,
+    build_llm_response,
+    acquire_lease,
+    release_lease,
+    wait_for_lease,
+    await_lease,
+)
+from .utils.ingest import bulk_ingest_job_list, bulk_ingest_comments
 from django.shortcuts import render
+from django.http import StreamingHttpResponse, HttpResponseBadRequest, HttpResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.template.loader import render_to_string
 
 # Initialize logger
 logger = logging.getLogger(__name__)
@@ -134,15 +168,23 @@ class JobListAll(APIView):
 
     def get(self, request):
         try:
-            jobs = Job_List.objects.all()
-            serializer = JobListSerializer(jobs, many=True)
+            fieldset = parse_fieldset(request.query_params, JobListSerializer)
+            jobs = filter_by_skills(
+                Job_List.objects.all(), parse_skills(request.query_params)
+            )
+            rows = jobs.values(*value_columns(JobListSerializer, fieldset))
             return Response(
                 {
-                    "jobs": serializer.data,
+                    "jobs": fast_rows(rows, JobListSerializer, fieldset),
                     "message": "Jobs retrieved successfully",
                     "success": True,
                 }
             )
+        except ValidationError as ve:
+            return Response(
+                {"message": str(ve.detail[0]), "success": False},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
         except Exception as e:
             return Response(
                 {"message": f"An error occurred: {str(e)}", "success": False},
@@ -157,23 +199,21 @@ class JobListAll(APIView):
                     {"message": "Jobs data is required", "success": False},
                     status=status.HTTP_400_BAD_REQUEST,
                 )
-            for job_data in jobs:
-                job_id = job_data.get("job_id")
-                if not job_id:
-                    continue  # Skip if job_id is missing
-
-                existing_job = Job_List.objects.filter(job_id=job_id).first()
-                if existing_job:
-                    continue  # Skip if job already exists
-
-                serializer = JobListSerializer(data=job_data)
-                if serializer.is_valid():
-                    serializer.save()
-                else:
-                    continue  # Skip if data is invalid
+            if not isinstance(jobs, list):
+                return Response(
+                    {"message": "Jobs data must be a list", "success": False},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            mode = request.data.get("mode", "insert")
+            if mode not in ("insert", "upsert"):
+                return Response(
+                    {"message": "Mode must be insert or upsert", "success": False},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            result = bulk_ingest_job_list(jobs, upsert=mode == "upsert")
 
             return Response(
-                {"message": "Jobs created successfully", "success": True},
+                {"message": "Jobs created successfully", "success": True, **result},
                 status=status.HTTP_201_CREATED,
             )
         except Exception as e:
@@ -203,13 +243,52 @@ class JobView(APIView):
 
     def get(self, request):
         try:
-            jobs = Job.objects.all()
+            fieldset = parse_fieldset(request.query_params, JobSerializer)
+            jobs = filter_jobs(Job.objects.all(), request.query_params)
+            columns = value_columns(JobSerializer, fieldset)
+            if (
+                "cursor" in request.query_params
+                or request.query_params.get("pagination") == "cursor"
+            ):
+                paginator = KeysetPagination()
+                validators = job_list_validators(
+                    paginator.get_window(jobs, request), request.get_full_path()
+                )
+                not_modified = validators.not_modified(request)
+                if not_modified:
+                    return not_modified
+
+                # created_at and id are needed to build the next cursor
+                extra = [name for name in ("created_at", "id") if name not in columns]
+                result_page = paginator.paginate_queryset(
+                    jobs.values(*columns, *extra), request
+                )
+                response = Response(
+                    {
+                        "jobs": fast_rows(result_page, JobSerializer, fieldset),
+                        "message": "Jobs retrieved successfully",
+                        "success": True,
+                        "next_cursor": paginator.next_cursor,
+                        "has_next": paginator.has_next,
+                    },
+                    status=status.HTTP_200_OK,
+                )
+                return validators.apply(response)
+
+            # The page-number payload includes the total count, so the
+            # validators cover the whole table
+            validators = job_list_validators(jobs, request.get_full_path())
+            not_modified = validators.not_modified(request)
+            if not_modified:
+                return not_modified
+
+            # Same order as the cursor mode, so a page is always the same rows
+            jobs = jobs.order_by("-created_at", "-id")
             paginator = PageNumberPagination()
-            result_page = paginator.paginate_queryset(jobs, request)
-            serializer = JobSerializer(result_page, many=True)
-            return Response(
+            result_page = paginator.paginate_queryset(jobs.values(*columns), request)
+            response = Response(
                 {
-                    "jobs": serializer.data,
+                    "jobs": fast_rows(result_page, JobSerializer, fieldset),
                     "message": "Jobs retrieved successfully",
                     "success": True,
                     "count": paginator.page.paginator.count,
@@ -217,6 +296,12 @@ class JobView(APIView):
                 },
                 status=status.HTTP_200_OK,
             )
+            return validators.apply(response)
+        except ValidationError as ve:
+            return Response(
+                {"message": str(ve.detail[0]), "success": False},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
         except Exception as e:
             return Response(
                 {"message": f"An error occurred: {str(e)}", "success": False},
@@ -286,11 +371,11 @@ class JobView(APIView):
             )
 
 
-class CommentView(APIView):
+class CommentView(AsyncAPIView):
 
     permission_classes = []
 
-    def post(self, request):
+    async def post(self, request):
         try:
             comments = request.data.get("comments")
             job_id = request.data.get("job_id")
@@ -299,51 +384,24 @@ class CommentView(APIView):
                     {"message": "Comments and job_id are required", "success": False},
                     status=status.HTTP_400_BAD_REQUEST,
                 )
-            job = get_object_or_404(Job, job_id=job_id)
-
-            for comment_data in comments:
-                comment_data["job"] = job.id
-                print(comment_data["rating"])
-                serializer = CommentSerializer(data=comment_data)
-                if serializer.is_valid():
-                    serializer.save()
-                else:
-                    continue  # Skip invalid comments
-
-            try:
-                data = LLM(job_id=job_id)
-                if data.get("success"):
-                    filtered_llm_data = {
-                        key: value
-                        for key, value in data.items()
-                        if key
-                        not in [
-                            "client_names",
-                            "keywords",
-                            "company",
-                            "client_location",
-                            "success",
-                        ]
-                    }
-                    llm_resp = LLMResponse.objects.create(
-                        job=job,
-                        client_names=data.get("client_names"),
-                        keywords=data.get("keywords"),
-                        company=data.get("company"),
-                        client_location=data.get("client_location"),
-                        other_data=filtered_llm_data,
-                    )
+            if not isinstance(comments, list):
+                return Response(
+                    {"message": "Comments must be a list", "success": False},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            job = await aget_object_or_404(Job, job_id=job_id)
 
-                    # save llm response
-                    llm_resp.save()
+            result = await sync_to_async(bulk_ingest_comments)(job, comments)
 
-            except Exception as e:
-                pass
+            # Enrichment runs in `manage.py run_enrichment_worker`
+            task = await sync_to_async(enqueue_enrichment)(job)
 
             return Response(
                 {
                     "message": f"Comments added successfully, Job: {job_id}",
                     "success": True,
+                    **result,
+                    "enrichment": EnrichmentTaskSerializer(task).data,
                 },
                 status=status.HTTP_201_CREATED,
             )
@@ -354,130 +412,361 @@ class CommentView(APIView):
             )
 
 
-class JobRetrieve(APIView):
+class EnrichmentTaskView(APIView):
     permission_classes = []
 
-    def get(self, request):
+    def get(self, request, pk):
         try:
-            job_id = request.query_params.get("job_id")
-            pk = request.query_params.get("id")
-            # its a boolean value
-            refresh_llm = request.query_params.get("refresh_llm") == "true"
-            need_comments = request.query_params.get("need_comments") != "false"
+            task = get_object_or_404(EnrichmentTask.objects.all(), pk=pk)
+            return Response(
+                {
+                    "enrichment": EnrichmentTaskSerializer(task).data,
+                    "message": "Enrichment status retrieved successfully",
+                    "success": True,
+                }
+            )
+        except Exception as e:
+            return Response(
+                {"message": f"An error occurred: {str(e)}", "success": False},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
 
-            if not job_id and not pk:
-                raise ValidationError("Either 'job_id' or 'id' is required")
 
-            # Fetch the job by job_id or id
-            job = None
-            if job_id:
-                job = get_object_or_404(Job, job_id=job_id)
-            elif pk:
-                job = get_object_or_404(Job, id=pk)
+def parse_job_detail_params(query_params):
+    job_id = query_params.get("job_id")
+    pk = query_params.get("id")
+    # its a boolean value
+    refresh_llm = query_params.get("refresh_llm") == "true"
+    need_comments = query_params.get("need_comments") != "false"
+
+    if not job_id and not pk:
+        raise ValidationError("Either 'job_id' or 'id' is required")
+    return job_id, pk, refresh_llm, need_comments
+
+
+def job_detail_payload(detail, llm_data, refresh_llm, need_comments):
+    comments = detail.comments if need_comments else []
+
+    return {
+        "job": fast_instance(detail.job, JobSerializer),
+        "llm_response": llm_data,  # llm_data,
+        "comments": fast_instances(comments, CommentSerializer),
+        "refresh_llm": refresh_llm,
+        "message": "Job and comments retrieved successfully",
+        "success": True,
+    }
+
+
+async def aget_job_detail_data(query_params, enrich_missing=True):
+    """
+    Payload of the JSON detail endpoint and the HTML job page. A job that
+    was never enriched is enriched before returning, or with
+    `enrich_missing=False` (the page, which streams it from
+    jobs/detail/stream/) gets an empty `llm_response`.
+    """
+    job_id, pk, refresh_llm, need_comments = parse_job_detail_params(query_params)
+
+    detail = await JobDetail.aload(job_id=job_id, pk=pk)
+
+    if refresh_llm:
+        llm_data = await aget_llm_data(detail)
+    elif enrich_missing:
+        llm_data = await aget_or_create_llm_response(detail)
+    elif await detail.aload_llm_response():
+        llm_data = fast_instance(detail.llm_response, LLMResponseSerializer)
+    else:
+        llm_data = {}
+    if need_comments:
+        await detail.aload_comments()
+
+    return job_detail_payload(detail, llm_data, refresh_llm, need_comments)
+
+
+def get_job_detail_validators(query_params, variant):
+    """
+    Conditional GET validators for the detail payload, or None when the
+    response must be built anyway (bad request, refresh_llm, not enriched).
+    """
+    if query_params.get("refresh_llm") == "true":
+        return None
+    if not query_params.get("job_id") and not query_params.get("id"):
+        return None
+    return job_detail_validators(query_params, variant)
+
+
+def get_job_detail(request, variant):
+    """
+    `(payload, validators)` for a detail request. Served from the job
+    detail cache when possible, in which case no query runs at all;
+    otherwise payload is None and only the validators are computed.
+    """
+    query_params = request.query_params
+    if query_params.get("refresh_llm") != "true":
+        cached = detail_cache.get_job_detail(query_params)
+        if cached is not None:
+            payload, validators = cached
+            return payload, validators.for_variant(variant)
+    return None, get_job_detail_validators(query_params, variant)
+
+
+def cache_job_detail(query_params, payload, validators):
+    # Only stable payloads are cached: a stored LLM response, no refresh
+    if validators and payload["llm_response"].get("id"):
+        detail_cache.set_job_detail(query_params, payload, validators)
+        # A write since `validators` were computed may have invalidated
+        # before the set above; then the payload could be stale
+        current = job_detail_validators(query_params, validators.variant)
+        if current is None or current.etag != validators.etag:
+            detail_cache.invalidate_job_detail(payload["job"]["id"])
+
+
+async def abuild_job_detail(query_params, validators, enrich_missing=True):
+    payload = await aget_job_detail_data(query_params, enrich_missing)
+    await sync_to_async(cache_job_detail)(query_params, payload, validators)
+    return payload
+
+
+async def aget_llm_data(detail):
+    try:
+        comments = await detail.aload_comments()
+        return await aenrich(detail.job, comments)
+    except Exception as e:
+        logger.error(f"Error fetching LLM data: {e}")
+        raise
+
+
+# Returned to requests that waited on a concurrent enrichment which failed
+CONCURRENT_ENRICHMENT_FAILED = {
+    "success": False,
+    "error": "Enrichment by a concurrent request failed",
+}
+
+
+def reload_llm_response(detail):
+    # Re-read, another request may have stored one since
+    llm_response = detail.job.llm_responses.first()
+    detail.set_llm_response(llm_response)
+    return llm_response
+
+
+async def areload_llm_response(detail):
+    llm_response = await detail.job.llm_responses.afirst()
+    detail.set_llm_response(llm_response)
+    return llm_response
+
+
+async def aget_or_create_llm_response(detail):
+    """
+    Retrieve existing LLM response or create a new one.
+
+    Single flight per job: only the request holding the job's enrichment
+    lease calls the model, concurrent requests for the job wait for it
+    (holding no thread) and return what it stored.
+
+    Not wrapped in a transaction: the model call must not hold one open, and
+    the response is stored with a single INSERT.
+    """
+    try:
+        llm_response = await detail.aload_llm_response()
+        if llm_response:
+            return fast_instance(llm_response, LLMResponseSerializer)
+
+        token = await sync_to_async(acquire_lease)(detail.job)
+        if token is None:
+            await await_lease(detail.job)
+            llm_response = await areload_llm_response(detail)
+            if llm_response:
+                return fast_instance(llm_response, LLMResponseSerializer)
+            return CONCURRENT_ENRICHMENT_FAILED
 
-            if not job:
-                return Response(
-                    {"message": "Job not found", "success": False},
-                    status=status.HTTP_404_NOT_FOUND,
-                )
+        try:
+            llm_response = await areload_llm_response(detail)
+            if llm_response:
+                return fast_instance(llm_response, LLMResponseSerializer)
 
-            # Handle LLM response
-            if refresh_llm:
-                llm_data = self.get_llm_data(job_id=job_id, pk=pk)
-            else:
-                llm_data = self.get_or_create_llm_response(job, job_id, pk)
+            llm_data = await aget_llm_data(detail)
+            if not llm_data.get("success"):
+                return llm_data
 
-            # Fetch comments and serialize job
-            if need_comments:
-                comments = Comment.objects.filter(job=job)
-            else:
-                comments = Comment.objects.none()
+            llm_response = build_llm_response(detail.job, llm_data)
+            await llm_response.asave()
+            detail.set_llm_response(llm_response)
+
+            return fast_instance(llm_response, LLMResponseSerializer)
+        finally:
+            await sync_to_async(release_lease)(detail.job, token)
+
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+def llm_response_events(detail):
+    """
+    Server-sent events for `detail.job`'s LLM response: `field` events
+    (`{"name", "value"}`) while the model writes a new one, then `done`
+    with the stored response, or `failed`. Single flight like
+    `aget_or_create_llm_response`; waiting requests only get the outcome.
+    """
+    try:
+        yield from _llm_response_events(detail)
+    except Exception as e:
+        # The response has started: errors can only be reported as an event
+        yield sse_event("failed", {"success": False, "error": str(e)})
+
+
+def _llm_response_events(detail):
+    llm_response = detail.llm_response
+    if llm_response:
+        yield sse_event("done", fast_instance(llm_response, LLMResponseSerializer))
+        return
+
+    token = acquire_lease(detail.job)
+    if token is None:
+        wait_for_lease(detail.job)
+        llm_response = reload_llm_response(detail)
+        if llm_response:
+            yield sse_event("done", fast_instance(llm_response, LLMResponseSerializer))
+        else:
+            yield sse_event("failed", CONCURRENT_ENRICHMENT_FAILED)
+        return
+
+    try:
+        llm_response = reload_llm_response(detail)
+        if not llm_response:
+            for event, data in stream_enrich(detail.job, detail.comments):
+                if event == "field":
+                    yield sse_event(event, data)
+                    continue
+                if not data.get("success"):
+                    yield sse_event("failed", data)
+                    return
+                llm_response = save_llm_response(detail.job, data)
+        yield sse_event("done", fast_instance(llm_response, LLMResponseSerializer))
+    finally:
+        release_lease(detail.job, token)
+
+
+async def allm_response_events(detail):
+    """
+    Async counterpart of `llm_response_events`.
+    """
+    try:
+        async for event in _allm_response_events(detail):
+            yield event
+    except Exception as e:
+        yield sse_event("failed", {"success": False, "error": str(e)})
+
+
+async def _allm_response_events(detail):
+    llm_response = await detail.aload_llm_response()
+    if llm_response:
+        yield sse_event("done", fast_instance(llm_response, LLMResponseSerializer))
+        return
+
+    token = await sync_to_async(acquire_lease)(detail.job)
+    if token is None:
+        await await_lease(detail.job)
+        llm_response = await areload_llm_response(detail)
+        if llm_response:
+            yield sse_event("done", fast_instance(llm_response, LLMResponseSerializer))
+        else:
+            yield sse_event("failed", CONCURRENT_ENRICHMENT_FAILED)
+        return
+
+    try:
+        llm_response = await areload_llm_response(detail)
+        if not llm_response:
+            comments = await detail.aload_comments()
+            async for event, data in astream_enrich(detail.job, comments):
+                if event == "field":
+                    yield sse_event(event, data)
+                    continue
+                if not data.get("success"):
+                    yield sse_event("failed", data)
+                    return
+                llm_response = build_llm_response(detail.job, data)
+                await llm_response.asave()
+        yield sse_event("done", fast_instance(llm_response, LLMResponseSerializer))
+    finally:
+        await sync_to_async(release_lease)(detail.job, token)
+
+
+class JobEnrichmentStream(AsyncAPIView):
+    """
+    The job page's LLM response as server-sent events (see
+    `llm_response_events`), so the page renders before the model answers.
+
+    Under ASGI the events come from an async generator and a streaming
+    request holds no thread; under WSGI from a plain generator, which the
+    server iterates in the request's thread.
+    """
 
-            comment_serializer = CommentSerializer(comments, many=True)
-            job_serializer = JobSerializer(job)
+    permission_classes = []
 
-            # Construct response
-            return Response(
-                {
-                    "job": job_serializer.data,
-                    "llm_response": llm_data,  # llm_data,
-                    "comments": comment_serializer.data,
-                    "refresh_llm": refresh_llm,
-                    "message": "Job and comments retrieved successfully",
-                    "success": True,
-                }
-            )
+    async def get(self, request):
+        try:
+            job_id, pk, _, _ = parse_job_detail_params(request.query_params)
+            detail = await JobDetail.aload(job_id=job_id, pk=pk)
+            await detail.aload_llm_response()
+
+            if isinstance(request._request, ASGIRequest):
+                events = allm_response_events(detail)
+            else:
+                events = llm_response_events(detail)
+            response = StreamingHttpResponse(events, content_type="text/event-stream")
+            response["Cache-Control"] = "no-cache"
+            response["X-Accel-Buffering"] = "no"  # Unbuffered behind nginx
+            return response
 
         except ValidationError as ve:
-            logger.error(f"Validation error: {ve}")
             return Response(
-                {"message": str(ve), "success": False},
+                {"message": str(ve.detail[0]), "success": False},
                 status=status.HTTP_400_BAD_REQUEST,
             )
         except Exception as e:
-            logger.error(f"An error occurred: {e}")
             return Response(
                 {"message": f"An error occurred: {str(e)}", "success": False},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
-    def get_llm_data(self, job_id=None, pk=None):
-        """
-        Fetch or initialize LLM data.
-        """
-        try:
-            # Simulating LLM call or response generation
-            llm = LLM(job_id=job_id, id=pk)
-            return llm
-        except Exception as e:
-            logger.error(f"Error fetching LLM data: {e}")
-            raise
-
-    @transaction.atomic
-    def get_or_create_llm_response(self, job, job_id=None, pk=None):
-        """
-        Retrieve existing LLM response or create a new one.
-        """
-        try:
-            # Check if an LLM response already exists
-            llm_response = job.llm_responses.first()
-            if llm_response:
-                return LLMResponseSerializer(llm_response).data
 
-            # If no response exists, create a new one
-            llm_data = self.get_llm_data(job_id=job_id, pk=pk)
-            if not llm_data.get("success"):
-                return llm_data
+class JobRetrieve(AsyncAPIView):
+    """
+    Async so that under ASGI a request waiting on the model (first
+    enrichment, refresh_llm) holds no worker thread.
+    """
+
+    permission_classes = []
 
-            # Remove any unnecessary nested structures from llm_data for other_data field
-            filtered_llm_data = {
-                key: value
-                for key, value in llm_data.items()
-                if key
-                not in [
-                    "client_names",
-                    "keywords",
-                    "company",
-                    "client_location",
-                    "success",
-                ]
-            }
-
-            llm_response = LLMResponse.objects.create(
-                job=job,
-                client_names=llm_data.get("client_names"),
-                keywords=llm_data.get("keywords"),
-                company=llm_data.get("company"),
-                client_location=llm_data.get("client_location"),
-                other_data=filtered_llm_data,  # Store only the filtered data
-            )
-            llm_response.save()
-
-            return LLMResponseSerializer(llm_response).data
+    async def get(self, request):
+        try:
+            # The job row is loaded in full (enrichment and the detail cache
+            # need it), the fieldset only trims the serialized job
+            fieldset = parse_fieldset(request.query_params, JobSerializer)
+            variant = f"json:{fieldset}"
+            payload, validators = await sync_to_async(get_job_detail)(request, variant)
+            if validators:
+                not_modified = validators.not_modified(request)
+                if not_modified:
+                    return not_modified
+            if payload is None:
+                payload = await abuild_job_detail(request.query_params, validators)
+
+            response = Response({**payload, "job": project(payload["job"], fieldset)})
+            return validators.apply(response) if validators else response
 
+        except ValidationError as ve:
+            logger.error(f"Validation error: {ve}")
+            return Response(
+                {"message": str(ve), "success": False},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
         except Exception as e:
-            # Handle exception appropriately (you can log the error if needed)
-            return {"success": False, "error": str(e)}
+            logger.error(f"An error occurred: {e}")
+            return Response(
+                {"message": f"An error occurred: {str(e)}", "success": False},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
 
 
 class AdminControl(APIView):
@@ -512,14 +801,14 @@ class AdminControl(APIView):
             )
 
 
-class LLMView(APIView):
+class LLMView(AsyncAPIView):
     permission_classes = []
 
-    def get(self, request):
+    async def get(self, request):
         try:
             job_id = request.query_params.get("job_id")
             id = request.query_params.get("id")
-            res = LLM(job_id=job_id, id=id)
+            res = await aLLM(job_id=job_id, id=id)
             return Response(
                 {
                     "message": "LLM data retrieved successfully",
@@ -535,28 +824,289 @@ class LLMView(APIView):
             )
 
 
+class LLMCacheView(APIView):
+    permission_classes = []
+
+    def get(self, request):
+        try:
+            return Response(
+                {
+                    "cache": cache_stats(),
+                    "message": "LLM cache statistics retrieved successfully",
+                    "success": True,
+                },
+                status=status.HTTP_200_OK,
+            )
+        except Exception as e:
+            return Response(
+                {"message": f"An error occurred: {str(e)}", "success": False},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+
+class LLMCallSummaryView(APIView):
+    """
+    Model call latency, tokens and cost from the LLMCall ledger, per time
+    window and prompt version, plus the most expensive jobs:
+    llm/calls/?windows=1h,24h,7d&top=10
+    """
+
+    permission_classes = []
+
+    def get(self, request):
+        try:
+            windows = parse_windows(request.query_params)
+            top = parse_top_jobs(request.query_params)
+            return Response(
+                {
+                    **ledger_summary(windows, top),
+                    "message": "LLM call summary retrieved successfully",
+                    "success": True,
+                },
+                status=status.HTTP_200_OK,
+            )
+        except ValidationError as ve:
+            return Response(
+                {"message": str(ve.detail[0]), "success": False},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        except Exception as e:
+            return Response(
+                {"message": f"An error occurred: {str(e)}", "success": False},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+
+class JobDetailCacheView(APIView):
+    permission_classes = []
+
+    def get(self, request):
+        try:
+            return Response(
+                {
+                    "cache": detail_cache.cache_stats(),
+                    "message": "Job detail cache statistics retrieved successfully",
+                    "success": True,
+                },
+                status=status.HTTP_200_OK,
+            )
+        except Exception as e:
+            return Response(
+                {"message": f"An error occurred: {str(e)}", "success": False},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+
+class MetricsView(APIView):
+    """
+    Request histograms and cache / ingest counters of this process in the
+    Prometheus text format.
+    """
+
+    permission_classes = []
+
+    def get(self, request):
+        try:
+            return HttpResponse(metrics.expose(), content_type=metrics.CONTENT_TYPE)
+        except Exception as e:
+            return Response(
+                {"message": f"An error occurred: {str(e)}", "success": False},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+
+class ExportView(APIView):
+    """
+    Stream a table as NDJSON or CSV:
+    export/<table>/?output=csv&gzip=true&updated_since=...&updated_until=...
+    """
+
+    permission_classes = []
+
+    def get(self, request, table):
+        try:
+            params = request.query_params
+            output, compress = parse_export_options(params)
+            queryset = export_queryset(
+                table, params.get("updated_since"), params.get("updated_until")
+            )
+            chunks = iter_export(queryset, output, compress)
+
+            filename = f"{table}.{output}" + (".gz" if compress else "")
+            response = StreamingHttpResponse(
+                streaming_content(request, chunks),
+                content_type="application/gzip" if compress else EXPORT_FORMATS[output],
+            )
+            response["Content-Disposition"] = f'attachment; filename="{filename}"'
+            return response
+        except ValidationError as ve:
+            return Response(
+                {"message": str(ve.detail[0]), "success": False},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        except Exception as e:
+            return Response(
+                {"message": f"An error occurred: {str(e)}", "success": False},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+
+class JobSearchView(APIView):
+    """
+    Ranked full-text search over job title, skills, description and the
+    feedback of the job's comments: jobs/search/?q=...&page=1&page_size=20
+    """
+
+    permission_classes = []
+
+    def get(self, request):
+        try:
+            fieldset = parse_fieldset(request.query_params, JobSerializer)
+            jobs, has_next = search_jobs(
+                request.query_params, only_columns(Job.objects.all(), fieldset)
+            )
+            serializer = JobSerializer(jobs, many=True, fields=fieldset)
+            results = [
+                {**data, "rank": job.search_rank}
+                for job, data in zip(jobs, serializer.data)
+            ]
+            return Response(
+                {
+                    "jobs": results,
+                    "message": "Jobs retrieved successfully",
+                    "success": True,
+                    "has_next": has_next,
+                },
+                status=status.HTTP_200_OK,
+            )
+        except ValidationError as ve:
+            return Response(
+                {"message": str(ve.detail[0]), "success": False},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        except Exception as e:
+            return Response(
+                {"message": f"An error occurred: {str(e)}", "success": False},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+
+class SkillFacetView(APIView):
+    """
+    Top skills with job counts, optionally for a filtered job set:
+    jobs/skills/?top=20&skills=Python,Django&client_location=...&is_payment_verified=true
+    """
+
+    permission_classes = []
+
+    def get(self, request):
+        try:
+            top = parse_top(request.query_params)
+            jobs = None
+            if has_job_filters(request.query_params):
+                jobs = filter_jobs(Job.objects.all(), request.query_params)
+            return Response(
+                {
+                    "skills": skill_facets(jobs, top),
+                    "message": "Skills retrieved successfully",
+                    "success": True,
+                },
+                status=status.HTTP_200_OK,
+            )
+        except ValidationError as ve:
+            return Response(
+                {"message": str(ve.detail[0]), "success": False},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        except Exception as e:
+            return Response(
+                {"message": f"An error occurred: {str(e)}", "success": False},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+
 # Get all jobs and render them in an HTML template
+# Placeholder split out of index.html so the table rows can be streamed
+JOB_ROWS_MARKER = "__job_rows__"
+
+
+class JobPagePagination(KeysetPagination):
+    page_size = 100
+    max_page_size = 1000
+
+
 class GetAllJobs(APIView):
     permission_classes = []
+    # Rows rendered per streamed chunk
+    chunk_size = 50
 
     def get(self, request):
-        jobs = Job.objects.all().order_by("-created_at")
-        serialized_jobs = JobSerializer(jobs, many=True).data
-        return render(request, "index.html", {"jobs": serialized_jobs})
+        # Only the columns index.html shows (+ created_at for the cursor)
+        jobs = Job.objects.only("id", "job_id", "title", "created_at")
+        paginator = JobPagePagination()
+        try:
+            page = paginator.paginate_queryset(jobs, request)
+        except ValidationError as ve:
+            return HttpResponseBadRequest(str(ve.detail[0]))
+
+        layout = render_to_string(
+            "index.html",
+            {
+                "job_rows": JOB_ROWS_MARKER,
+                "cursor": request.query_params.get("cursor"),
+                "next_cursor": paginator.next_cursor,
+                "page_size": paginator.get_page_size(request),
+            },
+            request=request,
+        )
+        head, tail = layout.split(JOB_ROWS_MARKER, 1)
+
+        def stream():
+            yield head
+            if not page:
+                yield render_to_string("job_rows.html", {"jobs": []})
+            for start in range(0, len(page), self.chunk_size):
+                chunk = page[start : start + self.chunk_size]
+                yield render_to_string("job_rows.html", {"jobs": chunk})
+            yield tail
+
+        return StreamingHttpResponse(
+            streaming_content(request, stream()), content_type="text/html; charset=utf-8"
+        )
 
 
 # Get a specific job by id and render it in an HTML template
-class GetJob(APIView):
+class GetJob(AsyncAPIView):
+    """
+    Async like JobRetrieve: a refresh_llm request waits on the model
+    without holding a thread.
+    """
+
     permission_classes = []
 
-    def get(self, request, pk=None):
+    async def get(self, request, pk=None):
         try:
-            job_retrieve_view = JobRetrieve()
-            data = job_retrieve_view.get(request)
-
-            if data:
-                return render(request, "job.html", data.data)
-            else:
-                return render(request, "job.html", {})
+            response, validators = await sync_to_async(self.get_cached)(request)
+            if response is None:
+                # Not enriched yet: the page streams it from jobs/detail/stream/
+                data = await abuild_job_detail(
+                    request.query_params, validators, enrich_missing=False
+                )
+                response = await sync_to_async(render)(request, "job.html", data)
+                response = validators.apply(response) if validators else response
+            return response
         except Exception as e:
-            return render(request, "job.html", {})
+            return await sync_to_async(render)(request, "job.html", {})
+
+    def get_cached(self, request):
+        # The page from the detail cache, or a 304, in a single thread hop;
+        # `(None, validators)` when it has to be built
+        data, validators = get_job_detail(request, "html")
+        if validators:
+            not_modified = validators.not_modified(request)
+            if not_modified:
+                return not_modified, validators
+        if data is None:
+            return None, validators
+        response = render(request, "job.html", data)
+        return (validators.apply(response) if validators else response), validators
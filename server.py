@@ -1,5 +1,23 @@
-from waitress import serve
-from server.wsgi import application
+import argparse
 
 if __name__ == '__main__':
-    serve(application, port='8000')
\ No newline at end of file
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument(
+        '--asgi',
+        action='store_true',
+        help='Serve server.asgi with uvicorn: requests waiting on the model '
+        'hold no worker thread',
+    )
+    args = parser.parse_args()
+
+    if args.asgi:
+        import uvicorn
+
+        uvicorn.run('server.asgi:application', host=args.host, port=args.port)
+    else:
+        from waitress import serve
+        from server.wsgi import application
+
+        serve(application, host=args.host, port=args.port)
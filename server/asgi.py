@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'server.settings')
 
 application = get_asgi_application()
+
+from api.utils.llm_client import use_async_pool  # noqa: E402, needs the app registry
+
+# The server's event loop outlives requests: keep pooled async LLM connections on it
+use_async_pool()
@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 
 from pathlib import Path
 import os
+import dj_database_url
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -59,8 +60,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "api.middleware.RequestMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",
+    "api.middleware.StaticFilesMiddleware",  # WhiteNoise, async capable
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -110,6 +112,15 @@ DATABASES = {
     }
 }
 
+# Local override, e.g. DATABASE_URL=sqlite:///db.sqlite3 or a local Postgres
+DATABASE_URL = os.getenv("DATABASE_URL")
+if DATABASE_URL:
+    DATABASES["default"] = dj_database_url.parse(DATABASE_URL)
+    if DATABASES["default"]["ENGINE"] == "django.db.backends.sqlite3":
+        # The default in-memory test database fails concurrent writers with
+        # "table is locked" instead of waiting; a file honours the busy timeout
+        DATABASES["default"]["TEST"] = {"NAME": BASE_DIR / "test_db.sqlite3"}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -160,9 +171,73 @@ REST_FRAMEWORK = {
     ],
     # default renderer
     "DEFAULT_RENDERER_CLASSES": [
-        "rest_framework.renderers.JSONRenderer",
+        "api.renderers.ORJSONRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "api.parsers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
     ],
     # pagination
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 10,
 }
+
+# Background LLM enrichment queue (see `manage.py run_enrichment_worker`)
+ENRICHMENT_MAX_ATTEMPTS = int(os.getenv("ENRICHMENT_MAX_ATTEMPTS", "3"))
+ENRICHMENT_RETRY_BACKOFF = int(os.getenv("ENRICHMENT_RETRY_BACKOFF", "30"))  # seconds
+ENRICHMENT_LEASE_SECONDS = int(os.getenv("ENRICHMENT_LEASE_SECONDS", "300"))
+ENRICHMENT_WORKER_CONCURRENCY = int(os.getenv("ENRICHMENT_WORKER_CONCURRENCY", "4"))
+# Inline enrichment (job detail / page) runs once per job at a time; other
+# requests for the job wait up to this long for its result. Also the lease
+# timeout after which a crashed holder's lease is taken over.
+ENRICHMENT_INLINE_TIMEOUT = int(os.getenv("ENRICHMENT_INLINE_TIMEOUT", "120"))  # seconds
+
+# Content-addressed cache of LLM enrichment results
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(30 * 24 * 3600)))  # seconds
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+
+# Shared LLM client: connection pool and rate limits
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL")  # e.g. a local stand-in server
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))  # seconds
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_REQUESTS_PER_MINUTE = int(os.getenv("LLM_REQUESTS_PER_MINUTE", "500"))
+LLM_TOKENS_PER_MINUTE = int(os.getenv("LLM_TOKENS_PER_MINUTE", "30000"))
+
+# Max prompt size; lower ranked comment history is truncated or dropped
+LLM_PROMPT_TOKEN_BUDGET = int(os.getenv("LLM_PROMPT_TOKEN_BUDGET", "16000"))
+
+# Per-request Server-Timing header and per-route histograms at
+# /api/v1/metrics/ (Prometheus text format, counters are per process)
+REQUEST_METRICS = os.getenv("REQUEST_METRICS", "True") == "True"
+
+# Caches. `job_detail` holds assembled JobRetrieve payloads, invalidated by
+# model signals (see api/signals.py) in the process that writes. The web
+# processes, the enrichment worker and enrich_jobs must therefore share it:
+# the default is a file cache in <project>/cache/job_detail (one host),
+# JOB_DETAIL_CACHE_LOCATION moves it. Several hosts need a shared
+# backend, e.g. JOB_DETAIL_CACHE_BACKEND=...db.DatabaseCache with
+# JOB_DETAIL_CACHE_LOCATION=<table> (`manage.py createcachetable`).
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "job_detail": {
+        "BACKEND": os.getenv(
+            "JOB_DETAIL_CACHE_BACKEND",
+            "django.core.cache.backends.filebased.FileBasedCache",
+        ),
+        "LOCATION": os.getenv(
+            "JOB_DETAIL_CACHE_LOCATION",
+            str(BASE_DIR / "cache" / "job_detail"),
+        ),
+        "OPTIONS": {
+            "MAX_ENTRIES": int(os.getenv("JOB_DETAIL_CACHE_MAX_ENTRIES", "5000")),
+        },
+    },
+}
+JOB_DETAIL_CACHE_TIMEOUT = int(os.getenv("JOB_DETAIL_CACHE_TIMEOUT", "3600"))  # seconds
+
+# Gives the test run a private job_detail cache
+TEST_RUNNER = "api.test_runner.TestRunner"